@@ -1,9 +1,9 @@
 """Administrative endpoints."""
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, timedelta, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -12,11 +12,9 @@ from backend.app.core.security import get_current_admin
 from backend.app.db.session import get_db
 from backend.app.models import (
     OperationLog,
-    PointTransaction,
     Resource,
     ResourceStatus,
     SystemConfig,
-    TransactionType,
     User,
 )
 from backend.app.schemas import (
@@ -28,7 +26,17 @@ from backend.app.schemas import (
     ResourceStatsUpdate,
     VisitStatsResponse,
 )
+from backend.app.services.notification_counters import notified_users, recount
+from backend.app.services.notification_service import admin_ids_cache
 from backend.app.services.operations import log_operation
+from backend.app.services.pagination import paginate_keyset
+from backend.app.services.resource_cache import categorized_cache
+from backend.app.services.resource_loader import load_options, load_resource_detail
+from backend.app.services.search_index import search_index
+from backend.app.services.stats_rollup import stats_rollup
+from backend.app.services.user_profiles import UNKNOWN_USER, user_profiles
+from backend.app.services.visitor_sketches import visitor_sketches
+from backend.app.utils.hyperloglog import standard_error
 
 
 
@@ -131,51 +139,28 @@ async def get_dashboard_stats(
 ):
     """Return aggregated dashboard statistics."""
 
-    total_users = db.query(func.count(User.id)).scalar() or 0
-    total_revenue = (
-        db.query(func.sum(PointTransaction.amount))
-        .filter(PointTransaction.type == TransactionType.RECHARGE)
-        .scalar()
-        or 0
-    )
-    total_articles = db.query(func.count(Resource.id)).scalar() or 0
+    # Past days come from the daily_stats rollup; today is aggregated live
+    today = stats_rollup.today()
+    thirty_days_ago = today - timedelta(days=29)
+    sixty_days_ago = today - timedelta(days=59)
 
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    sixty_days_ago = datetime.utcnow() - timedelta(days=60)
+    live = stats_rollup.compute_day(db, today)
+    all_time = stats_rollup.totals(db, today_values=live)
+    recent = stats_rollup.totals(db, start=thirty_days_ago, today_values=live)
+    previous = stats_rollup.totals(db, start=sixty_days_ago, end=thirty_days_ago)
 
-    recent_users = (
-        db.query(func.count(User.id)).filter(User.created_at >= thirty_days_ago).scalar() or 0
-    )
-    previous_users = (
-        db.query(func.count(User.id))
-        .filter(User.created_at >= sixty_days_ago, User.created_at < thirty_days_ago)
-        .scalar()
-        or 0
-    )
+    total_users = all_time["new_users"]
+    total_revenue = all_time["recharge_amount"]
+    total_articles = db.query(func.count(Resource.id)).scalar() or 0
 
+    recent_users = recent["new_users"]
+    previous_users = previous["new_users"]
     user_growth = (
         ((recent_users - previous_users) / previous_users * 100) if previous_users > 0 else 0
     )
 
-    recent_revenue = (
-        db.query(func.sum(PointTransaction.amount))
-        .filter(
-            PointTransaction.type == TransactionType.RECHARGE,
-            PointTransaction.created_at >= thirty_days_ago,
-        )
-        .scalar()
-        or 0
-    )
-    previous_revenue = (
-        db.query(func.sum(PointTransaction.amount))
-        .filter(
-            PointTransaction.type == TransactionType.RECHARGE,
-            PointTransaction.created_at >= sixty_days_ago,
-            PointTransaction.created_at < thirty_days_ago,
-        )
-        .scalar()
-        or 0
-    )
+    recent_revenue = recent["recharge_amount"]
+    previous_revenue = previous["recharge_amount"]
     revenue_growth = (
         ((recent_revenue - previous_revenue) / previous_revenue * 100)
         if previous_revenue > 0
@@ -193,8 +178,10 @@ async def get_dashboard_stats(
 
 @router.get("/logs")
 async def get_operation_logs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     user_id: Optional[int] = None,
     action: Optional[str] = None,
     resource_type: Optional[str] = None,
@@ -211,15 +198,19 @@ async def get_operation_logs(
     if resource_type:
         query = query.filter(OperationLog.resource_type == resource_type)
     
-    logs = query.order_by(OperationLog.created_at.desc()).offset(skip).limit(limit).all()
+    logs, next_cursor = paginate_keyset(query, OperationLog, limit, cursor, skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
+    profiles = user_profiles.load(db, (log.user_id for log in logs))
+
     # 中文化日志数据
     localized_logs = []
     for log in logs:
         log_dict = {
             "id": log.id,
             "user_id": log.user_id,
-            "username": log.user.username if log.user else "系统",
+            "username": profiles.get(log.user_id, UNKNOWN_USER)[0] or "系统",
             "action": translate_action_to_chinese(log.action),
             "action_raw": log.action,  # 保留原始值以便筛选
             "resource_type": translate_resource_type_to_chinese(log.resource_type),
@@ -249,7 +240,7 @@ async def admin_list_resources(
 ):
     """Return paginated resources with optional filters (admin only)."""
 
-    query = db.query(Resource)
+    query = db.query(Resource).options(*load_options(ResourceListResponse))
     if status:
         query = query.filter(Resource.status == status)
     if category_id:
@@ -374,7 +365,9 @@ async def batch_delete_users(
                 errors.append(f"Cannot delete yourself (user {user_id})")
                 continue
             
+            stats_rollup.mark_user_deleted(db, user)
             db.delete(user)
+            db.commit()
             deleted_count += 1
             
             # Log the operation
@@ -392,6 +385,7 @@ async def batch_delete_users(
             continue
     
     db.commit()
+    admin_ids_cache.invalidate()
     
     return {
         "deleted_count": deleted_count,
@@ -417,6 +411,7 @@ async def batch_delete_resources(
         )
     
     deleted_count = 0
+    deleted_ids = []
     errors = []
     
     for resource_id in batch_request.resource_ids:
@@ -426,7 +421,13 @@ async def batch_delete_resources(
                 errors.append(f"Resource {resource_id} not found")
                 continue
             
+            recipients = notified_users(db, resource_id)
             db.delete(resource)
+            db.flush()
+            # Its notifications went with it through ON DELETE CASCADE
+            recount(db, recipients)
+            db.commit()
+            deleted_ids.append(resource_id)
             deleted_count += 1
             
             # Log the operation
@@ -444,6 +445,9 @@ async def batch_delete_resources(
             continue
     
     db.commit()
+    categorized_cache.invalidate()
+    for resource_id in deleted_ids:
+        search_index.remove_resource(resource_id)
     
     return {
         "deleted_count": deleted_count,
@@ -472,7 +476,7 @@ async def update_resource_stats(
         resource.downloads = stats_update.downloads
 
     db.commit()
-    db.refresh(resource)
+    categorized_cache.invalidate()
     
     log_operation(
         db=db,
@@ -485,7 +489,7 @@ async def update_resource_stats(
         details=f"Updated stats: views={stats_update.views}, downloads={stats_update.downloads}"
     )
     
-    return resource
+    return load_resource_detail(db, resource_id, current_admin)
 
 
 @router.get("/analytics/visits", response_model=VisitStatsResponse)
@@ -494,10 +498,9 @@ async def get_visit_stats(
     db: Session = Depends(get_db),
 ):
     """Get website visit statistics."""
-    from backend.app.models import VisitorAnalytics
     
-    total_visits = db.query(func.count(VisitorAnalytics.id)).scalar() or 0
-    unique_visitors = db.query(func.count(func.distinct(VisitorAnalytics.session_id))).scalar() or 0
+    total_visits = stats_rollup.totals(db)["visits"]
+    unique_visitors = visitor_sketches.unique_visitors(db)
     
     return {
         "total_visits": total_visits,
@@ -506,28 +509,60 @@ async def get_visit_stats(
     }
 
 
+@router.get("/analytics/unique-visitors")
+async def get_unique_visitors(
+    start_date: Optional[date] = Query(None, description="First UTC day, inclusive"),
+    end_date: Optional[date] = Query(None, description="Last UTC day, inclusive"),
+    page_path: Optional[str] = Query(None, max_length=500, description="Limit to one page"),
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Estimate distinct visitors for a date window from the HyperLogLog sketches."""
+
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date",
+        )
+
+    end = end_date + timedelta(days=1) if end_date else None
+    return {
+        "unique_visitors": visitor_sketches.unique_visitors(db, start_date, end, page_path),
+        "start_date": start_date,
+        "end_date": end_date,
+        "page_path": page_path,
+        "relative_error": round(standard_error(), 4),
+    }
+
+
 @router.get("/analytics/visitor-logs")
 async def get_visitor_logs(
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
-    """Get detailed visitor logs with Chinese localization."""
+    """Get detailed visitor logs with Chinese localization.
+
+    ``total`` comes from the daily rollups rather than a COUNT(*) per page.
+    """
     from backend.app.models import VisitorAnalytics
     
-    total = db.query(func.count(VisitorAnalytics.id)).scalar() or 0
+    total = stats_rollup.totals(db)["visits"]
     
-    logs = (
-        db.query(VisitorAnalytics)
-        .order_by(VisitorAnalytics.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    logs, next_cursor = paginate_keyset(
+        db.query(VisitorAnalytics),
+        VisitorAnalytics,
+        limit,
+        cursor,
+        skip,
     )
+    profiles = user_profiles.load(db, (log.user_id for log in logs))
     
     return {
         "total": total,
+        "next_cursor": next_cursor,
         "logs": [
             {
                 "id": log.id,
@@ -536,7 +571,7 @@ async def get_visitor_logs(
                 "ip_address": log.ip_address,
                 "user_agent": log.user_agent,
                 "user_id": log.user_id,
-                "username": log.user.username if log.user else "访客",
+                "username": profiles.get(log.user_id, UNKNOWN_USER)[0] or "访客",
                 "session_id": log.session_id,
                 "referrer": log.referrer,
                 "created_at": format_datetime_with_timezone(log.created_at),
@@ -10,6 +10,7 @@ from backend.app.db.session import get_db
 from backend.app.models import Category, User
 from backend.app.schemas import CategoryCreate, CategoryResponse, CategoryUpdate
 from backend.app.services.operations import log_operation
+from backend.app.services.resource_cache import categorized_cache
 
 
 router = APIRouter(prefix="/api/categories", tags=["Categories"])
@@ -97,6 +98,7 @@ async def update_category(
 
     db.commit()
     db.refresh(category)
+    categorized_cache.invalidate()
 
     log_operation(
         db=db,
@@ -132,6 +134,7 @@ async def delete_category(
 
     db.delete(category)
     db.commit()
+    categorized_cache.invalidate()
 
     log_operation(
         db=db,
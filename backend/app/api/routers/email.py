@@ -4,7 +4,7 @@ import json
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
@@ -13,6 +13,7 @@ from backend.app.db.session import get_db
 from backend.app.models import (
     User, UserRole, EmailTemplate, EmailLog, ScheduledEmail, EmailStatus
 )
+from backend.app.services.pagination import paginate_keyset
 
 router = APIRouter(prefix="/api/admin/email", tags=["Email"])
 
@@ -294,19 +295,23 @@ async def send_email_now(
 
 @router.get("/history", response_model=List[EmailLogResponse])
 async def get_email_history(
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
     status: Optional[str] = None,
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """获取邮件发送历史"""
-    query = db.query(EmailLog).order_by(EmailLog.created_at.desc())
+    query = db.query(EmailLog)
     
     if status:
         query = query.filter(EmailLog.status == status)
     
-    logs = query.offset(offset).limit(limit).all()
+    logs, next_cursor = paginate_keyset(query, EmailLog, limit, cursor, offset)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return logs
 
 
@@ -1,15 +1,18 @@
 """Resource interactions (likes and comments) endpoints."""
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from backend.app.core.security import get_current_user
 from backend.app.db.session import get_db
-from backend.app.models import Comment, Resource, ResourceLike, User, NotificationType, UserRole
+from backend.app.models import Comment, Resource, ResourceLike, User, NotificationType
 from backend.app.schemas import CommentCreate, CommentResponse, CommentUpdate, LikeResponse
+from backend.app.services.comment_tree import load_comment_tree
 from backend.app.services.operations import log_operation
+from backend.app.services.resource_counters import adjust_counter
+from backend.app.services.user_profiles import UNKNOWN_USER, user_profiles
 from backend.app.services import notification_service
 
 
@@ -45,6 +48,7 @@ async def create_like(
     # Create new like
     new_like = ResourceLike(user_id=current_user.id, resource_id=resource_id)
     db.add(new_like)
+    adjust_counter(db, resource_id, "like_count", 1)
     db.commit()
     db.refresh(new_like)
     
@@ -60,17 +64,13 @@ async def create_like(
     )
     
     # Create notification for all admins
-    admins = db.query(User).filter(User.role == UserRole.ADMIN).all()
-    for admin in admins:
-        if admin.id != current_user.id:
-            notification_service.create_notification(
-                db=db,
-                user_id=admin.id,
-                actor_id=current_user.id,
-                notification_type=NotificationType.LIKE,
-                resource_id=resource_id,
-                content=f"{current_user.username} 点赞了文章《{resource.title}》"
-            )
+    notification_service.notify_admins(
+        db=db,
+        actor_id=current_user.id,
+        notification_type=NotificationType.LIKE,
+        resource_id=resource_id,
+        content=f"{current_user.username} 点赞了文章《{resource.title}》"
+    )
     
     # Add username to response
     response_like = LikeResponse(
@@ -103,6 +103,7 @@ async def delete_like(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Like not found")
     
     db.delete(like)
+    adjust_counter(db, resource_id, "like_count", -1)
     db.commit()
     
     # Log operation
@@ -127,16 +128,16 @@ async def get_resource_likes(
     likes = db.query(ResourceLike).filter(ResourceLike.resource_id == resource_id).all()
     
     # Enrich with usernames
+    profiles = user_profiles.load(db, (like.user_id for like in likes))
     response_likes = []
     for like in likes:
-        user = db.query(User).filter(User.id == like.user_id).first()
         response_likes.append(
             LikeResponse(
                 id=like.id,
                 user_id=like.user_id,
                 resource_id=like.resource_id,
                 created_at=like.created_at,
-                username=user.username if user else None
+                username=profiles.get(like.user_id, UNKNOWN_USER)[0]
             )
         )
     
@@ -150,7 +151,7 @@ async def get_resource_like_count(
 ):
     """Get the like count for a resource."""
     
-    count = db.query(ResourceLike).filter(ResourceLike.resource_id == resource_id).count()
+    count = db.query(Resource.like_count).filter(Resource.id == resource_id).scalar() or 0
     return {"resource_id": resource_id, "like_count": count}
 
 
@@ -201,6 +202,7 @@ async def create_comment(
         parent_id=comment_data.parent_id
     )
     db.add(new_comment)
+    adjust_counter(db, comment_data.resource_id, "comment_count", 1)
     db.commit()
     db.refresh(new_comment)
     
@@ -216,32 +218,24 @@ async def create_comment(
     )
     
     # Create notification for all admins
-    admins = db.query(User).filter(User.role == UserRole.ADMIN).all()
-    
     if comment_data.parent_id:
         # 回复评论 - 通知管理员
-        for admin in admins:
-            if admin.id != current_user.id:
-                notification_service.create_notification(
-                    db=db,
-                    user_id=admin.id,
-                    actor_id=current_user.id,
-                    notification_type=NotificationType.REPLY,
-                    resource_id=comment_data.resource_id,
-                    content=f"{current_user.username} 回复了评论：{comment_data.content[:50]}..."
-                )
+        notification_service.notify_admins(
+            db=db,
+            actor_id=current_user.id,
+            notification_type=NotificationType.REPLY,
+            resource_id=comment_data.resource_id,
+            content=f"{current_user.username} 回复了评论：{comment_data.content[:50]}..."
+        )
     else:
         # 评论文章 - 通知管理员
-        for admin in admins:
-            if admin.id != current_user.id:
-                notification_service.create_notification(
-                    db=db,
-                    user_id=admin.id,
-                    actor_id=current_user.id,
-                    notification_type=NotificationType.COMMENT,
-                    resource_id=comment_data.resource_id,
-                    content=f"{current_user.username} 评论了文章《{resource.title}》：{comment_data.content[:50]}..."
-                )
+        notification_service.notify_admins(
+            db=db,
+            actor_id=current_user.id,
+            notification_type=NotificationType.COMMENT,
+            resource_id=comment_data.resource_id,
+            content=f"{current_user.username} 评论了文章《{resource.title}》：{comment_data.content[:50]}..."
+        )
     
     # Build response
     response_comment = CommentResponse(
@@ -263,40 +257,28 @@ async def create_comment(
 @router.get("/comments/{resource_id}", response_model=List[CommentResponse])
 async def get_resource_comments(
     resource_id: str,  # UUID
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Top-level comments per page; all when omitted"),
+    reply_limit: Optional[int] = Query(None, ge=0, description="Replies embedded per comment; all when omitted"),
     db: Session = Depends(get_db),
 ):
     """Get all comments for a resource (including nested replies)."""
-    
-    # Get all top-level comments (no parent)
-    top_comments = (
-        db.query(Comment)
-        .filter(Comment.resource_id == resource_id, Comment.parent_id == None)
-        .order_by(Comment.created_at.desc())
-        .all()
+    return load_comment_tree(db, resource_id, skip=skip, limit=limit, reply_limit=reply_limit)
+
+
+@router.get("/comments/{resource_id}/replies/{comment_id}", response_model=List[CommentResponse])
+async def get_comment_replies(
+    resource_id: str,  # UUID
+    comment_id: int,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    reply_limit: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Page through the replies of one comment, e.g. after a capped ``reply_limit``."""
+    return load_comment_tree(
+        db, resource_id, parent_id=comment_id, skip=skip, limit=limit, reply_limit=reply_limit
     )
-    
-    def build_comment_tree(comment: Comment) -> CommentResponse:
-        """Recursively build comment with replies."""
-        user = db.query(User).filter(User.id == comment.user_id).first()
-        
-        # Get replies
-        replies = db.query(Comment).filter(Comment.parent_id == comment.id).order_by(Comment.created_at.asc()).all()
-        reply_responses = [build_comment_tree(reply) for reply in replies]
-        
-        return CommentResponse(
-            id=comment.id,
-            user_id=comment.user_id,
-            resource_id=comment.resource_id,
-            content=comment.content,
-            parent_id=comment.parent_id,
-            created_at=comment.created_at,
-            updated_at=comment.updated_at,
-            username=user.username if user else None,
-            avatar_url=user.avatar_url if user else None,
-            replies=reply_responses
-        )
-    
-    return [build_comment_tree(comment) for comment in top_comments]
 
 
 @router.put("/comments/{comment_id}", response_model=CommentResponse)
@@ -364,6 +346,7 @@ async def delete_comment(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this comment")
     
     db.delete(comment)
+    adjust_counter(db, comment.resource_id, "comment_count", -1)
     db.commit()
     
     # Log operation
@@ -5,7 +5,7 @@ from backend.app.db.session import get_db
 from backend.app.services.message_service import message_service
 from backend.app.schemas.message import Message, MessageCreate, Conversation
 from backend.app.core.security import get_current_user
-from backend.app.models import User, UserRole, NotificationType
+from backend.app.models import User, NotificationType
 from backend.app.services import notification_service
 
 router = APIRouter(prefix="/api/messages", tags=["Messages"])
@@ -28,17 +28,13 @@ def send_message(
     message = message_service.send_message(db, current_user.id, message_in)
     
     # Notify all admins about the private message
-    admins = db.query(User).filter(User.role == UserRole.ADMIN).all()
-    for admin in admins:
-        if admin.id != current_user.id:
-            notification_service.create_notification(
-                db=db,
-                user_id=admin.id,
-                actor_id=current_user.id,
-                notification_type=NotificationType.MESSAGE,
-                resource_id=None,  # Private messages don't have a resource
-                content=f"{current_user.username} 发送了私信给 {receiver.username}"
-            )
+    notification_service.notify_admins(
+        db=db,
+        actor_id=current_user.id,
+        notification_type=NotificationType.MESSAGE,
+        resource_id=None,  # Private messages don't have a resource
+        content=f"{current_user.username} 发送了私信给 {receiver.username}"
+    )
     
     return message
 
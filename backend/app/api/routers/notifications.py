@@ -1,16 +1,26 @@
 """通知管理 API"""
 
+import asyncio
+import json
 from datetime import timezone
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from backend.app.core.security import get_current_user
-from backend.app.db.session import get_db
+from backend.app.core.config import get_settings
+from backend.app.core.security import decode_token, get_current_user, oauth2_scheme_optional
+from backend.app.db.session import SessionLocal, get_db
 from backend.app.models import User, Notification, NotificationType
 from backend.app.services import notification_service
+from backend.app.services.event_hub import event_hub
+from backend.app.services.message_service import message_service
+from backend.app.services.user_profiles import UNKNOWN_USER, user_profiles
+
+
+settings = get_settings()
 
 
 router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
@@ -66,6 +76,121 @@ async def get_notification_stats(
     return notification_service.get_stats(db, current_user.id, unread_only)
 
 
+def _open_stream(token: Optional[str], with_counts: bool) -> Dict[str, Any]:
+    """Authenticate a stream and take its unread-count snapshot with a short-lived session.
+
+    Streams stay open for minutes, so they must not hold the request-scoped
+    session from ``get_db``; the session here is closed before any waiting.
+    """
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    token_data = decode_token(token)
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == token_data.user_id).first()
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        if not user.is_active:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+        snapshot = {"user_id": user.id}
+        if with_counts:
+            snapshot["unread_notifications"] = notification_service.get_unread_count(db, user.id)
+            snapshot["unread_messages"] = message_service.get_unread_count(db, user.id)
+        return snapshot
+    finally:
+        db.close()
+
+
+def _sse(message: Dict[str, Any]) -> str:
+    data = json.dumps(message["data"], ensure_ascii=False, default=str)
+    event_id = f"id: {message['id']}\n" if message.get("id") is not None else ""
+    return f"{event_id}event: {message['event']}\ndata: {data}\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    transport: str = Query("sse", pattern="^(sse|poll)$"),
+    since: Optional[int] = Query(None, ge=0, description="Last event id seen (long-poll cursor)"),
+    timeout: Optional[float] = Query(None, gt=0, le=60, description="Long-poll wait in seconds"),
+    token: Optional[str] = Query(None, description="JWT, for EventSource clients that cannot set headers"),
+    auth_header: Optional[str] = Depends(oauth2_scheme_optional),
+):
+    """推送通知与私信（SSE，或 transport=poll 长轮询）
+
+    SSE sends a ``hello`` event with the unread counts, then ``notification``
+    and ``message`` events as they happen and a comment line every
+    EVENT_STREAM_HEARTBEAT seconds. Reconnecting clients get the events after
+    ``Last-Event-ID`` replayed.
+
+    Long-poll returns ``{"events", "last_event_id"}`` as soon as there is an
+    event after ``since``, or an empty list after ``timeout`` seconds. The
+    first call (no ``since``) returns the unread counts and a cursor at once.
+    """
+    header_id = request.headers.get("last-event-id")
+    last_id = since
+    if last_id is None and header_id and header_id.isdigit():
+        last_id = int(header_id)
+    if last_id is not None and last_id > event_hub.last_id:
+        # Ids restart with the process; the client's cursor predates this one
+        last_id = None
+
+    # Token check and unread counts hit the database: keep them off the event loop
+    snapshot = await asyncio.to_thread(_open_stream, auth_header or token, last_id is None)
+    user_id = snapshot.pop("user_id")
+
+    if transport == "poll":
+        if last_id is None:
+            event_hub.watch(user_id)
+            return {"events": [], "last_event_id": event_hub.last_id, **snapshot}
+        async with event_hub.subscribe(user_id) as queue:
+            events = event_hub.since(user_id, last_id)
+            if not events:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=timeout or settings.EVENT_STREAM_POLL_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    message = None
+                if message is not None:
+                    events.append(message)
+                    while not queue.empty():
+                        message = queue.get_nowait()
+                        if message is not None:
+                            events.append(message)
+        return {
+            "events": events,
+            "last_event_id": events[-1]["id"] if events else last_id,
+        }
+
+    async def event_stream():
+        async with event_hub.subscribe(user_id) as queue:
+            yield "retry: 5000\n\n"
+            if last_id is None:
+                yield _sse({"id": event_hub.last_id, "event": "hello", "data": snapshot})
+            else:
+                for message in event_hub.since(user_id, last_id):
+                    yield _sse(message)
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.EVENT_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    break
+                yield _sse(message)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # Accept both with and without trailing slash
 @router.get("/", response_model=List[NotificationResponse])
 @router.get("", response_model=List[NotificationResponse], include_in_schema=False)
@@ -85,8 +210,11 @@ async def list_notifications(
         notification_type
     )
     
+    actors = user_profiles.load(db, (notif.actor_id for notif in notifications))
+
     result = []
     for notif in notifications:
+        actor_username, actor_avatar = actors.get(notif.actor_id, UNKNOWN_USER)
         result.append({
             "id": notif.id,
             "notification_type": notif.notification_type.value,
@@ -95,8 +223,8 @@ async def list_notifications(
             "is_read": notif.is_read,
             "created_at": format_datetime_with_timezone(notif.created_at),
             "actor_id": notif.actor_id,
-            "actor_username": notif.actor.username if notif.actor else None,
-            "actor_avatar": notif.actor.avatar_url if notif.actor else None,
+            "actor_username": actor_username,
+            "actor_avatar": actor_avatar,
             "resource_id": notif.resource_id,
             "resource_title": notif.resource.title if notif.resource else None,
         })
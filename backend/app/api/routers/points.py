@@ -3,8 +3,8 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
 
 from backend.app.core.security import get_current_admin, get_current_user
 from backend.app.db.session import get_db
@@ -15,6 +15,7 @@ from backend.app.schemas import (
     PointTransactionResponse,
 )
 from backend.app.services.operations import log_operation
+from backend.app.services.pagination import paginate_keyset
 from backend.app.services.points import add_points
 
 
@@ -125,18 +126,24 @@ async def admin_adjust_points(
 
 @router.get("/admin/transactions", response_model=List[PointTransactionResponse])
 async def admin_get_all_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     user_id: Optional[int] = None,
     transaction_type: Optional[TransactionType] = None,
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
-    """Return all transactions (admin only)."""
+    """Return all transactions (admin only), newest first, paged by cursor."""
 
-    query = db.query(PointTransaction)
+    query = db.query(PointTransaction).options(joinedload(PointTransaction.user))
     if user_id:
         query = query.filter(PointTransaction.user_id == user_id)
     if transaction_type:
         query = query.filter(PointTransaction.type == transaction_type)
-    return query.order_by(PointTransaction.created_at.desc()).offset(skip).limit(limit).all()
+
+    transactions, next_cursor = paginate_keyset(query, PointTransaction, limit, cursor, skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return transactions
@@ -2,7 +2,6 @@
 
 from datetime import datetime
 from typing import List, Optional
-from urllib.parse import quote
 
 from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
 from sqlalchemy import func
@@ -12,13 +11,21 @@ from backend.app.core.security import get_current_admin, get_current_user, get_c
 from backend.app.db.session import get_db
 from backend.app.models import (
     Resource, ResourceStatus, User, ResourceAttachment, 
-    NotificationType, UserRole, Category, PointTransaction, TransactionType,
+    NotificationType, UserRole, Category,
     Comment, ResourceLike
 )
 from backend.app.schemas import ResourceCreate, ResourceListResponse, ResourceResponse, ResourceUpdate, CategorizedResourcesResponse
+from backend.app.services.entitlements import AlreadyEntitled, entitlements
+from backend.app.services.notification_counters import notified_users, recount
+from backend.app.services.object_responses import download_response, is_resumed
 from backend.app.services.operations import log_operation
 from backend.app.services.points import deduct_points
+from backend.app.services.resource_cache import categorized_cache
+from backend.app.services.resource_files import add_attachment, set_resource_file
+from backend.app.services.resource_loader import load_categorized_resources, load_options, load_resource_detail
+from backend.app.services.search_index import search_index
 from backend.app.services.storage import storage
+from backend.app.services.view_counter import view_counter
 from backend.app.services import notification_service
 from backend.app.utils.text import create_slug
 from pydantic import BaseModel
@@ -51,17 +58,7 @@ async def purchase_resource(
         return PurchaseResponse(success=True, balance=current_user.points, message="Resource is free")
 
     # Check if already purchased
-    existing_purchase = (
-        db.query(PointTransaction)
-        .filter(
-            PointTransaction.user_id == current_user.id,
-            PointTransaction.type == TransactionType.PURCHASE,
-            PointTransaction.reference_id == f"resource_{resource.id}",
-        )
-        .first()
-    )
-
-    if existing_purchase:
+    if entitlements.is_entitled(db, current_user.id, resource.id):
         return PurchaseResponse(success=True, balance=current_user.points, message="Already purchased")
 
     # Admins don't need to pay
@@ -76,8 +73,13 @@ async def purchase_resource(
             amount=resource.points_required,
             description=f"Purchased resource: {resource.title}",
             reference_id=f"resource_{resource.id}",
+            resource_id=resource.id,
         )
         db.refresh(current_user)
+    except AlreadyEntitled:
+        # A concurrent request bought it first; this one charged nothing
+        db.refresh(current_user)
+        return PurchaseResponse(success=True, balance=current_user.points, message="Already purchased")
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
@@ -96,17 +98,13 @@ async def purchase_resource(
     )
 
     # Notify admins
-    admins = db.query(User).filter(User.role == UserRole.ADMIN).all()
-    for admin in admins:
-        if admin.id != current_user.id:
-            notification_service.create_notification(
-                db=db,
-                user_id=admin.id,
-                actor_id=current_user.id,
-                notification_type=NotificationType.DOWNLOAD,
-                resource_id=resource_id,
-                content=f"{current_user.username} 购买了资源《{resource.title}》"
-            )
+    notification_service.notify_admins(
+        db=db,
+        actor_id=current_user.id,
+        notification_type=NotificationType.DOWNLOAD,
+        resource_id=resource_id,
+        content=f"{current_user.username} 购买了资源《{resource.title}》"
+    )
 
     return PurchaseResponse(
         success=True,
@@ -128,7 +126,11 @@ async def list_resources(
 ):
     """List published resources with optional filters."""
 
-    query = db.query(Resource).filter(Resource.status == ResourceStatus.PUBLISHED)
+    query = (
+        db.query(Resource)
+        .options(*load_options(ResourceListResponse))
+        .filter(Resource.status == ResourceStatus.PUBLISHED)
+    )
 
     if status:
         query = query.filter(Resource.status == status)
@@ -159,6 +161,7 @@ async def get_hot_resources(limit: int = 6, db: Session = Depends(get_db)):
     order_column = func.coalesce(Resource.pinned_at, Resource.published_at, Resource.created_at)
     query = (
         db.query(Resource)
+        .options(*load_options(ResourceListResponse))
         .filter(Resource.status == ResourceStatus.PUBLISHED)
         .order_by(
             Resource.is_pinned.desc(),
@@ -177,30 +180,13 @@ async def get_categorized_resources(
     db: Session = Depends(get_db)
 ):
     """Return resources grouped by category."""
-    
-    categories = db.query(Category).filter(Category.is_active == True).order_by(Category.order).all()
-    
-    result = []
-    for category in categories:
-        resources = (
-            db.query(Resource)
-            .filter(
-                Resource.status == ResourceStatus.PUBLISHED,
-                Resource.category_id == category.id
-            )
-            .order_by(Resource.created_at.desc())
-            .limit(limit)
-            .all()
-        )
-        
-        if resources:
-            result.append({
-                "category_id": category.id,
-                "category_name": category.name,
-                "category_slug": category.slug,
-                "resources": resources
-            })
-            
+
+    cached = categorized_cache.get(limit)
+    if cached is not None:
+        return cached
+
+    result = load_categorized_resources(db, limit)
+    categorized_cache.set(limit, result)
     return result
 
 
@@ -213,52 +199,18 @@ async def get_resource(
 ):
     """Retrieve a resource by ID."""
 
-    resource = db.query(Resource).filter(Resource.id == resource_id).first()
+    resource = load_resource_detail(db, resource_id, current_user)
     if not resource:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
 
     if increment_views:
-        resource.views += 1
-        db.commit()
-    
-    # Check if user has purchased this resource or is admin
-    if current_user and not resource.is_free and resource.points_required > 0:
-        # Admins always have access
-        if current_user.role == UserRole.ADMIN:
-            resource.is_purchased_by_user = True
-        else:
-            existing_purchase = (
-                db.query(PointTransaction)
-                .filter(
-                    PointTransaction.user_id == current_user.id,
-                    PointTransaction.type == TransactionType.PURCHASE,
-                    PointTransaction.reference_id == f"resource_{resource.id}",
-                )
-                .first()
-            )
-            
-            # Add a flag to indicate if user has already purchased
-            # This will be available in the response via the schema
-            resource.is_purchased_by_user = bool(existing_purchase)
-    else:
-        resource.is_purchased_by_user = False
-    
-    # Get like and comment counts
-    resource.like_count = db.query(ResourceLike).filter(ResourceLike.resource_id == resource.id).count()
-    resource.comment_count = db.query(Comment).filter(Comment.resource_id == resource.id).count()
-    
-    # Check if current user has liked
-    if current_user:
-        user_like = (
-            db.query(ResourceLike)
-            .filter(ResourceLike.user_id == current_user.id, ResourceLike.resource_id == resource.id)
-            .first()
-        )
-        resource.is_liked_by_user = bool(user_like)
-    else:
-        resource.is_liked_by_user = False
-    
-    return resource
+        # Buffered and flushed in batches by the view counter task
+        view_counter.record(resource.id)
+
+    # Report views that are still waiting in the buffer, without dirtying the row
+    response = ResourceResponse.model_validate(resource)
+    response.views += view_counter.pending_for(resource.id)
+    return response
 
 
 @router.post("/", response_model=ResourceResponse, status_code=status.HTTP_201_CREATED)
@@ -291,6 +243,8 @@ async def create_resource(
     db.add(new_resource)
     db.commit()
     db.refresh(new_resource)
+    categorized_cache.invalidate()
+    search_index.index_resource(new_resource)
 
     log_operation(
         db=db,
@@ -330,7 +284,8 @@ async def update_resource(
         resource.pinned_at = datetime.utcnow() if is_pinned_value else None
 
     db.commit()
-    db.refresh(resource)
+    categorized_cache.invalidate()
+    search_index.index_resource(resource)
 
     log_operation(
         db=db,
@@ -342,7 +297,7 @@ async def update_resource(
         user_agent=request.headers.get("user-agent", ""),
     )
 
-    return resource
+    return load_resource_detail(db, resource_id, current_admin)
 
 
 @router.delete("/{resource_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -360,18 +315,24 @@ async def delete_resource(
 
     if resource.file_url and not resource.file_url.startswith("http"):
         try:
-            storage.delete_file(resource.file_url)
+            await storage.delete_file_async(resource.file_url)
         except Exception as exc:  # pragma: no cover
             print(f"Error deleting file: {exc}")
 
     if resource.thumbnail_url and not resource.thumbnail_url.startswith("http"):
         try:
-            storage.delete_file(resource.thumbnail_url)
+            await storage.delete_file_async(resource.thumbnail_url)
         except Exception as exc:  # pragma: no cover
             print(f"Error deleting thumbnail: {exc}")
 
+    recipients = notified_users(db, resource_id)
     db.delete(resource)
+    db.flush()
+    # Notifications about the resource are removed by ON DELETE CASCADE
+    recount(db, recipients)
     db.commit()
+    categorized_cache.invalidate()
+    search_index.remove_resource(resource_id)
 
     log_operation(
         db=db,
@@ -408,26 +369,22 @@ async def upload_resource_file(
     try:
         if resource.file_url and not resource.file_url.startswith("http"):
             try:
-                storage.delete_file(resource.file_url)
+                await storage.delete_file_async(resource.file_url)
             except Exception as exc:  # pragma: no cover
                 print(f"Error clearing old file: {exc}")
 
-        file_url = storage.upload_file(
+        file_url = await storage.upload_file_async(
             file_obj,
             file.filename or "attachment.bin",
             file.content_type,
             file_size_bytes,
             prefix=f"resources/{resource_id}",
         )
-        resource.file_url = file_url
-        extension = (file.filename or "").split(".")[-1] if file.filename and "." in file.filename else "bin"
-        resource.file_type = extension.upper()
-        resource.file_size = f"{file_size_bytes / (1024 * 1024):.2f} MB"
+        set_resource_file(resource, file_url, file.filename, file_size_bytes)
 
         db.commit()
-        db.refresh(resource)
 
-        return resource
+        return load_resource_detail(db, resource_id, current_admin)
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -454,35 +411,16 @@ async def upload_attachment(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file upload")
 
     try:
-        file_url = storage.upload_file(
+        file_url = await storage.upload_file_async(
             file_obj,
             file.filename or "attachment.bin",
             file.content_type,
             file_size_bytes,
             prefix=f"resources/{resource_id}/attachments",
         )
-        
-        extension = (file.filename or "").split(".")[-1] if file.filename and "." in file.filename else "bin"
-        file_size_str = f"{file_size_bytes / (1024 * 1024):.2f} MB"
-
-        attachment = ResourceAttachment(
-            resource_id=resource_id,
-            file_name=file.filename or "attachment",
-            file_url=file_url,
-            file_size=file_size_str,
-            file_type=extension.upper(),
-        )
-        db.add(attachment)
-        
-        # Update main resource file info if it's the first one or to keep it in sync
-        if not resource.file_url:
-            resource.file_url = file_url
-            resource.file_type = extension.upper()
-            resource.file_size = file_size_str
-
+        db.add(add_attachment(resource, file_url, file.filename, file_size_bytes))
         db.commit()
-        db.refresh(resource)
-        return resource
+        return load_resource_detail(db, resource_id, current_admin)
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -503,7 +441,7 @@ async def delete_attachment(
 
     if attachment.file_url and not attachment.file_url.startswith("http"):
         try:
-            storage.delete_file(attachment.file_url)
+            await storage.delete_file_async(attachment.file_url)
         except Exception as exc:
             print(f"Error deleting file: {exc}")
 
@@ -530,7 +468,7 @@ async def update_attachment(
     db.commit()
     
     # Return the updated resource
-    return attachment.resource
+    return load_resource_detail(db, attachment.resource_id, current_admin)
 
 
 # Removed redundant imports already at top
@@ -556,6 +494,7 @@ async def download_attachment(
             detail="Authentication required to download resources",
         )
 
+    purchased = False
     if resource.points_required > 0:
         # Check if already purchased or deduct points
         # Simplified: Deduct points if not admin
@@ -566,17 +505,8 @@ async def download_attachment(
              # For now we assume if they can access the resource page they can download?
              # Or we should re-verify purchase.
              # Let's assume if they paid for the resource, they can download all attachments.
-             # We need to check PointTransaction for the resource.
-             existing_purchase = (
-                db.query(PointTransaction)
-                .filter(
-                    PointTransaction.user_id == current_user.id,
-                    PointTransaction.type == TransactionType.PURCHASE,
-                    PointTransaction.reference_id == f"resource_{resource.id}",
-                )
-                .first()
-            )
-             if not existing_purchase:
+             # We need to check the resource's entitlements.
+             if not entitlements.is_entitled(db, current_user.id, resource.id):
                  # Deduct points
                  try:
                     deduct_points(
@@ -585,29 +515,34 @@ async def download_attachment(
                         amount=resource.points_required,
                         description=f"Downloaded resource: {resource.title}",
                         reference_id=f"resource_{resource.id}",
+                        resource_id=resource.id,
                     )
+                    purchased = True
+                 except AlreadyEntitled:
+                    pass
                  except ValueError as exc:
                     raise HTTPException(
                         status_code=status.HTTP_402_PAYMENT_REQUIRED,
                         detail=str(exc),
                     ) from exc
 
-    attachment.download_count += 1
-    resource.downloads += 1
-    db.commit()
-    
-    # Create notification for all admins
-    admins = db.query(User).filter(User.role == UserRole.ADMIN).all()
-    for admin in admins:
-        if admin.id != current_user.id:
-            notification_service.create_notification(
-                db=db,
-                user_id=admin.id,
-                actor_id=current_user.id,
-                notification_type=NotificationType.DOWNLOAD,
-                resource_id=resource.id,
-                content=f"{current_user.username} 下载了资源附件《{resource.title}》"
-            )
+    # A ranged request that continues an earlier one is not a new download,
+    # unless it is the purchase itself or the first download of the entitlement
+    first_download = entitlements.claim_first_download(db, current_user.id, resource.id)
+    resumed = bool(attachment.file_url) and await is_resumed(request, attachment.file_url)
+    if purchased or first_download or not resumed:
+        attachment.download_count += 1
+        resource.downloads += 1
+        db.commit()
+
+        # Create notification for all admins
+        notification_service.notify_admins(
+            db=db,
+            actor_id=current_user.id,
+            notification_type=NotificationType.DOWNLOAD,
+            resource_id=resource.id,
+            content=f"{current_user.username} 下载了资源附件《{resource.title}》"
+        )
 
     # Analytics... (omitted for brevity but should be added)
 
@@ -624,20 +559,12 @@ async def download_attachment(
                 "downloads": attachment.download_count,
             }
         else:
-            # MinIO file - stream through backend proxy
-            from fastapi.responses import StreamingResponse
-            
-            content_type, file_stream = storage.stream_file(attachment.file_url)
-            
-            encoded_filename = quote(attachment.file_name)
-            return StreamingResponse(
-                file_stream,
-                media_type=content_type or "application/octet-stream",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{attachment.file_name.encode("ascii", "ignore").decode("ascii")}"; filename*=utf-8\'\'{encoded_filename}',
-                    "X-User-Balance": str(current_user.points),
-                    "X-Download-Count": str(attachment.download_count),
-                }
+            # MinIO file - presigned URL or stream through backend proxy
+            return await download_response(
+                request,
+                attachment.file_url,
+                attachment.file_name,
+                {"balance": current_user.points, "downloads": attachment.download_count},
             )
     except Exception as exc:
         raise HTTPException(
@@ -664,11 +591,9 @@ async def download_resource(
             detail="Authentication required to download resources",
         )
 
-    if resource.points_required > 0:
-        
-        # Check if already purchased (if applicable) or deduct points
-        # For now, we deduct points every time unless we implement a 'purchased' check
-        # Assuming we want to deduct points:
+    purchased = False
+    if not entitlements.has_access(db, current_user, resource):
+        # Not purchased yet: deduct points, which also records the purchase
         try:
             deduct_points(
                 db=db,
@@ -676,52 +601,57 @@ async def download_resource(
                 amount=resource.points_required,
                 description=f"Downloaded resource: {resource.title}",
                 reference_id=f"resource_{resource.id}",
+                resource_id=resource.id,
             )
+            purchased = True
+        except AlreadyEntitled:
+            # Bought by a concurrent request; nothing was charged here
+            pass
         except ValueError as exc:
             raise HTTPException(
                 status_code=status.HTTP_402_PAYMENT_REQUIRED,
                 detail=str(exc),
             ) from exc
 
-    resource.downloads += 1
-    db.commit()
-    db.refresh(resource)
-    if current_user:
-        db.refresh(current_user)
+    # A ranged request that continues an earlier one is not a new download,
+    # unless it is the purchase itself or the first download of the entitlement
+    first_download = entitlements.claim_first_download(db, current_user.id, resource.id)
+    resumed = bool(resource.file_url) and await is_resumed(request, resource.file_url)
+    if purchased or first_download or not resumed:
+        resource.downloads += 1
+        db.commit()
+        db.refresh(resource)
+        if current_user:
+            db.refresh(current_user)
 
-    log_operation(
-        db=db,
-        user_id=current_user.id if current_user else None,
-        action="RESOURCE_DOWNLOAD",
-        resource_type="resource",
-        resource_id=str(resource_id),
-        ip_address=request.client.host if request.client else "0.0.0.0",
-        user_agent=request.headers.get("user-agent", ""),
-    )
+        log_operation(
+            db=db,
+            user_id=current_user.id if current_user else None,
+            action="RESOURCE_DOWNLOAD",
+            resource_type="resource",
+            resource_id=str(resource_id),
+            ip_address=request.client.host if request.client else "0.0.0.0",
+            user_agent=request.headers.get("user-agent", ""),
+        )
 
-    # Track download in analytics
-    from backend.app.services.analytics import analytics_service
-    analytics_service.log_download(
-        db=db,
-        resource_id=str(resource_id),
-        session_id=request.cookies.get("session_id") or "unknown",
-        ip_address=request.client.host if request.client else "0.0.0.0",
-        user_agent=request.headers.get("user-agent", ""),
-        user_id=current_user.id if current_user else None,
-    )
+        # Track download in analytics
+        from backend.app.services.analytics import analytics_service
+        analytics_service.log_download(
+            resource_id=str(resource_id),
+            session_id=request.cookies.get("session_id") or "unknown",
+            ip_address=request.client.host if request.client else "0.0.0.0",
+            user_agent=request.headers.get("user-agent", ""),
+            user_id=current_user.id if current_user else None,
+        )
 
-    # Create notification for all admins
-    admins = db.query(User).filter(User.role == UserRole.ADMIN).all()
-    for admin in admins:
-        if admin.id != current_user.id:
-            notification_service.create_notification(
-                db=db,
-                user_id=admin.id,
-                actor_id=current_user.id,
-                notification_type=NotificationType.DOWNLOAD,
-                resource_id=resource_id,
-                content=f"{current_user.username} 下载了资源《{resource.title}》"
-            )
+        # Create notification for all admins
+        notification_service.notify_admins(
+            db=db,
+            actor_id=current_user.id,
+            notification_type=NotificationType.DOWNLOAD,
+            resource_id=resource_id,
+            content=f"{current_user.username} 下载了资源《{resource.title}》"
+        )
 
     if not resource.file_url:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
@@ -736,21 +666,13 @@ async def download_resource(
                 "downloads": resource.downloads,
             }
         else:
-            # MinIO file - stream through backend proxy
-            from fastapi.responses import StreamingResponse
-            
-            content_type, file_stream = storage.stream_file(resource.file_url)
+            # MinIO file - presigned URL or stream through backend proxy
             filename = resource.file_url.split('/')[-1]
-            
-            encoded_filename = quote(filename)
-            return StreamingResponse(
-                file_stream,
-                media_type=content_type or "application/octet-stream",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{filename.encode("ascii", "ignore").decode("ascii")}"; filename*=utf-8\'\'{encoded_filename}',
-                    "X-User-Balance": str(current_user.points),
-                    "X-Download-Count": str(resource.downloads),
-                }
+            return await download_response(
+                request,
+                resource.file_url,
+                filename,
+                {"balance": current_user.points, "downloads": resource.downloads},
             )
     except Exception as exc:
         raise HTTPException(
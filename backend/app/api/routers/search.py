@@ -2,14 +2,16 @@
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from backend.app.core.security import get_current_user_optional
 from backend.app.db.session import get_db
 from backend.app.models import Resource, ResourceStatus, User
+from backend.app.schemas import ResourceListResponse
 from backend.app.services.analytics import analytics_service
+from backend.app.services.resource_loader import load_options
+from backend.app.services.search_index import search_index
 
 
 router = APIRouter(prefix="/api/search", tags=["Search"])
@@ -17,32 +19,30 @@ router = APIRouter(prefix="/api/search", tags=["Search"])
 
 @router.get("/resources")
 async def search_resources(
+    response: Response,
     q: str = Query(..., min_length=1, description="Search query"),
     category_id: Optional[int] = Query(None, description="Filter by category"),
     limit: int = Query(20, le=100, description="Maximum results"),
+    offset: int = Query(0, ge=0, description="Number of ranked results to skip"),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional),
 ) -> List[dict]:
-    """Search resources by title, description, tags, or content."""
+    """Search resources by title, description, tags, or content, ranked by relevance."""
     
-    # Build query
-    query = db.query(Resource).filter(Resource.status == ResourceStatus.PUBLISHED)
+    ranked_ids, total = search_index.search_ids(db, q, category_id, offset, limit)
+    response.headers["X-Total-Count"] = str(total)
     
-    # Search filter
-    search_filter = or_(
-        Resource.title.ilike(f"%{q}%"),
-        Resource.description.ilike(f"%{q}%"),
-        Resource.tags.ilike(f"%{q}%"),
-        Resource.content.ilike(f"%{q}%"),
-    )
-    query = query.filter(search_filter)
-    
-    # Category filter
-    if category_id:
-        query = query.filter(Resource.category_id == category_id)
-    
-    # Execute query
-    resources = query.order_by(Resource.views.desc()).limit(limit).all()
+    # Load the page of hits and restore ranking order
+    resources = []
+    if ranked_ids:
+        by_id = {
+            resource.id: resource
+            for resource in db.query(Resource)
+            .options(*load_options(ResourceListResponse))
+            .filter(Resource.id.in_(ranked_ids), Resource.status == ResourceStatus.PUBLISHED)
+            .all()
+        }
+        resources = [by_id[resource_id] for resource_id in ranked_ids if resource_id in by_id]
     
     # Log search activity
     try:
@@ -51,28 +51,41 @@ async def search_resources(
         user_agent = "unknown"
         
         analytics_service.log_search(
-            db=db,
             query=q,
             session_id=session_id,
             ip_address=ip_address,
             user_agent=user_agent,
             user_id=current_user.id if current_user else None,
-            results_count=len(resources),
+            results_count=total,
         )
     except Exception as e:
         print(f"Failed to log search: {e}")
     
+    # Sign all stored thumbnails in one batch; external URLs pass through
+    from backend.app.services.storage import storage
+
+    object_names = {
+        resource.thumbnail_url
+        for resource in resources
+        if resource.thumbnail_url and not resource.thumbnail_url.startswith("http")
+    }
+    signed_urls = {}
+    if object_names:
+        try:
+            signed_urls = storage.get_file_urls(object_names)
+        except Exception as exc:
+            print(f"[Search] Batch signing of {len(object_names)} thumbnails failed, signing one by one: {exc}")
+            # One bad object name must not leave the whole page unsigned
+            for object_name in object_names:
+                try:
+                    signed_urls[object_name] = storage.get_file_url(object_name)
+                except Exception as item_exc:
+                    print(f"[Search] Cannot sign thumbnail {object_name}: {item_exc}")
+
     # Format results
     results = []
-    from backend.app.services.storage import storage
-    
     for resource in resources:
-        thumbnail_url = resource.thumbnail_url
-        if thumbnail_url and not thumbnail_url.startswith("http"):
-            try:
-                thumbnail_url = storage.get_file_url(thumbnail_url)
-            except Exception:
-                pass
+        thumbnail_url = signed_urls.get(resource.thumbnail_url, resource.thumbnail_url)
 
         results.append({
             "id": resource.id,
@@ -90,3 +103,13 @@ async def search_resources(
         })
     
     return results
+
+
+@router.get("/suggest")
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=64, description="Typed prefix"),
+    limit: int = Query(10, ge=1, le=20, description="Maximum suggestions"),
+) -> List[dict]:
+    """Autocomplete article titles and tags from the in-memory prefix index."""
+
+    return search_index.suggest(q, limit)
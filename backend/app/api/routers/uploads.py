@@ -1,12 +1,18 @@
 """Generic upload and media serving endpoints."""
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy.orm import Session
 
 from backend.app.core.security import get_current_user
-from backend.app.models import User
+from backend.app.db.session import get_db
+from backend.app.models import Resource, UploadSession, User, UserRole
+from backend.app.schemas import ResourceResponse, UploadSessionCreate, UploadSessionResponse
+from backend.app.services.chunked_uploads import chunked_uploads
+from backend.app.services.object_responses import object_response
+from backend.app.services.resource_files import add_attachment, set_resource_file
+from backend.app.services.resource_loader import load_resource_detail
 from backend.app.services.storage import storage
 
 
@@ -39,7 +45,7 @@ async def upload_image(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload is not allowed")
 
     try:
-        object_name = storage.upload_file(
+        object_name = await storage.upload_file_async(
             file=file_obj,
             filename=file.filename or "image-upload",
             content_type=file.content_type,
@@ -76,7 +82,7 @@ async def upload_video(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload is not allowed")
 
     try:
-        object_name = storage.upload_file(
+        object_name = await storage.upload_file_async(
             file=file_obj,
             filename=file.filename or "video-upload",
             content_type=file.content_type,
@@ -129,7 +135,7 @@ async def batch_upload_files(
             else:
                 prefix = f"files/{current_user.id}"
             
-            object_name = storage.upload_file(
+            object_name = await storage.upload_file_async(
                 file=file_obj,
                 filename=file.filename or "file-upload",
                 content_type=file.content_type or "application/octet-stream",
@@ -164,15 +170,207 @@ async def batch_upload_files(
     }
 
 
+def _get_upload_session(db: Session, session_id: str, user: User) -> UploadSession:
+    session = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+    if not session or session.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return session
+
+
+async def _session_response(session: UploadSession) -> UploadSessionResponse:
+    try:
+        parts = await chunked_uploads.uploaded_parts(session)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+    return UploadSessionResponse(
+        id=session.id,
+        purpose=session.purpose,
+        resource_id=session.resource_id,
+        object_name=session.object_name,
+        filename=session.filename,
+        content_type=session.content_type,
+        total_size=session.total_size,
+        part_size=session.part_size,
+        part_count=chunked_uploads.part_count(session),
+        uploaded_parts=[part.part_number for part in parts],
+        uploaded_bytes=sum(part.size or 0 for part in parts),
+        created_at=session.created_at,
+        last_activity_at=session.last_activity_at,
+    )
+
+
+@router.post("/sessions", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    payload: UploadSessionCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Start a resumable upload.
+
+    Upload each part with ``PUT /sessions/{id}/parts/{n}`` (``part_size`` bytes,
+    the last part takes the rest), then ``POST /sessions/{id}/complete``. After
+    an interruption, ``GET /sessions/{id}`` lists the parts already stored.
+    Resource files and attachments are admin only.
+    """
+
+    if payload.purpose != "video":
+        if current_user.role != UserRole.ADMIN:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+        if not payload.resource_id or not db.query(Resource.id).filter(Resource.id == payload.resource_id).first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
+
+    try:
+        session = await chunked_uploads.start_session(
+            db,
+            current_user,
+            purpose=payload.purpose,
+            filename=payload.filename,
+            content_type=payload.content_type,
+            size=payload.size,
+            resource_id=payload.resource_id,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover - bubble up as HTTP error
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+    return await _session_response(session)
+
+
+@router.get("/sessions/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Return an upload session with the parts MinIO already holds."""
+
+    return await _session_response(_get_upload_session(db, session_id, current_user))
+
+
+@router.put("/sessions/{session_id}/parts/{part_number}")
+async def upload_session_part(
+    session_id: str,
+    part_number: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Store one part sent as the raw request body.
+
+    ``X-Chunk-SHA256`` (hex) is optional; when present the part is rejected
+    unless it matches.
+    """
+
+    session = _get_upload_session(db, session_id, current_user)
+    try:
+        expected = chunked_uploads.expected_part_length(session, part_number)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    # Never hold more than one part in memory, whatever the client sends
+    data = bytearray()
+    async for chunk in request.stream():
+        data.extend(chunk)
+        if len(data) > expected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Part {part_number} must be {expected} bytes",
+            )
+
+    try:
+        etag = await chunked_uploads.upload_part(db, session, part_number, bytes(data), x_chunk_sha256)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover - bubble up as HTTP error
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+    return {"part_number": part_number, "size": len(data), "etag": etag}
+
+
+@router.post("/sessions/{session_id}/complete")
+async def complete_upload_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Assemble the uploaded parts into the final object.
+
+    Resource uploads are recorded on the resource like the single-request
+    upload endpoints do, and the updated resource is returned with the object.
+    """
+
+    session = _get_upload_session(db, session_id, current_user)
+    purpose, resource_id = session.purpose, session.resource_id
+    filename, content_type, size = session.filename, session.content_type, session.total_size
+
+    resource = None
+    if purpose != "video":
+        resource = db.query(Resource).filter(Resource.id == resource_id).first()
+        if not resource:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
+
+    try:
+        object_name = await chunked_uploads.complete(db, session)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover - bubble up as HTTP error
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+    old_file = None
+    if purpose == "resource_file":
+        if resource.file_url and not resource.file_url.startswith("http"):
+            old_file = resource.file_url
+        set_resource_file(resource, object_name, filename, size)
+    elif purpose == "attachment":
+        db.add(add_attachment(resource, object_name, filename, size))
+    db.commit()
+
+    if old_file:
+        try:
+            await storage.delete_file_async(old_file)
+        except Exception as exc:  # pragma: no cover
+            print(f"Error clearing old file: {exc}")
+
+    result: Dict[str, Any] = {
+        "object_name": object_name,
+        "size": size,
+        "content_type": content_type,
+        "url": f"/api/uploads/{object_name}",
+    }
+    if resource is not None:
+        result["resource"] = ResourceResponse.model_validate(load_resource_detail(db, resource_id, current_user))
+    return result
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Abort an upload and discard its parts."""
+
+    session = _get_upload_session(db, session_id, current_user)
+    try:
+        await chunked_uploads.abort(db, session)
+    except Exception as exc:  # pragma: no cover - bubble up as HTTP error
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/{object_path:path}")
-async def get_uploaded_file(object_path: str):
-    """Proxy stored files so they can be accessed via the API domain."""
+async def get_uploaded_file(object_path: str, request: Request):
+    """Proxy stored files so they can be accessed via the API domain.
+
+    Supports Range requests for video seeking and ETag/Last-Modified revalidation;
+    small objects (images, thumbnails) are served from the local media cache.
+    """
 
     safe_path = _validate_object_path(object_path)
 
     try:
-        content_type, stream = storage.stream_file(safe_path)
+        return await object_response(request, safe_path, cache=True)
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
-
-    return StreamingResponse(stream, media_type=content_type or "application/octet-stream")
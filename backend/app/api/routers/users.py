@@ -9,7 +9,9 @@ from backend.app.core.security import get_current_admin, get_current_user
 from backend.app.db.session import get_db
 from backend.app.models import User, UserRole
 from backend.app.schemas import PointTransactionResponse, UserResponse, UserUpdate, UserRoleUpdate
+from backend.app.services.notification_service import admin_ids_cache
 from backend.app.services.operations import log_operation
+from backend.app.services.user_profiles import user_profiles
 
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
@@ -62,6 +64,7 @@ async def update_current_user(
 
     db.commit()
     db.refresh(current_user)
+    user_profiles.invalidate(current_user.id)
 
     log_operation(
         db=db,
@@ -139,6 +142,7 @@ async def update_user_role(
     user.role = role_data.role
     db.commit()
     db.refresh(user)
+    admin_ids_cache.invalidate()
 
     log_operation(
         db=db,
@@ -53,10 +53,77 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "resources"
     MINIO_SECURE: bool = False
+    MINIO_REGION: Optional[str] = None  # 设置后签名时不再请求 bucket 所在区域
+    PRESIGNED_URL_EXPIRES: int = 3600  # 秒
+    PRESIGNED_URL_CACHE_TTL: int = 3000  # 秒，需小于 PRESIGNED_URL_EXPIRES
+    PRESIGNED_URL_CACHE_SIZE: int = 10000
+    STORAGE_IO_THREADS: int = 16  # MinIO 上传/下载专用线程数，避免阻塞事件循环
+
+    # Resource downloads: "proxy" streams through the API, "presigned" hands out a
+    # short-lived MinIO URL (MINIO_ENDPOINT must then be reachable by clients)
+    DOWNLOAD_DELIVERY: str = "proxy"
+    DOWNLOAD_URL_EXPIRES: int = 300  # 秒
+
+    # Local disk cache for /api/uploads media (per worker process)
+    MEDIA_CACHE_DIR: str = ""  # 为空时使用系统临时目录
+    MEDIA_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # 0 表示关闭
+    MEDIA_CACHE_MAX_OBJECT_BYTES: int = 10 * 1024 * 1024  # 更大的对象（视频等）直接走 MinIO
+
+    # Resumable chunked uploads (MinIO multipart)
+    CHUNKED_UPLOAD_PART_SIZE: int = 8 * 1024 * 1024  # 除最后一片外每片大小，不能小于 5MB
+    CHUNKED_UPLOAD_MAX_SIZE: int = 20 * 1024 * 1024 * 1024
+    CHUNKED_UPLOAD_TTL: int = 86400  # 秒，超时未上传分片的会话会被中止
+    CHUNKED_UPLOAD_CLEANUP_INTERVAL: float = 3600.0  # 秒
 
     # System Config
     REGISTER_REWARD_POINTS: int = 300
 
+    # View counter write-behind buffer
+    VIEW_COUNTER_FLUSH_INTERVAL: float = 5.0  # 秒
+    VIEW_COUNTER_FLUSH_THRESHOLD: int = 500  # 累计多少次浏览立即刷盘
+
+    # Analytics ingestion queue
+    ANALYTICS_QUEUE_MAX_SIZE: int = 10000  # 队列满后新事件直接丢弃并计数
+    ANALYTICS_FLUSH_INTERVAL: float = 2.0  # 秒
+    ANALYTICS_FLUSH_BATCH_SIZE: int = 500
+    ANALYTICS_MAX_ATTEMPTS: int = 3  # 单行写入失败次数上限，超过后丢弃并记录
+
+    # Background jobs (notifications, operation logs): "memory" or "database" (durable, survives restarts)
+    JOB_QUEUE_BACKEND: str = "memory"
+    JOB_QUEUE_MAX_SIZE: int = 10000  # memory 队列满后直接在请求内写入
+    JOB_QUEUE_BATCH_SIZE: int = 200
+    JOB_QUEUE_POLL_INTERVAL: float = 1.0  # 秒
+    JOB_QUEUE_MAX_ATTEMPTS: int = 5
+
+    # Notification/message push stream (SSE + long-poll)
+    EVENT_STREAM_HEARTBEAT: float = 15.0  # 秒，SSE 心跳间隔
+    EVENT_STREAM_POLL_TIMEOUT: float = 25.0  # 秒，长轮询最长等待
+    EVENT_STREAM_BACKLOG: int = 50  # 每个用户保留的最近事件数，供重连/长轮询补发
+    EVENT_STREAM_MAX_CHANNELS: int = 20000
+    EVENT_STREAM_QUEUE_SIZE: int = 100  # 单个连接积压上限，超出丢弃最旧事件
+
+    # Author/actor name lookups for listings
+    USER_PROFILE_CACHE_TTL: int = 60  # 秒
+    USER_PROFILE_CACHE_SIZE: int = 10000
+
+    # Purchased-resource access checks
+    ENTITLEMENT_CACHE_SIZE: int = 10000  # 最多缓存多少个用户的已购资源
+
+    # Dashboard daily rollups
+    STATS_ROLLUP_INTERVAL: float = 300.0  # 秒
+    VISITOR_SKETCH_CACHE_TTL: int = 600  # 已结束日期的合并 HyperLogLog 缓存时间（秒）
+    VISITOR_SKETCH_MAX_PATHS: int = 1000  # 每天最多为多少个页面单独计数，其余只计入全站
+
+    # Resource like/comment counters
+    RESOURCE_COUNTER_RECONCILE_INTERVAL: float = 3600.0  # 秒，校正计数漂移
+
+    # Homepage categorized listing cache
+    CATEGORIZED_CACHE_TTL: int = 60  # 秒
+
+    # Full-text search: "auto" uses MySQL FULLTEXT when available, "memory" forces the in-process index
+    SEARCH_BACKEND: str = "auto"
+    SEARCH_SUGGEST_REFRESH_INTERVAL: float = 60.0  # 秒，重建联想词索引以看到其他 worker 的写入，0 表示关闭
+
     # CORS
     CORS_ORIGINS: List[str] = ["*"]  # 允许所有来源
     CORS_ALLOW_ORIGIN_REGEX: Optional[str] = None
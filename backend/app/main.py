@@ -10,6 +10,16 @@ from backend.app.core.config import get_settings
 from backend.app.db.session import SessionLocal, init_db
 from backend.app.models import Resource, User
 from backend.app.middleware import RateLimitMiddleware, IPBlocklistMiddleware
+from backend.app.services.analytics_queue import analytics_queue
+from backend.app.services.chunked_uploads import chunked_uploads
+from backend.app.services.event_hub import event_hub
+from backend.app.services.job_queue import job_queue
+from backend.app.services.media_cache import media_cache
+from backend.app.services.resource_counters import resource_counters
+from backend.app.services.search_index import search_index
+from backend.app.services.stats_rollup import stats_rollup
+from backend.app.services.storage import storage
+from backend.app.services.view_counter import view_counter
 from backend.init_db import seed_data
 
 
@@ -81,7 +91,42 @@ async def startup_event() -> None:
     except Exception as exc:  # pragma: no cover
         print(f"✗ Error initializing: {exc}")
 
+    db = SessionLocal()
+    try:
+        search_index.start(db)
+    except Exception as exc:  # pragma: no cover
+        print(f"✗ Error building search index: {exc}")
+    finally:
+        db.close()
 
+    try:
+        media_cache.load()
+    except OSError as exc:  # pragma: no cover
+        print(f"✗ Error loading media cache: {exc}")
+
+    view_counter.start()
+    analytics_queue.start()
+    stats_rollup.start()
+    resource_counters.start()
+    chunked_uploads.start()
+    job_queue.start()
+    event_hub.start()
+    search_index.start_refresh()
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Flush buffered counters before the process exits."""
+
+    event_hub.stop()
+    await search_index.stop()
+    await stats_rollup.stop()
+    await resource_counters.stop()
+    await chunked_uploads.stop()
+    await view_counter.stop()
+    await analytics_queue.stop()
+    await job_queue.stop()
+    storage.shutdown()
 
 
 @app.get("/")
@@ -99,6 +144,15 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now(timezone.utc).isoformat(),
+        "pending_view_increments": view_counter.pending,
+        "pending_analytics_events": analytics_queue.pending,
+        "dropped_analytics_events": analytics_queue.dropped,
+        "failed_analytics_events": analytics_queue.failed,
+        "job_queue": job_queue.stats(),
+        "event_stream": event_hub.stats(),
+        "storage": storage.stats(),
+        "media_cache": media_cache.stats(),
+        "chunked_uploads": chunked_uploads.stats(),
     }
 
 
@@ -5,7 +5,6 @@ import uuid
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from backend.app.db.session import SessionLocal
 from backend.app.services.analytics import analytics_service
 
 
@@ -16,7 +15,7 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         """Track page view before processing request."""
         
         # Skip tracking for static files, health checks, and API calls (except resource views)
-        skip_paths = ['/docs', '/redoc', '/openapi.json', '/health', '/static']
+        skip_paths = ['/docs', '/redoc', '/openapi.json', '/health', '/static', '/api/notifications/stream']
         if any(request.url.path.startswith(path) for path in skip_paths):
             return await call_next(request)
         
@@ -35,11 +34,9 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         user_agent = request.headers.get("user-agent", "")
         referrer = request.headers.get("referer")
         
-        # Track page view in database
-        db = SessionLocal()
+        # Queue page view for the batched analytics writer
         try:
             analytics_service.track_page_view(
-                db=db,
                 session_id=session_id,
                 page_path=str(request.url.path),
                 ip_address=ip_address,
@@ -50,8 +47,6 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         except Exception as e:
             # Don't fail the request if analytics fails
             print(f"Analytics tracking error: {e}")
-        finally:
-            db.close()
         
         # Process request
         response = await call_next(request)
@@ -4,14 +4,19 @@ import enum
 import uuid
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
@@ -82,7 +87,7 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_login = Column(DateTime(timezone=True))
 
@@ -149,6 +154,9 @@ class Resource(Base):
 
     views = Column(Integer, default=0)
     downloads = Column(Integer, default=0)
+    # 由点赞/评论接口原子增减，ResourceCounterReconciler 定期校正
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     status = Column(Enum(ResourceStatus), default=ResourceStatus.DRAFT)
     is_featured = Column(Boolean, default=False)
@@ -209,7 +217,7 @@ class PointTransaction(Base):
     description = Column(String(500))
     reference_id = Column(String(100), nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     user = relationship("User", back_populates="point_transactions")
 
@@ -218,6 +226,22 @@ class PointTransaction(Base):
         return self.user.username if self.user else None
 
 
+class ResourceEntitlement(Base):
+    """已购资源：每个用户对每篇付费资源最多一行，购买时与扣分流水同一事务写入"""
+    __tablename__ = "resource_entitlements"
+    __table_args__ = (
+        UniqueConstraint("user_id", "resource_id", name="uq_resource_entitlements_user_resource"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(CHAR(32), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    resource_id = Column(CHAR(32), ForeignKey("resources.id", ondelete="CASCADE"), nullable=False)
+    transaction_id = Column(Integer, ForeignKey("point_transactions.id", ondelete="SET NULL"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    first_downloaded_at = Column(DateTime(timezone=True), nullable=True)  # 首次下载时间，之后的断点续传不再计数
+
+
 class OperationLog(Base):
     __tablename__ = "operation_logs"
 
@@ -233,7 +257,7 @@ class OperationLog(Base):
 
     details = Column(Text, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     user = relationship("User", back_populates="operation_logs")
 
@@ -404,6 +428,33 @@ class ActivityLog(Base):
     resource = relationship("Resource")
 
 
+class DailyStats(Base):
+    """Per-day rollup of dashboard counters, kept current by the stats rollup job."""
+    __tablename__ = "daily_stats"
+
+    day = Column(Date, primary_key=True)  # UTC date
+
+    new_users = Column(Integer, nullable=False, default=0)
+    recharge_amount = Column(Integer, nullable=False, default=0)  # 分
+    visits = Column(Integer, nullable=False, default=0)
+    unique_sessions = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class VisitorSketch(Base):
+    """HyperLogLog sketch of the session ids seen on one day, site-wide or on one page."""
+    __tablename__ = "visitor_sketches"
+    __table_args__ = (UniqueConstraint("day", "page_path", name="uq_visitor_sketches_day_page"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)  # UTC date
+    page_path = Column(String(500), nullable=False, default="")  # "" = whole site
+    registers = Column(LargeBinary, nullable=False)  # HyperLogLog.to_bytes()
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class ResourceAttachment(Base):
     """Multiple file attachments for a single resource."""
     __tablename__ = "resource_attachments"
@@ -445,6 +496,17 @@ class Notification(Base):
     resource = relationship("Resource")
 
 
+class UserNotificationCounter(Base):
+    """每个用户每种通知类型的总数与未读数，与 notifications 的写入在同一事务内更新"""
+    __tablename__ = "user_notification_counters"
+
+    user_id = Column(CHAR(32), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    notification_type = Column(Enum(NotificationType), primary_key=True)
+
+    total = Column(Integer, nullable=False, default=0)
+    unread = Column(Integer, nullable=False, default=0)
+
+
 class Message(Base):
     """私信表"""
     __tablename__ = "messages"
@@ -462,6 +524,26 @@ class Message(Base):
     receiver = relationship("User", foreign_keys=[receiver_id])
 
 
+class Conversation(Base):
+    """私信会话汇总表：每对用户一行，user_low_id < user_high_id"""
+    __tablename__ = "conversations"
+    __table_args__ = (
+        UniqueConstraint("user_low_id", "user_high_id", name="uq_conversations_pair"),
+        Index("ix_conversations_low_last", "user_low_id", "last_message_at"),
+        Index("ix_conversations_high_last", "user_high_id", "last_message_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_low_id = Column(CHAR(32), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_high_id = Column(CHAR(32), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    last_message_id = Column(Integer, ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
+    last_message_at = Column(DateTime(timezone=True), nullable=True)
+
+    low_unread = Column(Integer, nullable=False, default=0)  # user_low_id 未读的消息数
+    high_unread = Column(Integer, nullable=False, default=0)  # user_high_id 未读的消息数
+
+
 class EmailStatus(str, enum.Enum):
     """邮件发送状态"""
     PENDING = "PENDING"
@@ -550,3 +632,38 @@ class WeChatLoginSession(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class BackgroundJob(Base):
+    """Durable job queue entry, used when JOB_QUEUE_BACKEND = "database"."""
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    attempts = Column(Integer, nullable=False, default=0)
+    failed = Column(Boolean, nullable=False, default=False)  # 重试次数用尽，保留以便排查
+    last_error = Column(Text, nullable=True)
+
+    available_at = Column(DateTime(timezone=True), nullable=False, index=True)  # UTC, retries wait until then
+    created_at = Column(DateTime(timezone=True), nullable=False)  # UTC enqueue time
+
+
+class UploadSession(Base):
+    """分片上传会话，对应 MinIO 的一个 multipart upload；已上传的分片以 MinIO 为准"""
+    __tablename__ = "upload_sessions"
+
+    id = Column(CHAR(32), primary_key=True, default=generate_uuid, index=True)
+    user_id = Column(CHAR(32), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    purpose = Column(String(20), nullable=False)  # 'video', 'resource_file' or 'attachment'
+    resource_id = Column(CHAR(32), ForeignKey("resources.id", ondelete="CASCADE"), nullable=True)
+
+    object_name = Column(String(500), nullable=False)
+    upload_id = Column(String(255), nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(255), nullable=True)
+    total_size = Column(BigInteger, nullable=False)
+    part_size = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)  # UTC
+    last_activity_at = Column(DateTime(timezone=True), nullable=False, index=True)  # UTC, 超时未活动的会话会被清理
@@ -483,9 +483,38 @@ class CommentResponse(BaseModel):
     username: Optional[str] = None
     avatar_url: Optional[str] = None
     replies: List['CommentResponse'] = Field(default_factory=list)
+    reply_count: int = 0  # direct replies in total; ``replies`` may be capped by reply_limit
 
     class Config:
         from_attributes = True
 
 
 CommentResponse.model_rebuild()
+
+
+# Chunked Upload Schemas
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: Optional[str] = None
+    size: int = Field(..., gt=0)
+    purpose: str = "video"  # 'video', 'resource_file' or 'attachment'
+    resource_id: Optional[str] = None  # UUID, required for resource purposes
+
+
+class UploadSessionResponse(BaseModel):
+    id: str  # UUID
+    purpose: str
+    resource_id: Optional[str]
+    object_name: str
+    filename: str
+    content_type: Optional[str]
+    total_size: int
+    part_size: int
+    part_count: int
+    uploaded_parts: List[int] = Field(default_factory=list)
+    uploaded_bytes: int = 0
+    created_at: datetime
+    last_activity_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -4,9 +4,8 @@ import json
 import uuid
 from typing import Optional
 
-from sqlalchemy.orm import Session
-
-from backend.app.models import ActionType, ActivityLog, VisitorAnalytics
+from backend.app.models import ActionType
+from backend.app.services.analytics_queue import analytics_queue
 
 
 def generate_session_id() -> str:
@@ -15,35 +14,36 @@ def generate_session_id() -> str:
 
 
 class AnalyticsService:
-    """Service for tracking visitor analytics and user activity."""
+    """Service for tracking visitor analytics and user activity.
+
+    Events are handed to ``analytics_queue`` and written in batches by its
+    background flush, so tracking never adds a commit to the request.
+    """
 
     @staticmethod
     def track_page_view(
-        db: Session,
         session_id: str,
         page_path: str,
         ip_address: str,
         user_agent: str,
         user_id: Optional[str] = None,
         referrer: Optional[str] = None,
-    ) -> VisitorAnalytics:
-        """Track a page view."""
-        analytics = VisitorAnalytics(
-            session_id=session_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            user_id=user_id,
-            page_path=page_path,
-            referrer=referrer,
+    ) -> bool:
+        """Queue a page view; returns False if the queue was full and it was dropped."""
+        return analytics_queue.enqueue(
+            "page_view",
+            {
+                "session_id": session_id,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "user_id": user_id,
+                "page_path": page_path,
+                "referrer": referrer,
+            },
         )
-        db.add(analytics)
-        db.commit()
-        db.refresh(analytics)
-        return analytics
 
     @staticmethod
     def log_activity(
-        db: Session,
         action_type: ActionType,
         session_id: str,
         ip_address: str,
@@ -51,34 +51,31 @@ class AnalyticsService:
         user_id: Optional[str] = None,
         resource_id: Optional[str] = None,
         metadata: Optional[dict] = None,
-    ) -> ActivityLog:
-        """Log a user activity."""
-        log = ActivityLog(
-            user_id=user_id,
-            session_id=session_id,
-            action_type=action_type,
-            resource_id=resource_id,
-            action_metadata=json.dumps(metadata) if metadata else None,
-            ip_address=ip_address,
-            user_agent=user_agent,
+    ) -> bool:
+        """Queue a user activity; returns False if the queue was full and it was dropped."""
+        return analytics_queue.enqueue(
+            "activity",
+            {
+                "user_id": user_id,
+                "session_id": session_id,
+                "action_type": action_type,
+                "resource_id": resource_id,
+                "action_metadata": json.dumps(metadata) if metadata else None,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            },
         )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
-        return log
 
     @staticmethod
     def log_article_view(
-        db: Session,
         resource_id: str,
         session_id: str,
         ip_address: str,
         user_agent: str,
         user_id: Optional[str] = None,
-    ) -> ActivityLog:
+    ) -> bool:
         """Log an article view."""
         return AnalyticsService.log_activity(
-            db=db,
             action_type=ActionType.ARTICLE_VIEW,
             session_id=session_id,
             ip_address=ip_address,
@@ -89,18 +86,16 @@ class AnalyticsService:
 
     @staticmethod
     def log_download(
-        db: Session,
         resource_id: str,
         session_id: str,
         ip_address: str,
         user_agent: str,
         user_id: Optional[str] = None,
         attachment_id: Optional[int] = None,
-    ) -> ActivityLog:
+    ) -> bool:
         """Log a file download."""
         metadata = {"attachment_id": attachment_id} if attachment_id else None
         return AnalyticsService.log_activity(
-            db=db,
             action_type=ActionType.DOWNLOAD,
             session_id=session_id,
             ip_address=ip_address,
@@ -112,18 +107,16 @@ class AnalyticsService:
 
     @staticmethod
     def log_search(
-        db: Session,
         query: str,
         session_id: str,
         ip_address: str,
         user_agent: str,
         user_id: Optional[str] = None,
         results_count: Optional[int] = None,
-    ) -> ActivityLog:
+    ) -> bool:
         """Log a search query."""
         metadata = {"query": query, "results_count": results_count}
         return AnalyticsService.log_activity(
-            db=db,
             action_type=ActionType.SEARCH,
             session_id=session_id,
             ip_address=ip_address,
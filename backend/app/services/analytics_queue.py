@@ -0,0 +1,222 @@
+"""Buffered, batched ingestion of visitor analytics and activity logs."""
+
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, insert
+from sqlalchemy.exc import OperationalError
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import engine
+from backend.app.models import ActivityLog, VisitorAnalytics
+from backend.app.services.visitor_sketches import visitor_sketches
+
+
+settings = get_settings()
+
+
+class AnalyticsIngestQueue:
+    """Accept analytics rows without touching the database and insert them in bulk.
+
+    Request handlers call ``enqueue`` and return immediately. A background task
+    drains the queue every ``flush_interval`` seconds, or as soon as
+    ``flush_batch_size`` rows are waiting, and writes each table with a single
+    executemany INSERT. The queue holds at most ``max_size`` rows; once full,
+    new rows are dropped and counted in ``dropped`` rather than blocking the
+    request or growing memory without bound.
+
+    Each table is written in its own transaction. When a bulk insert fails the
+    table's rows are retried one by one, so a single bad row (a user deleted
+    meanwhile, say) cannot hold back the others; a row that fails
+    ``max_attempts`` flushes is given up, counted in ``failed`` and kept in
+    ``dead_letters`` for inspection. Connection errors are not the rows'
+    fault: those batches go back on the queue without using up attempts.
+    """
+
+    TABLES = {
+        "page_view": VisitorAnalytics.__table__,
+        "activity": ActivityLog.__table__,
+    }
+
+    DEAD_LETTER_SIZE = 100
+
+    def __init__(self, max_size: int, flush_interval: float, flush_batch_size: int, max_attempts: int):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.max_attempts = max_attempts
+        # (kind, row, failed attempts so far)
+        self._rows: Deque[Tuple[str, Dict[str, Any], int]] = deque()
+        self._limits = {
+            kind: {
+                column.name: column.type.length
+                for column in table.columns
+                if isinstance(column.type, String) and column.type.length
+            }
+            for kind, table in self.TABLES.items()
+        }
+        self.dead_letters: Deque[Tuple[str, Dict[str, Any], str]] = deque(maxlen=self.DEAD_LETTER_SIZE)
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of rows accepted but not yet written."""
+        return len(self._rows)
+
+    def enqueue(self, kind: str, row: Dict[str, Any]) -> bool:
+        """Queue a row for ``kind`` ("page_view" or "activity"); return False if it was dropped."""
+
+        # Stamp the event time now; the row may reach the database seconds later
+        row.setdefault("created_at", datetime.utcnow())
+        # Client-supplied paths and user agents can exceed their columns (strict mode rejects them)
+        for name, length in self._limits[kind].items():
+            value = row.get(name)
+            if isinstance(value, str) and len(value) > length:
+                row[name] = value[:length]
+        with self._lock:
+            if len(self._rows) >= self.max_size:
+                self.dropped += 1
+                return False
+            self._rows.append((kind, row, 0))
+            should_flush = len(self._rows) >= self.flush_batch_size
+
+        loop, wakeup = self._loop, self._wakeup
+        if should_flush and wakeup is not None:
+            # enqueue may be called from a worker thread (sync endpoints)
+            loop.call_soon_threadsafe(wakeup.set)
+        return True
+
+    def _drain(self) -> List[Tuple[str, Dict[str, Any], int]]:
+        with self._lock:
+            batch = list(self._rows)
+            self._rows.clear()
+        return batch
+
+    def _restore(self, batch: List[Tuple[str, Dict[str, Any], int]]) -> None:
+        if not batch:
+            return
+        with self._lock:
+            room = max(self.max_size - len(self._rows), 0)
+            kept = batch[-room:] if room else []
+            self.dropped += len(batch) - len(kept)
+            self._rows.extendleft(reversed(kept))
+
+    def _insert(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        with engine.begin() as connection:
+            connection.execute(insert(self.TABLES[kind]), rows)
+
+    def _write_kind(
+        self, kind: str, entries: List[Tuple[Dict[str, Any], int]]
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Dict[str, Any], int]]]:
+        """Insert one table's rows; returns the rows written and the entries to retry."""
+
+        rows = [row for row, _ in entries]
+        try:
+            self._insert(kind, rows)
+            return rows, []
+        except OperationalError as exc:
+            print(f"[Analytics] Flush of {len(rows)} {kind} rows failed, kept pending: {exc}")
+            return [], [(kind, row, attempts) for row, attempts in entries]
+        except Exception as exc:
+            if len(entries) > 1:
+                print(f"[Analytics] Bulk insert of {kind} rows failed, retrying row by row: {exc}")
+
+        written: List[Dict[str, Any]] = []
+        retry: List[Tuple[str, Dict[str, Any], int]] = []
+        for index, (row, attempts) in enumerate(entries):
+            try:
+                self._insert(kind, [row])
+                written.append(row)
+            except OperationalError as exc:
+                print(f"[Analytics] Flush of {kind} rows failed, kept pending: {exc}")
+                retry.extend((kind, pending, tries) for pending, tries in entries[index:])
+                break
+            except Exception as exc:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    self.failed += 1
+                    self.dead_letters.append((kind, row, str(exc)))
+                    print(f"[Analytics] Giving up on {kind} row after {attempts} attempts: {exc}")
+                else:
+                    retry.append((kind, row, attempts))
+        return written, retry
+
+    def flush(self) -> int:
+        """Write every queued row and return how many were inserted.
+
+        Page views are also folded into the unique-visitor sketches once
+        their rows are committed.
+        """
+
+        batch = self._drain()
+        if not batch:
+            if visitor_sketches.has_pending:
+                visitor_sketches.persist()
+            return 0
+
+        grouped: Dict[str, List[Tuple[Dict[str, Any], int]]] = {}
+        for kind, row, attempts in batch:
+            grouped.setdefault(kind, []).append((row, attempts))
+
+        written: Dict[str, List[Dict[str, Any]]] = {}
+        retry: List[Tuple[str, Dict[str, Any], int]] = []
+        for kind, entries in grouped.items():
+            written[kind], failed = self._write_kind(kind, entries)
+            retry.extend(failed)
+        self._restore(retry)
+
+        count = sum(len(rows) for rows in written.values())
+        self.written += count
+        if written.get("page_view"):
+            visitor_sketches.observe(written["page_view"])
+        if visitor_sketches.has_pending:
+            visitor_sketches.persist()
+        return count
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.flush)
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            print("[Analytics] Ingest queue started")
+
+    async def stop(self) -> None:
+        """Cancel the flush task and write out anything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+            self._loop = None
+        written = await asyncio.to_thread(self.flush)
+        print(f"[Analytics] Shutdown, flushed {written} queued rows ({self.dropped} dropped)")
+
+
+analytics_queue = AnalyticsIngestQueue(
+    max_size=settings.ANALYTICS_QUEUE_MAX_SIZE,
+    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL,
+    flush_batch_size=settings.ANALYTICS_FLUSH_BATCH_SIZE,
+    max_attempts=settings.ANALYTICS_MAX_ATTEMPTS,
+)
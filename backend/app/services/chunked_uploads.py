@@ -0,0 +1,281 @@
+"""Resumable chunked uploads backed by MinIO multipart uploads."""
+
+import asyncio
+import hashlib
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from minio.datatypes import Part
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.models import UploadSession, User
+from backend.app.services.storage import storage
+
+
+settings = get_settings()
+
+# S3 rejects parts below 5 MiB (except the last) and uploads of more than 10000 parts
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+PURPOSES = ("video", "resource_file", "attachment")
+
+# Where start_session puts objects; the orphan sweep never looks elsewhere in the bucket
+OBJECT_PREFIXES = ("videos/", "resources/")
+
+
+class ChunkedUploads:
+    """Upload sessions whose parts go straight into a MinIO multipart upload.
+
+    A session fixes the object name, total size and part size up front. Each
+    ``PUT`` of a part is held in memory only up to the part size and handed to
+    MinIO as one ``UploadPart``; nothing is spooled to local disk, and MinIO's
+    own part listing is the record of what has arrived, so a client that lost
+    its connection asks for the session and resends only the missing parts.
+
+    Sessions left without activity for ``ttl`` seconds are aborted by a
+    periodic cleanup. It also aborts multipart uploads under this feature's
+    ``OBJECT_PREFIXES`` that no session knows about (e.g. after the row was
+    lost in a crash) and that started more than ``ttl`` seconds ago, long
+    after any ``put_object`` upload to the same prefixes would have finished.
+    """
+
+    def __init__(self, part_size: int, max_size: int, ttl: int, interval: float):
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.started = 0
+        self.parts = 0
+        self.bytes = 0
+        self.completed = 0
+        self.aborted = 0
+        self.expired = 0
+
+    def _part_size_for(self, total_size: int) -> int:
+        part_size = max(self.part_size, math.ceil(total_size / MAX_PARTS))
+        # Whole MiB keeps part boundaries easy to compute for clients
+        return math.ceil(part_size / (1024 * 1024)) * 1024 * 1024
+
+    @staticmethod
+    def part_count(session: UploadSession) -> int:
+        return max(math.ceil(session.total_size / session.part_size), 1)
+
+    def expected_part_length(self, session: UploadSession, part_number: int) -> int:
+        """Size the given part must have; every part but the last is ``part_size``."""
+
+        count = self.part_count(session)
+        if not 1 <= part_number <= count:
+            raise ValueError(f"Part number must be between 1 and {count}")
+        if part_number < count:
+            return session.part_size
+        return session.total_size - session.part_size * (count - 1)
+
+    async def start_session(
+        self,
+        db: Session,
+        user: User,
+        purpose: str,
+        filename: str,
+        content_type: Optional[str],
+        size: int,
+        resource_id: Optional[str] = None,
+    ) -> UploadSession:
+        """Create the multipart upload and its session row."""
+
+        if purpose not in PURPOSES:
+            raise ValueError(f"Unknown upload purpose: {purpose}")
+        if size <= 0:
+            raise ValueError("Empty upload is not allowed")
+        if size > self.max_size:
+            raise ValueError(f"Upload exceeds the maximum size of {self.max_size} bytes")
+
+        if purpose == "video":
+            if not content_type or not content_type.startswith("video/"):
+                raise ValueError("Only video uploads are allowed")
+            prefix = f"videos/{user.id}"
+        elif resource_id is None:
+            raise ValueError("resource_id is required for resource uploads")
+        elif purpose == "resource_file":
+            prefix = f"resources/{resource_id}"
+        else:
+            prefix = f"resources/{resource_id}/attachments"
+
+        object_name, upload_id = await storage.offload(
+            storage.create_multipart_upload, filename, content_type, prefix
+        )
+        now = datetime.utcnow()
+        session = UploadSession(
+            user_id=user.id,
+            purpose=purpose,
+            resource_id=resource_id if purpose != "video" else None,
+            object_name=object_name,
+            upload_id=upload_id,
+            filename=filename,
+            content_type=content_type,
+            total_size=size,
+            part_size=self._part_size_for(size),
+            created_at=now,
+            last_activity_at=now,
+        )
+        db.add(session)
+        db.commit()
+        db.refresh(session)
+        self.started += 1
+        return session
+
+    @staticmethod
+    def _store_part(object_name: str, upload_id: str, part_number: int, data: bytes, checksum: Optional[str]) -> str:
+        if checksum is not None and hashlib.sha256(data).hexdigest() != checksum.strip().lower():
+            raise ValueError("Part checksum does not match")
+        return storage.upload_part(object_name, upload_id, part_number, data)
+
+    async def upload_part(
+        self,
+        db: Session,
+        session: UploadSession,
+        part_number: int,
+        data: bytes,
+        checksum: Optional[str] = None,
+    ) -> str:
+        """Store one part and return its ETag.
+
+        ``checksum`` is the hex SHA-256 of the part as the client computed
+        it; a mismatch rejects the part before it reaches MinIO. Sending the
+        same part number again replaces the earlier copy.
+        """
+
+        expected = self.expected_part_length(session, part_number)
+        if len(data) != expected:
+            raise ValueError(f"Part {part_number} must be {expected} bytes, got {len(data)}")
+
+        # Hashing 8 MiB is CPU work too: keep it off the event loop with the upload
+        etag = await storage.offload(
+            self._store_part, session.object_name, session.upload_id, part_number, data, checksum
+        )
+        session.last_activity_at = datetime.utcnow()
+        db.commit()
+        self.parts += 1
+        self.bytes += len(data)
+        return etag
+
+    async def uploaded_parts(self, session: UploadSession) -> List[Part]:
+        return await storage.offload(storage.list_parts, session.object_name, session.upload_id)
+
+    async def complete(self, db: Session, session: UploadSession) -> str:
+        """Assemble the object once every part is present and return its name.
+
+        The session row is deleted in the caller's transaction, so the caller
+        commits it together with whatever records the new object.
+        """
+
+        parts = await self.uploaded_parts(session)
+        count = self.part_count(session)
+        received = {part.part_number: part for part in parts}
+        missing = [number for number in range(1, count + 1) if number not in received]
+        if missing:
+            raise ValueError(f"Missing parts: {missing[:20]}")
+        for number in range(1, count + 1):
+            if received[number].size != self.expected_part_length(session, number):
+                raise ValueError(f"Part {number} has the wrong size")
+
+        ordered = [Part(number, received[number].etag) for number in range(1, count + 1)]
+        await storage.offload(storage.complete_multipart_upload, session.object_name, session.upload_id, ordered)
+        db.delete(session)
+        self.completed += 1
+        return session.object_name
+
+    async def abort(self, db: Session, session: UploadSession) -> None:
+        """Discard the uploaded parts and the session."""
+
+        await storage.offload(storage.abort_multipart_upload, session.object_name, session.upload_id)
+        db.delete(session)
+        db.commit()
+        self.aborted += 1
+
+    def cleanup(self, db: Session) -> Tuple[int, int]:
+        """Abort expired sessions and untracked stale multipart uploads under ``OBJECT_PREFIXES``.
+
+        Returns how many sessions and how many orphaned uploads were aborted.
+        """
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        expired = 0
+        for session in db.query(UploadSession).filter(UploadSession.last_activity_at < cutoff).all():
+            try:
+                storage.abort_multipart_upload(session.object_name, session.upload_id)
+            except Exception as exc:
+                print(f"[ChunkedUploads] Cannot abort {session.object_name}: {exc}")
+                continue
+            db.delete(session)
+            expired += 1
+        db.commit()
+        self.expired += expired
+
+        known = {upload_id for (upload_id,) in db.query(UploadSession.upload_id).all()}
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        orphans = 0
+        for prefix in OBJECT_PREFIXES:
+            for object_name, upload_id, initiated in storage.list_multipart_uploads(prefix):
+                if upload_id in known or initiated is None:
+                    continue
+                if initiated.tzinfo is None:
+                    initiated = initiated.replace(tzinfo=timezone.utc)
+                if initiated < stale_before:
+                    storage.abort_multipart_upload(object_name, upload_id)
+                    orphans += 1
+        return expired, orphans
+
+    def _cleanup_job(self) -> None:
+        db = SessionLocal()
+        try:
+            sessions, orphans = self.cleanup(db)
+            if sessions or orphans:
+                print(f"[ChunkedUploads] Aborted {sessions} expired sessions, {orphans} orphaned uploads")
+        except Exception as exc:
+            print(f"[ChunkedUploads] Cleanup failed: {exc}")
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self._cleanup_job)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the periodic cleanup task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            print("[ChunkedUploads] Cleanup task started")
+
+    async def stop(self) -> None:
+        """Cancel the cleanup task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "started": self.started,
+            "parts": self.parts,
+            "bytes": self.bytes,
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "expired": self.expired,
+        }
+
+
+chunked_uploads = ChunkedUploads(
+    part_size=settings.CHUNKED_UPLOAD_PART_SIZE,
+    max_size=settings.CHUNKED_UPLOAD_MAX_SIZE,
+    ttl=settings.CHUNKED_UPLOAD_TTL,
+    interval=settings.CHUNKED_UPLOAD_CLEANUP_INTERVAL,
+)
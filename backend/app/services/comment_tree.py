@@ -0,0 +1,96 @@
+"""Comment thread assembly from one comments query and one author lookup."""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.app.models import Comment
+from backend.app.services.user_profiles import UNKNOWN_USER, user_profiles
+
+
+def load_comment_tree(
+    db: Session,
+    resource_id: str,
+    parent_id: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    reply_limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Return the comments of ``resource_id`` as nested ``CommentResponse`` dicts.
+
+    All comments of the resource are read in one query ordered oldest first,
+    their authors through ``user_profiles`` (at most one query), and the tree is linked in a single
+    pass, so the statement count does not depend on thread size or depth.
+
+    Top-level comments come newest first, replies oldest first, as before.
+    With ``parent_id`` the replies of that comment are returned instead of the
+    top-level list. ``skip``/``limit`` page that list; ``reply_limit`` caps
+    the replies embedded under every node, and ``reply_count`` tells the
+    client how many there are in total.
+    """
+
+    rows = (
+        db.query(
+            Comment.id,
+            Comment.user_id,
+            Comment.resource_id,
+            Comment.content,
+            Comment.parent_id,
+            Comment.created_at,
+            Comment.updated_at,
+        )
+        .filter(Comment.resource_id == resource_id)
+        .order_by(Comment.created_at.asc(), Comment.id.asc())
+        .all()
+    )
+
+    authors = user_profiles.load(db, (row.user_id for row in rows))
+
+    nodes: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        username, avatar_url = authors.get(row.user_id, UNKNOWN_USER)
+        nodes[row.id] = {
+            "id": row.id,
+            "user_id": row.user_id,
+            "resource_id": row.resource_id,
+            "content": row.content,
+            "parent_id": row.parent_id,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "username": username,
+            "avatar_url": avatar_url,
+            "replies": [],
+            "reply_count": 0,
+        }
+
+    # Rows are oldest first, so appending keeps every reply list in order
+    roots: List[Dict[str, Any]] = []
+    for row in rows:
+        node = nodes[row.id]
+        if row.parent_id is None:
+            roots.append(node)
+        elif row.parent_id in nodes and row.parent_id != row.id:
+            # Replies whose parent is missing were never reachable; keep it that way
+            nodes[row.parent_id]["replies"].append(node)
+    roots.reverse()
+
+    for node in nodes.values():
+        node["reply_count"] = len(node["replies"])
+
+    if parent_id is None:
+        selected = roots
+    elif parent_id in nodes:
+        selected = nodes[parent_id]["replies"]
+    else:
+        selected = []
+
+    end = skip + limit if limit is not None else None
+    selected = selected[skip:end]
+
+    if reply_limit is not None:
+        stack = list(selected)
+        while stack:
+            node = stack.pop()
+            node["replies"] = node["replies"][:reply_limit]
+            stack.extend(node["replies"])
+    return selected
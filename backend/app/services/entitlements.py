@@ -0,0 +1,161 @@
+"""Purchased-resource access checks backed by resource_entitlements."""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.models import PointTransaction, Resource, ResourceEntitlement, TransactionType, User, UserRole
+
+
+settings = get_settings()
+
+
+class AlreadyEntitled(ValueError):
+    """The user already owns the resource they are being charged for."""
+
+
+class EntitlementCache:
+    """Answer "has this user bought this resource?" with a point lookup at most.
+
+    Entitlements are never revoked while the resource exists, so every
+    positive answer is cached per user (LRU of ``max_users`` users) and stays
+    valid across worker processes. A miss is confirmed against the unique
+    ``(user_id, resource_id)`` index before anyone is charged again.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._owned: "OrderedDict[str, Set[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.lookups = 0
+
+    def _cached(self, user_id: str, resource_id: str) -> bool:
+        with self._lock:
+            owned = self._owned.get(user_id)
+            if owned is not None and resource_id in owned:
+                self._owned.move_to_end(user_id)
+                self.hits += 1
+                return True
+            return False
+
+    def remember(self, user_id: str, resource_id: str) -> None:
+        with self._lock:
+            self._owned.setdefault(user_id, set()).add(resource_id)
+            self._owned.move_to_end(user_id)
+            while len(self._owned) > self.max_users:
+                self._owned.popitem(last=False)
+
+    def is_entitled(self, db: Session, user_id: str, resource_id: str) -> bool:
+        if self._cached(user_id, resource_id):
+            return True
+        with self._lock:
+            self.lookups += 1
+        found = (
+            db.query(ResourceEntitlement.id)
+            .filter(ResourceEntitlement.user_id == user_id, ResourceEntitlement.resource_id == resource_id)
+            .first()
+        )
+        if found is None:
+            return False
+        self.remember(user_id, resource_id)
+        return True
+
+    def has_access(self, db: Session, user: Optional[User], resource: Resource) -> bool:
+        """Free resources, admins and buyers may read and download ``resource``."""
+        if resource.is_free or not resource.points_required:
+            return True
+        if user is None:
+            return False
+        return user.role == UserRole.ADMIN or self.is_entitled(db, user.id, resource.id)
+
+    def grant(
+        self,
+        db: Session,
+        user_id: str,
+        resource_id: str,
+        transaction: Optional[PointTransaction] = None,
+    ) -> None:
+        """Record an entitlement in the caller's transaction; the caller commits.
+
+        Raises ``AlreadyEntitled`` when the user owns the resource already,
+        including when a concurrent purchase reached the unique
+        ``(user_id, resource_id)`` key first. The caller must then roll back
+        rather than commit the charge that came with this grant.
+        """
+        if self.is_entitled(db, user_id, resource_id):
+            raise AlreadyEntitled("Resource already purchased")
+        try:
+            with db.begin_nested():
+                db.add(ResourceEntitlement(
+                    user_id=user_id,
+                    resource_id=resource_id,
+                    transaction_id=transaction.id if transaction is not None else None,
+                ))
+        except IntegrityError as exc:
+            self.remember(user_id, resource_id)
+            raise AlreadyEntitled("Resource already purchased") from exc
+
+    def claim_first_download(self, db: Session, user_id: str, resource_id: str) -> bool:
+        """Mark the entitlement as downloaded; True only for the first download.
+
+        The conditional UPDATE runs in the caller's transaction, so of two
+        concurrent first downloads exactly one claims it once both commit.
+        Users without an entitlement (free resources, admins) never claim.
+        """
+        result = db.execute(
+            update(ResourceEntitlement)
+            .where(
+                ResourceEntitlement.user_id == user_id,
+                ResourceEntitlement.resource_id == resource_id,
+                ResourceEntitlement.first_downloaded_at.is_(None),
+            )
+            .values(first_downloaded_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._owned.clear()
+            else:
+                self._owned.pop(user_id, None)
+
+    def backfill(self, db: Session) -> int:
+        """Create entitlements for purchases recorded only in the points ledger."""
+
+        prefix = "resource_"
+        purchases = (
+            db.query(PointTransaction.user_id, PointTransaction.reference_id, PointTransaction.id)
+            .filter(
+                PointTransaction.type == TransactionType.PURCHASE,
+                PointTransaction.reference_id.like(f"{prefix}%"),
+            )
+            .order_by(PointTransaction.id.asc())
+        )
+        existing = {
+            (user_id, resource_id)
+            for user_id, resource_id in db.query(ResourceEntitlement.user_id, ResourceEntitlement.resource_id)
+        }
+        resource_ids = {resource_id for (resource_id,) in db.query(Resource.id)}
+
+        written = 0
+        for user_id, reference_id, transaction_id in purchases:
+            key = (user_id, reference_id[len(prefix):])
+            if key in existing or key[1] not in resource_ids:
+                continue
+            existing.add(key)
+            db.add(ResourceEntitlement(user_id=key[0], resource_id=key[1], transaction_id=transaction_id))
+            written += 1
+        db.commit()
+        return written
+
+
+entitlements = EntitlementCache(max_users=settings.ENTITLEMENT_CACHE_SIZE)
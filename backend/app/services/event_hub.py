@@ -0,0 +1,150 @@
+"""In-process pub/sub hub that pushes per-user events to streaming clients."""
+
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from backend.app.core.config import get_settings
+
+
+settings = get_settings()
+
+
+class _Channel:
+    __slots__ = ("recent", "subscribers")
+
+    def __init__(self, backlog: int):
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=backlog)
+        self.subscribers: Set[asyncio.Queue] = set()
+
+
+class EventHub:
+    """Fan events out to the SSE and long-poll connections of each user.
+
+    ``publish`` may be called from any thread (sync endpoints run in the
+    thread pool, job handlers in the job queue's thread); delivery always
+    happens on the event loop, so a subscriber costs one small asyncio.Queue
+    and no database session.
+
+    Every event gets a process-wide increasing ``id``. The last ``backlog``
+    events of each user with a recent subscriber are kept so long-poll
+    clients and reconnecting SSE clients (``Last-Event-ID``) can ask for
+    everything after the id they last saw. Channels are kept for at most
+    ``max_channels`` users, least recently used first out. Users nobody is
+    listening for cost nothing: their events are not retained.
+    """
+
+    def __init__(self, backlog: int, max_channels: int, queue_size: int):
+        self.backlog = backlog
+        self.max_channels = max_channels
+        self.queue_size = queue_size
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self.last_id = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(channel.subscribers) for channel in self._channels.values())
+
+    def start(self) -> None:
+        """Bind the hub to the running event loop; publishing before this is a no-op."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+    def stop(self) -> None:
+        self._loop = None
+        self._loop_thread = None
+        for channel in self._channels.values():
+            for queue in channel.subscribers:
+                self._put(queue, None)
+
+    def publish(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Push ``event`` to every open stream of ``user_id``."""
+
+        loop = self._loop
+        if loop is None or not user_id:
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._deliver(user_id, event, data)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._deliver, user_id, event, data)
+            except RuntimeError:
+                # Loop already closed during shutdown
+                pass
+
+    def _put(self, queue: asyncio.Queue, item: Optional[Dict[str, Any]]) -> None:
+        if queue.full():
+            # A stalled client loses its oldest events instead of growing memory
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(item)
+
+    def _deliver(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
+        channel = self._channels.get(user_id)
+        if channel is None:
+            return
+        self.last_id += 1
+        message = {"id": self.last_id, "event": event, "data": data}
+        channel.recent.append(message)
+        self.published += 1
+        for queue in channel.subscribers:
+            self._put(queue, message)
+
+    def _channel(self, user_id: str) -> _Channel:
+        channel = self._channels.get(user_id)
+        if channel is None:
+            channel = self._channels[user_id] = _Channel(self.backlog)
+        self._channels.move_to_end(user_id)
+        # Evict idle channels only; a user with an open stream always keeps theirs
+        for key in list(self._channels):
+            if len(self._channels) <= self.max_channels:
+                break
+            if not self._channels[key].subscribers:
+                del self._channels[key]
+        return channel
+
+    def watch(self, user_id: str) -> None:
+        """Start (or keep) retaining ``user_id``'s events for a client that polls."""
+        self._channel(user_id)
+
+    def since(self, user_id: str, last_id: int) -> List[Dict[str, Any]]:
+        """Return the retained events of ``user_id`` newer than ``last_id``."""
+
+        channel = self._channel(user_id)
+        return [message for message in channel.recent if message["id"] > last_id]
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Yield a queue that receives ``user_id``'s events until the block exits.
+
+        A ``None`` item means the hub is shutting down.
+        """
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        channel = self._channel(user_id)
+        channel.subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            channel.subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "channels": len(self._channels),
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+event_hub = EventHub(
+    backlog=settings.EVENT_STREAM_BACKLOG,
+    max_channels=settings.EVENT_STREAM_MAX_CHANNELS,
+    queue_size=settings.EVENT_STREAM_QUEUE_SIZE,
+)
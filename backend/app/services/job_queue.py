@@ -0,0 +1,427 @@
+"""Background job queue for writes that do not need to finish inside the request."""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine import Connection
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import engine
+from backend.app.models import BackgroundJob
+
+
+settings = get_settings()
+
+# A handler writes every payload of its kind in the batch using the given transaction
+JobHandler = Callable[[Connection, List[Dict[str, Any]]], None]
+# Called with the payloads whose writes have been committed (e.g. to update caches)
+AfterCommitHook = Callable[[List[Dict[str, Any]]], None]
+
+
+class Job:
+    """One queued unit of work; ``id`` is only set for jobs stored in ``background_jobs``."""
+
+    __slots__ = ("id", "kind", "payload", "attempts", "enqueued_at", "available_at", "error", "failed")
+
+    def __init__(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        enqueued_at: float,
+        attempts: int = 0,
+        id: Optional[int] = None,
+    ):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.enqueued_at = enqueued_at
+        self.available_at = enqueued_at
+        self.error: Optional[str] = None
+        self.failed = False
+
+
+class MemoryJobBackend:
+    """Jobs live in a deque inside this process; anything still queued at a crash is lost."""
+
+    name = "memory"
+    durable = False
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._jobs: Deque[Job] = deque()
+        self._lock = threading.Lock()
+
+    def put(self, kind: str, payload: Dict[str, Any]) -> bool:
+        with self._lock:
+            if len(self._jobs) >= self.max_size:
+                return False
+            self._jobs.append(Job(kind, payload, time.time()))
+            return True
+
+    def process(self, limit: int, run: Callable[[Connection, List[Job]], List[Job]]) -> int:
+        now = time.time()
+        batch: List[Job] = []
+        with self._lock:
+            # Jobs waiting out a retry delay rotate to the back
+            for _ in range(len(self._jobs)):
+                if len(batch) >= limit:
+                    break
+                job = self._jobs.popleft()
+                if job.available_at <= now:
+                    batch.append(job)
+                else:
+                    self._jobs.append(job)
+        if not batch:
+            return 0
+
+        try:
+            with engine.begin() as connection:
+                retry = run(connection, batch)
+        except Exception:
+            with self._lock:
+                self._jobs.extendleft(reversed(batch))
+            raise
+        with self._lock:
+            self._jobs.extend(retry)
+        return len(batch)
+
+    def depth(self) -> int:
+        return len(self._jobs)
+
+    def oldest_enqueued_at(self) -> Optional[float]:
+        with self._lock:
+            return min((job.enqueued_at for job in self._jobs), default=None)
+
+
+class DatabaseJobBackend:
+    """Jobs are rows of ``background_jobs``, so they survive restarts and are shared by workers.
+
+    A batch is claimed with ``SELECT ... FOR UPDATE`` (``SKIP LOCKED`` where the
+    server supports it, so several app processes can drain the table side by
+    side) and deleted in the transaction its handlers write in: a job's effects
+    and its removal commit together.
+    """
+
+    name = "database"
+    durable = True
+
+    def __init__(self):
+        self._skip_locked: Optional[bool] = None
+
+    def _supports_skip_locked(self, connection: Connection) -> bool:
+        if self._skip_locked is None:
+            dialect = connection.dialect
+            version = dialect.server_version_info or ()
+            if dialect.name == "mysql":
+                minimum = (10, 6) if getattr(dialect, "is_mariadb", False) else (8, 0, 1)
+                self._skip_locked = version >= minimum
+            else:
+                self._skip_locked = dialect.name == "postgresql"
+        return self._skip_locked
+
+    def put(self, kind: str, payload: Dict[str, Any]) -> bool:
+        now = datetime.utcnow()
+        with engine.begin() as connection:
+            connection.execute(
+                BackgroundJob.__table__.insert().values(
+                    kind=kind,
+                    payload=json.dumps(payload),
+                    attempts=0,
+                    failed=False,
+                    available_at=now,
+                    created_at=now,
+                )
+            )
+        return True
+
+    def process(self, limit: int, run: Callable[[Connection, List[Job]], List[Job]]) -> int:
+        table = BackgroundJob.__table__
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(table)
+                .where(table.c.failed == False, table.c.available_at <= datetime.utcnow())
+                .order_by(table.c.id)
+                .limit(limit)
+                .with_for_update(skip_locked=self._supports_skip_locked(connection))
+            ).all()
+            if not rows:
+                return 0
+
+            batch = [
+                Job(row.kind, json.loads(row.payload), _timestamp(row.created_at), row.attempts, row.id)
+                for row in rows
+            ]
+            retry = run(connection, batch)
+            retry_ids = {job.id for job in retry}
+
+            done = [job.id for job in batch if job.id not in retry_ids]
+            if done:
+                connection.execute(delete(table).where(table.c.id.in_(done)))
+            for job in retry:
+                connection.execute(
+                    update(table)
+                    .where(table.c.id == job.id)
+                    .values(
+                        attempts=job.attempts,
+                        available_at=datetime.utcfromtimestamp(job.available_at),
+                        # Jobs out of attempts stay in the table for inspection
+                        failed=job.failed,
+                        last_error=job.error,
+                    )
+                )
+        return len(batch)
+
+    def depth(self) -> int:
+        table = BackgroundJob.__table__
+        with engine.connect() as connection:
+            return connection.execute(
+                select(func.count()).select_from(table).where(table.c.failed == False)
+            ).scalar() or 0
+
+    def oldest_enqueued_at(self) -> Optional[float]:
+        table = BackgroundJob.__table__
+        with engine.connect() as connection:
+            oldest = connection.execute(
+                select(func.min(table.c.created_at)).where(table.c.failed == False)
+            ).scalar()
+        return _timestamp(oldest) if oldest else None
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    """Naive UTC datetime -> epoch seconds."""
+
+    if value is None:
+        return time.time()
+    return (value.replace(tzinfo=None) - datetime(1970, 1, 1)) / timedelta(seconds=1)
+
+
+class JobQueue:
+    """Run registered job handlers outside the request that enqueued the work.
+
+    Callers ``enqueue`` a kind and a JSON-serializable payload and return
+    immediately. A background task wakes on every enqueue (or every
+    ``poll_interval`` seconds), takes up to ``batch_size`` ready jobs, groups
+    them by kind and hands each group to its handler in one transaction.
+
+    When a group fails, its jobs are retried one by one so a single bad
+    payload cannot hold back the rest. A job that still fails waits
+    ``2 ** attempts`` seconds before its next try and is given up after
+    ``max_attempts``; the database backend keeps such jobs flagged as failed.
+
+    If the memory backend is full, or the worker is not running (scripts,
+    tests), the handler runs inline instead so the write is never lost.
+
+    A kind may also register an ``after_commit`` hook, which sees exactly the
+    payloads whose writes were committed, once each.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        max_size: int,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+    ):
+        if backend == "database":
+            self.backend = DatabaseJobBackend()
+        else:
+            self.backend = MemoryJobBackend(max_size)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._handlers: Dict[str, JobHandler] = {}
+        self._after_commit: Dict[str, AfterCommitHook] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.inline = 0
+        self.last_lag = 0.0
+
+    def register(self, kind: str, handler: JobHandler, after_commit: Optional[AfterCommitHook] = None) -> None:
+        self._handlers[kind] = handler
+        if after_commit is not None:
+            self._after_commit[kind] = after_commit
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Queue ``payload`` for the handler registered under ``kind``."""
+
+        if kind not in self._handlers:
+            raise KeyError(f"No job handler registered for {kind!r}")
+
+        if (self._task is None and not self.backend.durable) or not self.backend.put(kind, payload):
+            self.inline += 1
+            with engine.begin() as connection:
+                self._handlers[kind](connection, [payload])
+            self._run_after_commit(kind, [payload])
+            return
+
+        loop, wakeup = self._loop, self._wakeup
+        if wakeup is not None:
+            # enqueue may be called from a worker thread (sync endpoints)
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _run_group(self, connection: Connection, kind: str, jobs: List[Job]) -> None:
+        with connection.begin_nested():
+            self._handlers[kind](connection, [job.payload for job in jobs])
+
+    def _run_after_commit(self, kind: str, payloads: List[Dict[str, Any]]) -> None:
+        hook = self._after_commit.get(kind)
+        if hook is None or not payloads:
+            return
+        try:
+            hook(payloads)
+        except Exception as exc:
+            print(f"[JobQueue] after_commit hook for {kind} failed: {exc}")
+
+    def _run_batch(self, connection: Connection, batch: List[Job], done: List[Job]) -> List[Job]:
+        """Run ``batch`` inside ``connection``'s transaction; return the jobs to try again later.
+
+        Jobs whose handler succeeded are appended to ``done``.
+        """
+
+        now = time.time()
+        self.last_lag = max(now - job.enqueued_at for job in batch)
+
+        groups: Dict[str, List[Job]] = {}
+        for job in batch:
+            groups.setdefault(job.kind, []).append(job)
+
+        retry: List[Job] = []
+        given_up: List[Job] = []
+        for kind, jobs in groups.items():
+            try:
+                self._run_group(connection, kind, jobs)
+                self.processed += len(jobs)
+                done.extend(jobs)
+                continue
+            except Exception as exc:
+                if len(jobs) == 1:
+                    jobs[0].error = str(exc)
+                    failing = jobs
+                else:
+                    failing = []
+                    for job in jobs:
+                        try:
+                            self._run_group(connection, kind, [job])
+                            self.processed += 1
+                            done.append(job)
+                        except Exception as job_exc:
+                            job.error = str(job_exc)
+                            failing.append(job)
+
+            for job in failing:
+                job.attempts += 1
+                if job.attempts >= self.max_attempts:
+                    job.failed = True
+                    given_up.append(job)
+                    print(f"[JobQueue] Giving up on {kind} job after {job.attempts} attempts: {job.error}")
+                else:
+                    job.available_at = now + min(2 ** job.attempts, 300)
+                    retry.append(job)
+
+        self.retried += len(retry)
+        self.failed += len(given_up)
+        if self.backend.durable:
+            # The database backend deletes only finished jobs and flags the rest
+            return retry + given_up
+        return retry
+
+    def process(self) -> int:
+        """Run one batch of ready jobs; returns how many were taken off the queue."""
+
+        done: List[Job] = []
+        try:
+            taken = self.backend.process(
+                self.batch_size,
+                lambda connection, batch: self._run_batch(connection, batch, done),
+            )
+        except Exception as exc:
+            print(f"[JobQueue] Batch failed, jobs kept queued: {exc}")
+            return 0
+
+        committed: Dict[str, List[Dict[str, Any]]] = {}
+        for job in done:
+            committed.setdefault(job.kind, []).append(job.payload)
+        for kind, payloads in committed.items():
+            self._run_after_commit(kind, payloads)
+        return taken
+
+    def drain(self) -> int:
+        """Process batches until no ready job is left; returns how many jobs were taken."""
+
+        total = 0
+        while True:
+            taken = self.process()
+            total += taken
+            if taken < self.batch_size:
+                return total
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and processing lag, for ``/health``."""
+
+        try:
+            depth = self.backend.depth()
+            oldest = self.backend.oldest_enqueued_at()
+        except Exception:
+            depth, oldest = None, None
+        return {
+            "backend": self.backend.name,
+            "depth": depth,
+            "oldest_job_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "last_batch_lag_seconds": round(self.last_lag, 3),
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "ran_inline": self.inline,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.drain)
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            print(f"[JobQueue] Worker started ({self.backend.name} backend)")
+
+    async def stop(self) -> None:
+        """Cancel the worker and run whatever is ready before the process exits."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+            self._loop = None
+        taken = await asyncio.to_thread(self.drain)
+        print(f"[JobQueue] Shutdown, ran {taken} queued jobs ({self.backend.depth()} left)")
+
+
+job_queue = JobQueue(
+    backend=settings.JOB_QUEUE_BACKEND,
+    max_size=settings.JOB_QUEUE_MAX_SIZE,
+    batch_size=settings.JOB_QUEUE_BATCH_SIZE,
+    poll_interval=settings.JOB_QUEUE_POLL_INTERVAL,
+    max_attempts=settings.JOB_QUEUE_MAX_ATTEMPTS,
+)
@@ -0,0 +1,363 @@
+"""Size-bounded local disk cache for small, hot MinIO objects."""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, BinaryIO, Dict, Optional
+
+from backend.app.core.config import get_settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+settings = get_settings()
+
+
+class CachedObject:
+    """Metadata of one cached object; the bytes live in ``path``."""
+
+    __slots__ = ("object_name", "path", "size", "etag", "last_modified", "content_type")
+
+    def __init__(
+        self,
+        object_name: str,
+        path: str,
+        size: int,
+        etag: Optional[str],
+        last_modified: Optional[datetime],
+        content_type: Optional[str],
+    ):
+        self.object_name = object_name
+        self.path = path
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "object_name": self.object_name,
+            "size": self.size,
+            "etag": self.etag,
+            "last_modified": self.last_modified.isoformat() if self.last_modified else None,
+            "content_type": self.content_type,
+        }
+
+
+class MediaCache:
+    """LRU of object bytes on local disk, bounded by ``max_bytes`` in total.
+
+    Objects up to ``max_object_bytes`` are written while they are first
+    streamed to a client (``tee``), into a temp file that is renamed into
+    place only once complete, so readers never see a partial file. A JSON
+    sidecar next to each file keeps ETag, Last-Modified and content type, so
+    hits need no MinIO round trip at all and the cache survives restarts.
+
+    Uploaded object names are unique and never overwritten, so entries only
+    leave through eviction or ``discard`` when the object is deleted. The
+    byte budget applies per worker process, and so does the directory: each
+    worker locks its own ``worker-N`` slot under ``base_directory`` in
+    ``load``, so eviction never unlinks files another worker still indexes,
+    and a restarted worker picks up a free slot's files again.
+
+    A delete is handled by one worker only, so ``discard`` unlinks the
+    object's files from every slot. The other workers notice on their next
+    hit: a file that has disappeared drops the entry and the request falls
+    back to MinIO, which no longer has the object either.
+    """
+
+    MAX_SLOTS = 64
+
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int):
+        self.base_directory = directory
+        self.directory: Optional[str] = None
+        self._slot_lock: Optional[BinaryIO] = None
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._entries: "OrderedDict[str, CachedObject]" = OrderedDict()
+        self._filling = set()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.directory is not None
+
+    @staticmethod
+    def _relative_path(object_name: str) -> str:
+        digest = hashlib.sha256(object_name.encode("utf-8")).hexdigest()
+        return os.path.join(digest[:2], digest)
+
+    def _path(self, object_name: str) -> str:
+        return os.path.join(self.directory, self._relative_path(object_name))
+
+    def _claim_directory(self) -> str:
+        """Lock the first free ``worker-N`` slot; the lock lasts as long as the process."""
+
+        if fcntl is None:
+            # Without flock there is no multi-worker deployment to guard against
+            return os.path.join(self.base_directory, "worker-0")
+        for slot in range(self.MAX_SLOTS):
+            directory = os.path.join(self.base_directory, f"worker-{slot}")
+            os.makedirs(directory, exist_ok=True)
+            handle = open(os.path.join(directory, ".lock"), "wb")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                continue
+            self._slot_lock = handle
+            return directory
+        raise OSError(f"All {self.MAX_SLOTS} media cache slots in {self.base_directory} are in use")
+
+    def load(self) -> None:
+        """Claim this process's cache directory and index the files a previous run left there."""
+
+        if self.max_bytes <= 0 or self.directory is not None:
+            return
+        directory = self._claim_directory()
+        found = []
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if name == ".lock":
+                    continue
+                if name.endswith(".tmp") or not name.endswith(".json") and name + ".json" not in names:
+                    # Interrupted fill
+                    os.unlink(path)
+                    continue
+                if not name.endswith(".json"):
+                    continue
+                data_path = path[: -len(".json")]
+                try:
+                    with open(path, encoding="utf-8") as sidecar:
+                        meta = json.load(sidecar)
+                    object_name = meta["object_name"]
+                    stat = os.stat(data_path)
+                except (OSError, ValueError, KeyError):
+                    self._unlink(path)
+                    self._unlink(data_path)
+                    continue
+                last_modified = meta.get("last_modified")
+                entry = CachedObject(
+                    object_name=object_name,
+                    path=data_path,
+                    size=stat.st_size,
+                    etag=meta.get("etag"),
+                    last_modified=datetime.fromisoformat(last_modified) if last_modified else None,
+                    content_type=meta.get("content_type"),
+                )
+                found.append((stat.st_atime, entry))
+
+        found.sort(key=lambda item: item[0])
+        self.directory = directory
+        with self._lock:
+            for _, entry in found:
+                self._entries[entry.object_name] = entry
+                self.total_bytes += entry.size
+        self._evict()
+        print(f"[MediaCache] Loaded {len(self._entries)} cached objects ({self.total_bytes} bytes) from {directory}")
+
+    def get(self, object_name: str) -> Optional[CachedObject]:
+        with self._lock:
+            entry = self._entries.get(object_name)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(object_name)
+            self.hits += 1
+            return entry
+
+    def admits(self, size: Optional[int]) -> bool:
+        return self.enabled and size is not None and 0 < size <= min(self.max_object_bytes, self.max_bytes)
+
+    async def tee(
+        self,
+        object_name: str,
+        size: int,
+        etag: Optional[str],
+        last_modified: Optional[datetime],
+        content_type: Optional[str],
+        chunks: AsyncIterator[bytes],
+    ) -> AsyncIterator[bytes]:
+        """Pass ``chunks`` through while writing them to the cache.
+
+        Only one request fills a given object; concurrent misses stream
+        without writing. A fill that ends early or short is thrown away.
+        """
+
+        with self._lock:
+            if object_name in self._filling or object_name in self._entries:
+                claimed = False
+            else:
+                self._filling.add(object_name)
+                claimed = True
+        if not claimed:
+            async for data in chunks:
+                yield data
+            return
+
+        path = self._path(object_name)
+        handle = None
+        temp_path = None
+        written = 0
+        try:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                handle = os.fdopen(fd, "wb")
+            except OSError as exc:
+                print(f"[MediaCache] Cannot cache {object_name}: {exc}")
+            async for data in chunks:
+                if handle is not None:
+                    try:
+                        await asyncio.to_thread(handle.write, data)
+                    except OSError as exc:
+                        # Disk trouble must not break the response itself
+                        print(f"[MediaCache] Cannot cache {object_name}: {exc}")
+                        handle.close()
+                        handle = None
+                written += len(data)
+                yield data
+            if handle is not None and written == size:
+                handle.close()
+                handle = None
+                entry = CachedObject(object_name, path, size, etag, last_modified, content_type)
+                try:
+                    await asyncio.to_thread(self._commit, entry, temp_path)
+                    temp_path = None
+                except OSError as exc:
+                    print(f"[MediaCache] Cannot cache {object_name}: {exc}")
+        finally:
+            if handle is not None:
+                handle.close()
+            if temp_path is not None:
+                self._unlink(temp_path)
+            with self._lock:
+                self._filling.discard(object_name)
+
+    def _commit(self, entry: CachedObject, temp_path: str) -> None:
+        meta_fd, meta_temp = tempfile.mkstemp(dir=os.path.dirname(entry.path), suffix=".tmp")
+        with os.fdopen(meta_fd, "w", encoding="utf-8") as sidecar:
+            json.dump(entry.to_json(), sidecar)
+        # Data first: a sidecar is only ever visible next to a complete file
+        os.replace(temp_path, entry.path)
+        os.replace(meta_temp, entry.path + ".json")
+        with self._lock:
+            previous = self._entries.pop(entry.object_name, None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self._entries[entry.object_name] = entry
+            self.total_bytes += entry.size
+            self.fills += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        evicted = []
+        with self._lock:
+            while self.total_bytes > self.max_bytes and self._entries:
+                _, entry = self._entries.popitem(last=False)
+                self.total_bytes -= entry.size
+                self.evictions += 1
+                evicted.append(entry)
+        for entry in evicted:
+            self._unlink(entry.path + ".json")
+            self._unlink(entry.path)
+
+    def discard(self, object_name: str) -> None:
+        """Forget a deleted object here and remove its files from every worker's slot."""
+
+        with self._lock:
+            entry = self._entries.pop(object_name, None)
+            if entry is not None:
+                self.total_bytes -= entry.size
+        if entry is not None:
+            self._unlink(entry.path + ".json")
+            self._unlink(entry.path)
+        if self.max_bytes <= 0:
+            return
+        relative = self._relative_path(object_name)
+        try:
+            slots = [name for name in os.listdir(self.base_directory) if name.startswith("worker-")]
+        except FileNotFoundError:
+            return
+        for slot in slots:
+            path = os.path.join(self.base_directory, slot, relative)
+            self._unlink(path + ".json")
+            self._unlink(path)
+
+    def _forget(self, entry: CachedObject) -> None:
+        """Drop an entry whose file vanished from under us."""
+        with self._lock:
+            if self._entries.get(entry.object_name) is entry:
+                del self._entries[entry.object_name]
+                self.total_bytes -= entry.size
+        self._unlink(entry.path + ".json")
+
+    def stat(self, entry: CachedObject) -> Optional[os.stat_result]:
+        """``os.stat`` of the cached file, or None (and the entry dropped) if it is gone."""
+        try:
+            return os.stat(entry.path)
+        except FileNotFoundError:
+            self._forget(entry)
+            return None
+
+    def open(self, entry: CachedObject) -> Optional[BinaryIO]:
+        """Open the cached file, or return None (and drop the entry) if it is gone."""
+        try:
+            return open(entry.path, "rb")
+        except FileNotFoundError:
+            self._forget(entry)
+            return None
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    async def read(self, handle: BinaryIO, offset: int, length: int, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        """Yield ``length`` bytes of a file opened with ``open`` from ``offset``, then close it."""
+
+        try:
+            await asyncio.to_thread(handle.seek, offset)
+            remaining = length
+            while remaining > 0:
+                data = await asyncio.to_thread(handle.read, min(chunk_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+        finally:
+            handle.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fills": self.fills,
+            "evictions": self.evictions,
+        }
+
+
+media_cache = MediaCache(
+    directory=settings.MEDIA_CACHE_DIR or os.path.join(tempfile.gettempdir(), "erhaoxiaoming-media-cache"),
+    max_bytes=settings.MEDIA_CACHE_MAX_BYTES,
+    max_object_bytes=settings.MEDIA_CACHE_MAX_OBJECT_BYTES,
+)
@@ -1,11 +1,41 @@
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
-from backend.app.models import Message, User
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, case, func, or_, select, update
+from backend.app.models import Conversation, Message, User
 from backend.app.schemas.message import MessageCreate
+from backend.app.services.event_hub import event_hub
+
+
+def _ordered_pair(user_a: str, user_b: str) -> Tuple[str, str]:
+    return (user_a, user_b) if user_a < user_b else (user_b, user_a)
+
 
 class MessageService:
+    def _conversation_id(self, db: Session, user_a: str, user_b: str) -> int:
+        """Return the id of the pair's conversation row, creating it on first contact."""
+        low, high = _ordered_pair(user_a, user_b)
+        lookup = db.query(Conversation.id).filter(
+            Conversation.user_low_id == low,
+            Conversation.user_high_id == high
+        )
+        conversation_id = lookup.scalar()
+        if conversation_id is not None:
+            return conversation_id
+        try:
+            with db.begin_nested():
+                conversation = Conversation(user_low_id=low, user_high_id=high, low_unread=0, high_unread=0)
+                db.add(conversation)
+            return conversation.id
+        except IntegrityError:
+            # Both users messaged each other for the first time concurrently. A
+            # plain read would reuse this transaction's REPEATABLE READ snapshot
+            # and miss the other row; a locking read sees the committed one.
+            conversation_id = lookup.with_for_update().scalar()
+            if conversation_id is None:
+                raise RuntimeError(f"Conversation between {low} and {high} vanished after a duplicate insert")
+            return conversation_id
+
     def send_message(self, db: Session, sender_id: str, message_in: MessageCreate) -> Message:
         db_message = Message(
             sender_id=sender_id,
@@ -14,58 +44,68 @@ class MessageService:
             is_read=False
         )
         db.add(db_message)
+        db.flush()
+
+        # Same transaction as the message; the counter update is atomic in SQL
+        conversation_id = self._conversation_id(db, sender_id, message_in.receiver_id)
+        receiver_is_low = message_in.receiver_id < sender_id
+        unread_column = Conversation.low_unread if receiver_is_low else Conversation.high_unread
+        is_newer = or_(Conversation.last_message_id.is_(None), Conversation.last_message_id < db_message.id)
+        created_at = select(Message.created_at).where(Message.id == db_message.id).scalar_subquery()
+        db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values({
+                unread_column: unread_column + 1,
+                Conversation.last_message_at: case((is_newer, created_at), else_=Conversation.last_message_at),
+                Conversation.last_message_id: case((is_newer, db_message.id), else_=Conversation.last_message_id),
+            })
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
         db.refresh(db_message)
+        event_hub.publish(db_message.receiver_id, "message", {
+            "id": db_message.id,
+            "sender_id": sender_id,
+            "content": db_message.content,
+        })
         return db_message
 
     def get_conversations(self, db: Session, user_id: str) -> List[Dict[str, Any]]:
         """
         Get a list of conversations for the user.
-        This is a bit complex in SQL. We need to find all unique users communicated with,
-        and get the last message and unread count for each.
+        One query over the conversations summary table, newest first, joined
+        to the peer and the last message.
         """
-        # Subquery to find the latest message ID for each conversation pair
-        # This is a simplified approach: find all messages involving the user
-        
-        # 1. Find all users who have exchanged messages with current user
-        sent_to = db.query(Message.receiver_id).filter(Message.sender_id == user_id).distinct()
-        received_from = db.query(Message.sender_id).filter(Message.receiver_id == user_id).distinct()
-        
-        contact_ids = set([r[0] for r in sent_to.all()] + [r[0] for r in received_from.all()])
-        
-        conversations = []
-        for contact_id in contact_ids:
-            contact = db.query(User).filter(User.id == contact_id).first()
-            if not contact:
-                continue
-                
-            # Get last message
-            last_msg = db.query(Message).filter(
-                or_(
-                    and_(Message.sender_id == user_id, Message.receiver_id == contact_id),
-                    and_(Message.sender_id == contact_id, Message.receiver_id == user_id)
-                )
-            ).order_by(Message.created_at.desc()).first()
-            
-            # Get unread count (messages from contact to user that are unread)
-            unread = db.query(Message).filter(
-                Message.sender_id == contact_id,
-                Message.receiver_id == user_id,
-                Message.is_read == False
-            ).count()
-            
-            conversations.append({
-                "peer_id": contact.id,
-                "peer_username": contact.username,
-                "peer_avatar": contact.avatar_url,
-                "last_message": last_msg.content if last_msg else "",
-                "last_message_at": last_msg.created_at if last_msg else None,
-                "unread_count": unread
-            })
-            
-        # Sort by last message time
-        conversations.sort(key=lambda x: x["last_message_at"] or datetime.min, reverse=True)
-        return conversations
+        is_low = Conversation.user_low_id == user_id
+        peer_id = case((is_low, Conversation.user_high_id), else_=Conversation.user_low_id)
+        unread = case((is_low, Conversation.low_unread), else_=Conversation.high_unread)
+        peer = aliased(User)
+
+        rows = db.query(
+            peer.id,
+            peer.username,
+            peer.avatar_url,
+            Message.content,
+            Conversation.last_message_at,
+            unread,
+        ).join(peer, peer.id == peer_id)\
+        .outerjoin(Message, Message.id == Conversation.last_message_id)\
+        .filter(or_(is_low, Conversation.user_high_id == user_id))\
+        .order_by(Conversation.last_message_at.desc())\
+        .all()
+
+        return [
+            {
+                "peer_id": contact_id,
+                "peer_username": username,
+                "peer_avatar": avatar_url,
+                "last_message": content or "",
+                "last_message_at": last_message_at,
+                "unread_count": unread_count or 0
+            }
+            for contact_id, username, avatar_url, content, last_message_at, unread_count in rows
+        ]
 
     def get_messages(self, db: Session, user_id: str, other_user_id: str, skip: int = 0, limit: int = 50) -> List[Message]:
         messages = db.query(Message).filter(
@@ -81,7 +121,20 @@ class MessageService:
         # Mark received messages as read
         unread_ids = [m.id for m in messages if m.receiver_id == user_id and not m.is_read]
         if unread_ids:
-            db.query(Message).filter(Message.id.in_(unread_ids)).update({Message.is_read: True}, synchronize_session=False)
+            marked = db.query(Message).filter(
+                Message.id.in_(unread_ids),
+                Message.is_read == False
+            ).update({Message.is_read: True}, synchronize_session=False)
+            if marked:
+                low, high = _ordered_pair(user_id, other_user_id)
+                unread_column = Conversation.low_unread if user_id == low else Conversation.high_unread
+                db.query(Conversation).filter(
+                    Conversation.user_low_id == low,
+                    Conversation.user_high_id == high
+                ).update(
+                    {unread_column: case((unread_column > marked, unread_column - marked), else_=0)},
+                    synchronize_session=False
+                )
             db.commit()
             
         return messages
@@ -93,5 +146,50 @@ class MessageService:
             Message.is_read == False
         ).count()
 
+    def rebuild_conversations(self, db: Session) -> int:
+        """Recreate the conversations table from messages; returns the number of rows written.
+
+        Used by the migration that introduces the table. The last message of a
+        pair is the one with the highest id.
+        """
+        low = case((Message.sender_id < Message.receiver_id, Message.sender_id), else_=Message.receiver_id)
+        high = case((Message.sender_id < Message.receiver_id, Message.receiver_id), else_=Message.sender_id)
+        unread = Message.is_read == False
+        pairs = db.query(
+            low.label("low"),
+            high.label("high"),
+            func.max(Message.id).label("last_id"),
+            func.sum(case((and_(unread, Message.receiver_id == low), 1), else_=0)).label("low_unread"),
+            func.sum(case((and_(unread, Message.receiver_id == high), 1), else_=0)).label("high_unread"),
+        ).filter(
+            Message.sender_id.isnot(None),
+            Message.receiver_id.isnot(None),
+            Message.sender_id != Message.receiver_id
+        ).group_by(low, high).subquery()
+
+        rows = db.query(
+            pairs.c.low,
+            pairs.c.high,
+            pairs.c.last_id,
+            Message.created_at,
+            pairs.c.low_unread,
+            pairs.c.high_unread,
+        ).join(Message, Message.id == pairs.c.last_id).all()
+
+        db.query(Conversation).delete(synchronize_session=False)
+        db.bulk_insert_mappings(Conversation, [
+            {
+                "user_low_id": user_low_id,
+                "user_high_id": user_high_id,
+                "last_message_id": last_id,
+                "last_message_at": last_message_at,
+                "low_unread": low_unread or 0,
+                "high_unread": high_unread or 0,
+            }
+            for user_low_id, user_high_id, last_id, last_message_at, low_unread, high_unread in rows
+        ])
+        db.commit()
+        return len(rows)
+
 message_service = MessageService()
 
@@ -0,0 +1,120 @@
+"""Per-user notification counters in ``user_notification_counters`` so polling never aggregates notifications."""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.app.models import Notification, NotificationType, UserNotificationCounter
+
+
+# notification type -> [total, unread]
+Counts = Dict[NotificationType, List[int]]
+# (user_id, notification type) -> (total delta, unread delta)
+Deltas = Dict[Tuple[str, NotificationType], Tuple[int, int]]
+
+_counters = UserNotificationCounter.__table__
+
+
+def _add(column, delta: int):
+    return column + delta if delta >= 0 else case((column + delta > 0, column + delta), else_=0)
+
+
+def get_counts(db: Session, user_id: str) -> Counts:
+    """Return ``user_id``'s counts by type: one primary-key range read."""
+
+    rows = db.execute(
+        select(_counters.c.notification_type, _counters.c.total, _counters.c.unread)
+        .where(_counters.c.user_id == user_id)
+    )
+    return {NotificationType(notification_type): [total, unread] for notification_type, total, unread in rows}
+
+
+def adjust_counts(db: Union[Session, Connection], deltas: Deltas) -> None:
+    """Add the deltas to each user's counters in the caller's transaction.
+
+    Commit it together with the notifications that were created, read or
+    deleted; the increments happen in SQL, so every worker sees the same
+    counts and concurrent writers never overwrite each other. A missing row
+    is created on first use.
+    """
+
+    for (user_id, notification_type), (total, unread) in sorted(deltas.items()):
+        statement = (
+            update(_counters)
+            .where(_counters.c.user_id == user_id, _counters.c.notification_type == notification_type)
+            .values(total=_add(_counters.c.total, total), unread=_add(_counters.c.unread, unread))
+        )
+        if db.execute(statement).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(insert(_counters).values(
+                    user_id=user_id,
+                    notification_type=notification_type,
+                    total=max(total, 0),
+                    unread=max(unread, 0),
+                ))
+        except IntegrityError:
+            # Another transaction created the row first; the UPDATE waits for it and applies on top
+            db.execute(statement)
+
+
+def count_new(rows: Iterable[dict]) -> Deltas:
+    """Deltas for freshly inserted notification rows, all unread."""
+
+    deltas: Deltas = {}
+    for row in rows:
+        key = (row["user_id"], NotificationType(row["notification_type"]))
+        total, unread = deltas.get(key, (0, 0))
+        deltas[key] = (total + 1, unread + 1)
+    return deltas
+
+
+def clear_unread(db: Session, user_id: str) -> None:
+    """Zero every unread counter of a user, for mark-all-read, in the caller's transaction."""
+
+    db.execute(update(_counters).where(_counters.c.user_id == user_id, _counters.c.unread != 0).values(unread=0))
+
+
+def notified_users(db: Session, resource_id: str) -> List[str]:
+    """Users holding notifications about a resource, whose counters its deletion changes."""
+
+    return [
+        user_id
+        for (user_id,) in db.query(Notification.user_id)
+        .filter(Notification.resource_id == resource_id)
+        .distinct()
+    ]
+
+
+def recount(db: Session, user_ids: Optional[Iterable[str]] = None) -> None:
+    """Rewrite counters from ``notifications`` in the caller's transaction.
+
+    Used where rows go away through ``ON DELETE CASCADE`` (deleting a
+    resource) and by the backfill migration; ``user_ids=None`` rebuilds
+    every user's counters.
+    """
+
+    clear = delete(_counters)
+    source = (
+        select(
+            Notification.user_id,
+            Notification.notification_type,
+            func.count(Notification.id),
+            func.coalesce(func.sum(case((Notification.is_read == False, 1), else_=0)), 0),
+        )
+        .where(Notification.user_id.is_not(None))
+        .group_by(Notification.user_id, Notification.notification_type)
+    )
+    if user_ids is not None:
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+        clear = clear.where(_counters.c.user_id.in_(user_ids))
+        source = source.where(Notification.user_id.in_(user_ids))
+
+    db.execute(clear)
+    db.execute(insert(_counters).from_select(["user_id", "notification_type", "total", "unread"], source))
@@ -1,10 +1,150 @@
-from typing import List, Optional, Dict
+from datetime import datetime
+from typing import FrozenSet, Iterable, List, Optional, Dict
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from backend.app.models import Notification, NotificationType, User, Resource
+from sqlalchemy import insert
+from sqlalchemy.engine import Connection
+from backend.app.models import Notification, NotificationType, User, UserRole, Resource
 from backend.app.schemas.notification import NotificationCreate
+from backend.app.services.event_hub import event_hub
+from backend.app.services.job_queue import job_queue
+from backend.app.services.notification_counters import adjust_counts, clear_unread, count_new, get_counts
+from backend.app.services.resource_cache import ResultCache
+
+# Admin ids change only on role updates and deletes, which invalidate this
+admin_ids_cache = ResultCache("admin_ids", ttl=300)
+
+
+def _notification_rows(
+    user_ids: Iterable[str],
+    actor_id: Optional[str],
+    notification_type: NotificationType,
+    resource_id: Optional[str],
+    content: str,
+    created_at: Optional[datetime] = None,
+) -> List[dict]:
+    rows = [
+        {
+            "user_id": user_id,
+            "actor_id": actor_id,
+            "notification_type": notification_type,
+            "resource_id": resource_id,
+            "content": content,
+            "is_read": False,
+        }
+        for user_id in user_ids
+        if user_id != actor_id
+    ]
+    if created_at is not None:
+        for row in rows:
+            row["created_at"] = created_at
+    return rows
+
+
+def _write_notifications(connection: Connection, payloads: List[dict]) -> None:
+    """Job handler: insert every queued fan-out with one multi-row INSERT."""
+    rows = []
+    for payload in payloads:
+        created_at = payload.get("created_at")
+        rows.extend(_notification_rows(
+            payload["user_ids"],
+            payload["actor_id"],
+            NotificationType(payload["notification_type"]),
+            payload["resource_id"],
+            payload["content"],
+            # Jobs queued before payloads were stamped fall back to the write time
+            datetime.fromisoformat(created_at) if created_at else datetime.utcnow(),
+        ))
+    if rows:
+        connection.execute(insert(Notification), rows)
+        adjust_counts(connection, count_new(rows))
+
+
+def _announce(rows: List[dict]) -> None:
+    """Push committed notifications to the recipients' open streams."""
+    for row in rows:
+        notification_type = NotificationType(row["notification_type"])
+        event_hub.publish(row["user_id"], "notification", {
+            "id": row.get("id"),
+            "notification_type": notification_type.value,
+            "content": row["content"],
+            "actor_id": row["actor_id"],
+            "resource_id": row["resource_id"],
+        })
+
+
+def _announce_queued(payloads: List[dict]) -> None:
+    for payload in payloads:
+        _announce(_notification_rows(
+            payload["user_ids"],
+            payload["actor_id"],
+            payload["notification_type"],
+            payload["resource_id"],
+            payload["content"],
+        ))
+
+
+job_queue.register("notifications", _write_notifications, after_commit=_announce_queued)
+
 
 class NotificationService:
+    def admin_ids(self, db: Session) -> FrozenSet[str]:
+        """Return the ids of all admins, cached across requests."""
+        ids = admin_ids_cache.get("admins")
+        if ids is None:
+            ids = frozenset(
+                user_id for (user_id,) in db.query(User.id).filter(User.role == UserRole.ADMIN)
+            )
+            admin_ids_cache.set("admins", ids)
+        return ids
+
+    def fan_out(
+        self,
+        db: Session,
+        user_ids: Iterable[str],
+        actor_id: Optional[str],
+        notification_type: NotificationType,
+        resource_id: Optional[str],
+        content: str
+    ) -> int:
+        """Create the same notification for many users with one multi-row INSERT and one commit.
+
+        The actor never notifies themselves. Returns the number of rows created.
+        """
+        rows = _notification_rows(user_ids, actor_id, notification_type, resource_id, content)
+        if not rows:
+            return 0
+        db.execute(insert(Notification), rows)
+        adjust_counts(db, count_new(rows))
+        db.commit()
+        _announce(rows)
+        return len(rows)
+
+    def notify_admins(
+        self,
+        db: Session,
+        actor_id: Optional[str],
+        notification_type: NotificationType,
+        resource_id: Optional[str],
+        content: str
+    ) -> int:
+        """Queue a notification for every admin except the actor; returns the number of recipients.
+
+        The rows are written by the background job queue, so the request does
+        not wait for the INSERT and its commit.
+        """
+        user_ids = sorted(self.admin_ids(db) - {actor_id})
+        if user_ids:
+            job_queue.enqueue("notifications", {
+                "user_ids": user_ids,
+                "actor_id": actor_id,
+                "notification_type": NotificationType(notification_type).value,
+                "resource_id": resource_id,
+                "content": content,
+                # Stamp the event time now; the job may run minutes later after retries
+                "created_at": datetime.utcnow().isoformat(),
+            })
+        return len(user_ids)
+
     def create_notification(
         self, 
         db: Session, 
@@ -23,8 +163,17 @@ class NotificationService:
             is_read=False
         )
         db.add(db_notification)
+        adjust_counts(db, {(user_id, NotificationType(notification_type)): (1, 1)})
         db.commit()
         db.refresh(db_notification)
+        _announce([{
+            "id": db_notification.id,
+            "user_id": user_id,
+            "actor_id": actor_id,
+            "notification_type": notification_type,
+            "resource_id": resource_id,
+            "content": content,
+        }])
         return db_notification
 
     def get_user_notifications(
@@ -46,22 +195,14 @@ class NotificationService:
             .all()
 
     def get_unread_count(self, db: Session, user_id: str) -> int:
-        return db.query(Notification)\
-            .filter(Notification.user_id == user_id, Notification.is_read == False)\
-            .count()
+        counts = get_counts(db, user_id)
+        return sum(unread for _, unread in counts.values())
 
     def get_stats(self, db: Session, user_id: str, unread_only: bool = True) -> Dict[str, int]:
         """Get counts of notifications by type"""
-        query = db.query(
-            Notification.notification_type, 
-            func.count(Notification.id)
-        ).filter(Notification.user_id == user_id)
-        
-        if unread_only:
-            query = query.filter(Notification.is_read == False)
-            
-        stats = query.group_by(Notification.notification_type).all()
-        
+        counts = get_counts(db, user_id)
+        stats = [(type_, unread if unread_only else total) for type_, (total, unread) in counts.items()]
+
         result = {
             "total": 0,
             "like": 0,
@@ -92,8 +233,14 @@ class NotificationService:
             Notification.user_id == user_id
         ).first()
         
-        if notification:
-            notification.is_read = True
+        if notification and not notification.is_read:
+            # Conditional UPDATE so concurrent requests decrement the counter once
+            changed = db.query(Notification).filter(
+                Notification.id == notification_id,
+                Notification.is_read == False
+            ).update({Notification.is_read: True}, synchronize_session=False)
+            if changed:
+                adjust_counts(db, {(user_id, notification.notification_type): (0, -1)})
             db.commit()
             db.refresh(notification)
         
@@ -104,7 +251,27 @@ class NotificationService:
             Notification.user_id == user_id, 
             Notification.is_read == False
         ).update({Notification.is_read: True})
+        if result:
+            clear_unread(db, user_id)
         db.commit()
         return result
 
+    def delete_notification(self, db: Session, notification_id: int, user_id: str) -> bool:
+        notification = db.query(Notification).filter(
+            Notification.id == notification_id,
+            Notification.user_id == user_id
+        ).first()
+        if not notification:
+            return False
+
+        notification_type, was_unread = notification.notification_type, not notification.is_read
+        # Conditional DELETE so concurrent requests decrement the counters once
+        deleted = db.query(Notification).filter(
+            Notification.id == notification_id
+        ).delete(synchronize_session=False)
+        if deleted:
+            adjust_counts(db, {(user_id, notification_type): (-1, -1 if was_unread else 0)})
+        db.commit()
+        return True
+
 notification_service = NotificationService()
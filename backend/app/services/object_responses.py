@@ -0,0 +1,231 @@
+"""HTTP responses for stored objects with Range and conditional request support."""
+
+import asyncio
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request, status
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
+
+from backend.app.core.config import get_settings
+from backend.app.services.media_cache import media_cache
+from backend.app.services.storage import storage
+
+
+settings = get_settings()
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def _not_modified_since(header: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Return the inclusive ``(start, end)`` of a single ``bytes=`` range.
+
+    ``None`` means the header should be ignored and the whole object served
+    (other units, several ranges, malformed values). Raises ``ValueError``
+    when the range cannot be satisfied for an object of ``size`` bytes.
+    """
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = (part.strip() for part in spec.partition("-"))
+    if not dash or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if size <= 0:
+        raise ValueError("Empty object has no satisfiable range")
+    if not first:
+        # Suffix range: the final N bytes
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and start > int(last):
+        return None
+    if start >= size:
+        raise ValueError("Range starts past the end of the object")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _validators(etag: Optional[str], last_modified: Optional[datetime]) -> Dict[str, str]:
+    validators = {"Accept-Ranges": "bytes"}
+    if etag:
+        validators["ETag"] = etag
+    if last_modified is not None:
+        validators["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return validators
+
+
+def _if_range_matches(if_range: str, validators: Dict[str, str]) -> bool:
+    return if_range in (validators.get("ETag"), validators.get("Last-Modified"))
+
+
+async def is_resumed(request: Request, object_name: str) -> bool:
+    """True when a download request continues an earlier one instead of starting it.
+
+    A range past the first byte alone proves nothing (any client can send
+    ``Range: bytes=1-``), so the request must also carry an ``If-Range``
+    naming the object's current ETag or Last-Modified, i.e. a validator
+    taken from an earlier response. Only then is the object stat'ed.
+    """
+    header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if not header or not if_range or header.partition("=")[2].strip().startswith("0-"):
+        return False
+    try:
+        info = await storage.stat_file_async(object_name)
+    except Exception:
+        return False
+    etag = f'"{info.etag}"' if info.etag else None
+    return _if_range_matches(if_range, _validators(etag, info.last_modified))
+
+
+async def object_response(
+    request: Request,
+    object_name: str,
+    media_type: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    cache: bool = False,
+) -> Response:
+    """Serve ``object_name`` honouring Range, If-Range, If-None-Match and If-Modified-Since.
+
+    One ``stat_object`` supplies ETag, Last-Modified and size; the body is a
+    ranged ``get_object``, so a seek or resumed download only moves the bytes
+    asked for and a revalidation moves none. With ``cache`` small objects are
+    kept in ``media_cache`` and later served from local disk without
+    contacting MinIO.
+    """
+
+    cached = media_cache.get(object_name) if cache and media_cache.enabled else None
+    if cached is not None:
+        size, etag, last_modified, content_type = cached.size, cached.etag, cached.last_modified, cached.content_type
+    else:
+        info = await storage.stat_file_async(object_name)
+        size, etag, last_modified, content_type = info.size or 0, info.etag, info.last_modified, info.content_type
+
+    etag = f'"{etag}"' if etag else None
+    validators = _validators(etag, last_modified)
+    media_type = media_type or content_type or "application/octet-stream"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag is not None and _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(if_modified_since) and _not_modified_since(if_modified_since, last_modified)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**(headers or {}), **validators})
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header:
+        if_range = request.headers.get("if-range")
+        # A stale If-Range means the client's partial copy is outdated: send it all
+        if if_range is None or _if_range_matches(if_range, validators):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                # The name of Starlette's 416 constant changed between versions
+                return Response(
+                    status_code=416,
+                    headers={**validators, "Content-Range": f"bytes */{size}"},
+                )
+
+    response_headers = {**(headers or {}), **validators}
+    if byte_range is None:
+        response_headers["Content-Length"] = str(size)
+        # Objects never change, so a cached file that vanished is simply read from MinIO instead
+        stat_result = await asyncio.to_thread(media_cache.stat, cached) if cached is not None else None
+        if stat_result is not None:
+            # FileResponse hands the path to the server (zero-copy) where it supports pathsend
+            return FileResponse(cached.path, media_type=media_type, headers=response_headers, stat_result=stat_result)
+        _, body = await storage.stream_file_async(object_name)
+        if cache and media_cache.admits(size):
+            body = media_cache.tee(object_name, size, etag and etag.strip('"'), last_modified, content_type, body)
+        return StreamingResponse(body, media_type=media_type, headers=response_headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    # Open before answering 206, so a missing file cannot fail after the headers are out
+    handle = await asyncio.to_thread(media_cache.open, cached) if cached is not None else None
+    if handle is not None:
+        body = media_cache.read(handle, start, length)
+    else:
+        _, body = await storage.stream_file_async(object_name, offset=start, length=length)
+    response_headers["Content-Length"] = str(length)
+    response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        body,
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=response_headers,
+    )
+
+
+def _content_disposition(filename: str) -> str:
+    encoded_filename = quote(filename)
+    return f'attachment; filename="{filename.encode("ascii", "ignore").decode("ascii")}"; filename*=utf-8\'\'{encoded_filename}'
+
+
+async def download_response(
+    request: Request,
+    object_name: str,
+    filename: str,
+    extra: Dict[str, Any],
+) -> Response:
+    """Deliver a purchased download once access checks and counting are done.
+
+    With ``DOWNLOAD_DELIVERY = "presigned"`` the client gets a short-lived
+    MinIO URL that carries the Content-Disposition: a 302 for browser
+    navigation, or the ``{"download_url", ...extra}`` JSON that external
+    files already use for API clients asking for JSON. The bytes then never
+    pass through the API worker. Otherwise, or when signing fails, the object
+    is proxied with Range support. ``extra`` (balance, download count) is sent
+    as JSON fields or ``X-User-Balance``/``X-Download-Count`` headers.
+    """
+
+    headers = {
+        "X-User-Balance": str(extra["balance"]),
+        "X-Download-Count": str(extra["downloads"]),
+    }
+
+    if settings.DOWNLOAD_DELIVERY == "presigned":
+        try:
+            url = await storage.get_file_url_async(
+                object_name,
+                expires=settings.DOWNLOAD_URL_EXPIRES,
+                response_headers={"response-content-disposition": _content_disposition(filename)},
+            )
+        except Exception as exc:
+            print(f"[Download] Presigning {object_name} failed, proxying instead: {exc}")
+        else:
+            if "application/json" in request.headers.get("accept", ""):
+                return JSONResponse({"download_url": url, **extra}, headers={"Cache-Control": "no-store"})
+            return RedirectResponse(url, status_code=status.HTTP_302_FOUND, headers={**headers, "Cache-Control": "no-store"})
+
+    return await object_response(
+        request,
+        object_name,
+        headers={"Content-Disposition": _content_disposition(filename), **headers},
+    )
@@ -1,10 +1,31 @@
 """Operation logging helpers."""
 
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
+from sqlalchemy import insert
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
 from backend.app.models import OperationLog
+from backend.app.services.job_queue import job_queue
+
+
+def _write_operation_logs(connection: Connection, payloads: List[dict]) -> None:
+    """Job handler: insert queued audit entries with one multi-row INSERT."""
+
+    rows = []
+    for payload in payloads:
+        created_at = payload.get("created_at")
+        rows.append({
+            **payload,
+            # Jobs queued before entries were stamped fall back to the write time
+            "created_at": datetime.fromisoformat(created_at) if created_at else datetime.utcnow(),
+        })
+    connection.execute(insert(OperationLog), rows)
+
+
+job_queue.register("operation_log", _write_operation_logs)
 
 
 def log_operation(
@@ -17,16 +38,20 @@ def log_operation(
     user_agent: str = "",
     details: Optional[str] = None,
 ) -> None:
-    """Persist a user action for auditing."""
-
-    log = OperationLog(
-        user_id=user_id,
-        action=action,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        details=details,
-    )
-    db.add(log)
-    db.commit()
+    """Queue a user action for auditing.
+
+    The entry is written by the background job queue and does not touch
+    ``db``; callers commit their own changes first.
+    """
+
+    job_queue.enqueue("operation_log", {
+        "user_id": user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "details": details,
+        # Stamp the action time now; the job may run minutes later after retries
+        "created_at": datetime.utcnow().isoformat(),
+    })
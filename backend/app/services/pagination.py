@@ -0,0 +1,66 @@
+"""Keyset (cursor) pagination for append-only tables ordered newest first."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Return an opaque cursor pointing just past ``(created_at, row_id)``."""
+
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from exc
+
+
+def paginate_keyset(
+    query: Query,
+    model,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of ``query`` ordered by ``created_at DESC, id DESC`` and the next cursor.
+
+    With a cursor the page starts strictly after the row it encodes, so the
+    database seeks on the ``created_at`` index instead of reading and
+    discarding ``skip`` rows. ``skip`` is still honoured when no cursor is
+    given, for clients that page by offset. The next cursor is None on the
+    last page.
+    """
+
+    created_at, row_id = model.created_at, model.id
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                created_at < after_created_at,
+                and_(created_at == after_created_at, row_id < after_id),
+            )
+        )
+
+    query = query.order_by(created_at.desc(), row_id.desc())
+    if skip and not cursor:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from backend.app.core.config import get_settings
 from backend.app.models import PointTransaction, TransactionType, User
+from backend.app.services.entitlements import AlreadyEntitled, entitlements
 
 
 settings = get_settings()
@@ -46,8 +47,15 @@ def deduct_points(
     amount: int,
     description: str,
     reference_id: Optional[str] = None,
+    resource_id: Optional[str] = None,
 ) -> PointTransaction:
-    """Deduct points from a user."""
+    """Deduct points from a user.
+
+    With ``resource_id`` the purchase also grants the user an entitlement to
+    that resource, committed together with the transaction. If the user turns
+    out to own it already (e.g. a concurrent duplicate purchase), nothing is
+    charged: the deduction is rolled back and ``AlreadyEntitled`` is raised.
+    """
 
     if user.points < amount:
         raise ValueError("Insufficient points")
@@ -63,7 +71,16 @@ def deduct_points(
     )
 
     db.add(transaction)
+    if resource_id is not None:
+        db.flush()
+        try:
+            entitlements.grant(db, user.id, resource_id, transaction)
+        except AlreadyEntitled:
+            db.rollback()
+            raise
     db.commit()
+    if resource_id is not None:
+        entitlements.remember(user.id, resource_id)
     db.refresh(transaction)
     return transaction
 
@@ -0,0 +1,47 @@
+"""In-process caches for read-heavy resource listings."""
+
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from backend.app.core.config import get_settings
+
+
+settings = get_settings()
+
+
+class ResultCache:
+    """Small TTL cache whose entries are dropped together on invalidation.
+
+    Writers call ``invalidate`` after committing a change that affects the
+    cached listing; the TTL bounds staleness for changes made by other
+    worker processes and for counters updated in the background.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+categorized_cache = ResultCache("categorized_resources", ttl=settings.CATEGORIZED_CACHE_TTL)
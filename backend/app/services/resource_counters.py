@@ -0,0 +1,109 @@
+"""Denormalized like/comment counters on resources."""
+
+import asyncio
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.models import Comment, Resource, ResourceLike
+
+
+settings = get_settings()
+
+# Counter column -> table whose rows it counts
+COUNTED = {
+    "like_count": ResourceLike,
+    "comment_count": Comment,
+}
+
+
+def adjust_counter(db: Session, resource_id: str, counter: str, delta: int) -> None:
+    """Add ``delta`` to one counter of a resource in the caller's transaction.
+
+    The increment happens in SQL, so concurrent likes never overwrite each
+    other; commit it together with the row that was added or removed.
+    """
+
+    table = Resource.__table__
+    column = table.c[counter]
+    value = column + delta if delta >= 0 else case((column + delta > 0, column + delta), else_=0)
+    db.execute(
+        update(table)
+        .where(table.c.id == resource_id)
+        # Naming updated_at keeps its onupdate from treating a like as an edit
+        .values({counter: value, "updated_at": table.c.updated_at})
+    )
+
+
+class ResourceCounterReconciler:
+    """Periodically rewrite counters that no longer match their source tables.
+
+    Every path that adds or removes a like or comment adjusts the counter in
+    the same transaction; this catches what those paths cannot see, such as
+    rows removed by ``ON DELETE CASCADE`` when a user is deleted. Each pass is
+    one set-based UPDATE per counter that only touches rows that drifted.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.repaired = 0
+
+    def reconcile(self, db: Session) -> Dict[str, int]:
+        """Repair drifted counters and return how many resources each counter fixed."""
+
+        table = Resource.__table__
+        repaired = {}
+        for counter, model in COUNTED.items():
+            actual = (
+                select(func.count(model.id))
+                .where(model.resource_id == table.c.id)
+                .scalar_subquery()
+            )
+            result = db.execute(
+                update(table)
+                .where(func.coalesce(table.c[counter], -1) != actual)
+                .values({counter: actual, "updated_at": table.c.updated_at})
+            )
+            repaired[counter] = result.rowcount or 0
+        db.commit()
+        self.repaired += sum(repaired.values())
+        return repaired
+
+    def _reconcile_job(self) -> None:
+        db = SessionLocal()
+        try:
+            repaired = self.reconcile(db)
+            if any(repaired.values()):
+                print(f"[ResourceCounters] Repaired drifted counters: {repaired}")
+        except Exception as exc:
+            print(f"[ResourceCounters] Reconcile failed: {exc}")
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self._reconcile_job)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the periodic reconciliation task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            print("[ResourceCounters] Reconciler started")
+
+    async def stop(self) -> None:
+        """Cancel the reconciliation task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+resource_counters = ResourceCounterReconciler(interval=settings.RESOURCE_COUNTER_RECONCILE_INTERVAL)
@@ -0,0 +1,40 @@
+"""Recording uploaded objects on resources and their attachments."""
+
+from typing import Optional
+
+from backend.app.models import Resource, ResourceAttachment
+
+
+def _file_info(filename: Optional[str], size_bytes: int):
+    extension = filename.split(".")[-1] if filename and "." in filename else "bin"
+    return extension.upper(), f"{size_bytes / (1024 * 1024):.2f} MB"
+
+
+def set_resource_file(resource: Resource, object_name: str, filename: Optional[str], size_bytes: int) -> None:
+    """Point ``resource`` at a newly uploaded main file; the caller commits."""
+
+    resource.file_url = object_name
+    resource.file_type, resource.file_size = _file_info(filename, size_bytes)
+
+
+def add_attachment(
+    resource: Resource, object_name: str, filename: Optional[str], size_bytes: int
+) -> ResourceAttachment:
+    """Build the attachment row for an uploaded object; the caller adds and commits it.
+
+    The first attachment of a resource without a main file also becomes its main file.
+    """
+
+    file_type, file_size = _file_info(filename, size_bytes)
+    attachment = ResourceAttachment(
+        resource_id=resource.id,
+        file_name=filename or "attachment",
+        file_url=object_name,
+        file_size=file_size,
+        file_type=file_type,
+    )
+    if not resource.file_url:
+        resource.file_url = object_name
+        resource.file_type = file_type
+        resource.file_size = file_size
+    return attachment
@@ -0,0 +1,187 @@
+"""Resource loading helpers: eager-load profiles and detail assembly."""
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, literal, select
+from sqlalchemy.orm import Query, Session, contains_eager, joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from backend.app.models import (
+    Category,
+    Resource,
+    ResourceEntitlement,
+    ResourceLike,
+    ResourceStatus,
+    User,
+    UserRole,
+)
+from backend.app.schemas import CategorizedResourcesResponse, ResourceListResponse, ResourceResponse
+
+
+# Relationships each response schema reads through Resource properties
+# (category_name, author_username, attachments, ...). Loading them up front
+# keeps list endpoints from issuing one SELECT per row per relationship.
+LOAD_PROFILES = {
+    ResourceListResponse: (
+        joinedload(Resource.category),
+        joinedload(Resource.author),
+    ),
+    ResourceResponse: (
+        joinedload(Resource.category),
+        joinedload(Resource.author),
+        selectinload(Resource.attachments),
+    ),
+}
+
+
+def load_options(schema) -> Tuple[LoaderOption, ...]:
+    """Return the loader options needed to serialize ``schema`` without lazy loads."""
+    return LOAD_PROFILES[schema]
+
+
+def resource_detail_query(db: Session, current_user: Optional[User] = None) -> Query:
+    """Build a query yielding ``(Resource, purchased, liked)`` rows.
+
+    Like and comment counts are columns of the resource row, per-user flags
+    are correlated subqueries, and category, author and attachments are
+    eager-loaded, so a detail page costs one round trip for the row plus one
+    for its attachments.
+    """
+
+    if current_user is not None:
+        purchased = exists().where(
+            and_(
+                ResourceEntitlement.user_id == current_user.id,
+                ResourceEntitlement.resource_id == Resource.id,
+            )
+        )
+        liked = exists().where(
+            and_(
+                ResourceLike.user_id == current_user.id,
+                ResourceLike.resource_id == Resource.id,
+            )
+        )
+    else:
+        purchased = literal(False)
+        liked = literal(False)
+
+    return db.query(
+        Resource,
+        purchased.label("is_purchased"),
+        liked.label("is_liked"),
+    ).options(*load_options(ResourceResponse))
+
+
+def apply_detail_row(row, current_user: Optional[User] = None) -> Resource:
+    """Copy the per-user flags of a detail row onto its Resource."""
+
+    resource, is_purchased, is_liked = row
+
+    if current_user and not resource.is_free and resource.points_required > 0:
+        # Admins always have access
+        resource.is_purchased_by_user = current_user.role == UserRole.ADMIN or bool(is_purchased)
+    else:
+        resource.is_purchased_by_user = False
+
+    resource.is_liked_by_user = bool(is_liked)
+    return resource
+
+
+def load_resource_detail(
+    db: Session,
+    resource_id: str,
+    current_user: Optional[User] = None,
+) -> Optional[Resource]:
+    """Load a resource with counts, purchase and like flags populated."""
+
+    row = (
+        resource_detail_query(db, current_user)
+        .filter(Resource.id == resource_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return apply_detail_row(row, current_user)
+
+
+def _supports_window_functions(db: Session) -> bool:
+    dialect = db.get_bind().dialect
+    if dialect.name == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    if dialect.name == "mysql":
+        version = dialect.server_version_info or ()
+        # MariaDB reports 10.x and has had window functions since 10.2
+        return version >= (8, 0) or getattr(dialect, "is_mariadb", False)
+    return True
+
+
+def load_categorized_resources(db: Session, limit: int) -> List[Dict[str, Any]]:
+    """Return the newest ``limit`` published resources of every active category.
+
+    All groups come from one statement: ROW_NUMBER() partitioned by
+    ``category_id`` where the database supports window functions, otherwise
+    a correlated count of newer rows in the same category.
+    """
+
+    published = Resource.status == ResourceStatus.PUBLISHED
+
+    if _supports_window_functions(db):
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=Resource.category_id,
+                order_by=(Resource.created_at.desc(), Resource.id.desc()),
+            )
+            .label("row_num")
+        )
+        ranked = select(Resource.id, rank).where(published).subquery()
+        query = (
+            db.query(Resource)
+            .join(ranked, ranked.c.id == Resource.id)
+            .filter(ranked.c.row_num <= limit)
+            .order_by(ranked.c.row_num)
+        )
+    else:
+        newer = Resource.__table__.alias("newer")
+        newer_count = (
+            select(func.count())
+            .where(
+                newer.c.category_id == Resource.category_id,
+                newer.c.status == ResourceStatus.PUBLISHED,
+                (newer.c.created_at > Resource.created_at)
+                | and_(newer.c.created_at == Resource.created_at, newer.c.id > Resource.id),
+            )
+            .correlate(Resource)
+            .scalar_subquery()
+        )
+        query = (
+            db.query(Resource)
+            .filter(published, newer_count < limit)
+            .order_by(Resource.created_at.desc(), Resource.id.desc())
+        )
+
+    resources = (
+        query.join(Category, Category.id == Resource.category_id)
+        .filter(Category.is_active == True)
+        .options(contains_eager(Resource.category), joinedload(Resource.author))
+        .all()
+    )
+
+    groups: Dict[int, List[Resource]] = {}
+    for resource in resources:
+        groups.setdefault(resource.category_id, []).append(resource)
+
+    categories = sorted(
+        (group[0].category for group in groups.values()),
+        key=lambda category: (category.order or 0, category.id),
+    )
+    return [
+        CategorizedResourcesResponse(
+            category_id=category.id,
+            category_name=category.name,
+            category_slug=category.slug,
+            resources=[ResourceListResponse.model_validate(item) for item in groups[category.id]],
+        )
+        for category in categories
+    ]
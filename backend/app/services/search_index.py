@@ -0,0 +1,625 @@
+"""Full-text search over published resources.
+
+Two backends share one interface:
+
+* ``MySQLFullTextBackend`` uses InnoDB FULLTEXT indexes built with the
+  ngram parser, so Chinese text is searchable without a segmenter. MySQL
+  maintains the indexes itself on every write.
+* ``InMemorySearchBackend`` is a pure-Python inverted index with BM25
+  ranking, used for SQLite/dev databases and as a fallback when the
+  FULLTEXT indexes have not been created yet. It lives in the worker process and is kept in
+  sync by ``index_resource``/``remove_resource`` calls from the write paths.
+
+Both rank matches in title above tags and description, and those above
+body content. ``SuggestionIndex`` serves title/tag autocomplete from memory
+for either backend; besides the local write paths, it is rebuilt from the
+database every ``SEARCH_SUGGEST_REFRESH_INTERVAL`` seconds so each worker
+also picks up resources created, renamed or deleted on the others.
+"""
+
+import asyncio
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, inspect, or_, text
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.models import Resource, ResourceStatus
+from backend.app.utils.text import normalize_text, strip_html, suggestion_keys, tokenize, last_latin_word
+
+
+settings = get_settings()
+
+# (title, tags, views) of a published resource, as SuggestionIndex.add takes them
+SuggestionRow = Tuple[Optional[str], List[str], int]
+
+FIELD_WEIGHTS = {
+    "title": 5.0,
+    "tags": 3.0,
+    "description": 2.0,
+    "content": 1.0,
+}
+
+
+class InMemorySearchBackend:
+    """Inverted index with field-weighted BM25 scoring."""
+
+    name = "memory"
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._doc_category: Dict[str, Optional[int]] = {}
+        self._total_length = 0.0
+        # Sorted terms for prefix lookups, rebuilt lazily after the vocabulary changes
+        self._vocabulary: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    @property
+    def document_count(self) -> int:
+        return len(self._doc_terms)
+
+    def index_document(
+        self,
+        resource_id: str,
+        category_id: Optional[int],
+        title: Optional[str],
+        description: Optional[str],
+        tags: Optional[str],
+        content: Optional[str],
+    ) -> None:
+        """Add or replace a document in the index."""
+
+        fields = {
+            "title": title,
+            "tags": tags,
+            "description": description,
+            "content": strip_html(content) if content else None,
+        }
+        terms: Counter = Counter()
+        for field, value in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(value or "", cjk_unigrams=True):
+                terms[token] += weight
+
+        with self._lock:
+            self._remove_locked(resource_id)
+            for token, weighted_tf in terms.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._vocabulary = None
+                postings[resource_id] = weighted_tf
+            length = sum(terms.values())
+            self._doc_terms[resource_id] = dict(terms)
+            self._doc_lengths[resource_id] = length
+            self._doc_category[resource_id] = category_id
+            self._total_length += length
+
+    def remove_document(self, resource_id: str) -> None:
+        with self._lock:
+            self._remove_locked(resource_id)
+
+    def _remove_locked(self, resource_id: str) -> None:
+        terms = self._doc_terms.pop(resource_id, None)
+        if terms is None:
+            return
+        for token in terms:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(resource_id, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary = None
+        self._total_length -= self._doc_lengths.pop(resource_id, 0.0)
+        self._doc_category.pop(resource_id, None)
+
+    def index_resource(self, resource: Resource) -> None:
+        if resource.status != ResourceStatus.PUBLISHED:
+            self.remove_document(resource.id)
+            return
+        self.index_document(
+            resource.id,
+            resource.category_id,
+            resource.title,
+            resource.description,
+            resource.tags,
+            resource.content,
+        )
+
+    def remove_resource(self, resource_id: str) -> None:
+        self.remove_document(resource_id)
+
+    def rebuild(self, db: Session) -> None:
+        """Index every published resource from the database."""
+
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._doc_category.clear()
+            self._total_length = 0.0
+            self._vocabulary = None
+
+        rows = (
+            db.query(
+                Resource.id,
+                Resource.category_id,
+                Resource.title,
+                Resource.description,
+                Resource.tags,
+                Resource.content,
+            )
+            .filter(Resource.status == ResourceStatus.PUBLISHED)
+            .yield_per(500)
+        )
+        for row in rows:
+            self.index_document(*row)
+
+    def search_ids(
+        self,
+        query: str,
+        category_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[str], int]:
+        """Return ranked resource ids for ``query`` and the total match count.
+
+        Every query token must match. Like the previous ILIKE search, a single
+        CJK character matches inside longer words (characters are indexed on
+        their own too), and the last Latin word counts as a prefix, so
+        "pyth" finds "python". Other Latin words match whole words only.
+        """
+
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return [], 0
+        prefix = last_latin_word(query)
+
+        with self._lock:
+            postings = []
+            for token in tokens:
+                if token == prefix:
+                    postings.append(self._prefix_postings(token))
+                else:
+                    postings.append(self._postings.get(token))
+            if any(not p for p in postings):
+                return [], 0
+
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for p in postings[1:]:
+                candidates.intersection_update(p)
+                if not candidates:
+                    return [], 0
+
+            if category_id is not None:
+                candidates = {doc for doc in candidates if self._doc_category.get(doc) == category_id}
+
+            doc_count = len(self._doc_terms)
+            avg_length = (self._total_length / doc_count) if doc_count else 1.0
+            scores = {}
+            for p in postings:
+                df = len(p)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for doc in candidates:
+                    tf = p[doc]
+                    norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[doc] / avg_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        ranked = heapq.nlargest(offset + limit, scores, key=scores.get)
+        return ranked[offset:], len(scores)
+
+    def _prefix_postings(self, prefix: str) -> Dict[str, float]:
+        """Merged postings of every term starting with ``prefix``; call with the lock held."""
+
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        merged: Dict[str, float] = {}
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            for doc, tf in self._postings[term].items():
+                merged[doc] = merged.get(doc, 0.0) + tf
+        return merged
+
+
+class MySQLFullTextBackend:
+    """Ranked search using InnoDB FULLTEXT indexes with the ngram parser."""
+
+    name = "mysql"
+
+    # Matches the server default ngram_token_size
+    NGRAM_TOKEN_SIZE = 2
+
+    # index name -> indexed columns; each MATCH() must name exactly one index
+    INDEXES = {
+        "ft_resources_title": ("title",),
+        "ft_resources_meta": ("description", "tags"),
+        "ft_resources_content": ("content",),
+    }
+
+    # Characters BOOLEAN MODE reads as operators
+    BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+    def missing_indexes(self, db: Session) -> List[str]:
+        """Names of the FULLTEXT indexes that do not exist yet.
+
+        They are created by ``scripts/migration_add_search_index.py``, not at
+        startup: ALTER TABLE on a large table would run in every worker.
+        """
+
+        existing = {index["name"] for index in inspect(db.get_bind()).get_indexes("resources")}
+        return [name for name in self.INDEXES if name not in existing]
+
+    def index_resource(self, resource: Resource) -> None:
+        """MySQL keeps FULLTEXT indexes in sync on write."""
+
+    def remove_resource(self, resource_id: str) -> None:
+        """MySQL keeps FULLTEXT indexes in sync on write."""
+
+    def rebuild(self, db: Session) -> None:
+        """MySQL keeps FULLTEXT indexes in sync on write."""
+
+    def search_ids(
+        self,
+        db: Session,
+        query: str,
+        category_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[str], int]:
+        base = db.query(Resource.id).filter(Resource.status == ResourceStatus.PUBLISHED)
+        if category_id:
+            base = base.filter(Resource.category_id == category_id)
+
+        if len(query.strip()) < self.NGRAM_TOKEN_SIZE:
+            # Shorter than one ngram: FULLTEXT cannot match, fall back to a substring
+            # scan of the short title and tags columns only, never the article bodies
+            pattern = f"%{query.strip()}%"
+            matched = base.filter(or_(Resource.title.ilike(pattern), Resource.tags.ilike(pattern)))
+            total = matched.with_entities(func.count(Resource.id)).scalar() or 0
+            rows = matched.order_by(Resource.views.desc()).offset(offset).limit(limit).all()
+            return [row[0] for row in rows], total
+
+        # BOOLEAN MODE turns each word into an ngram phrase, so "python" needs all
+        # of py/yt/th/ho/on in order; NATURAL LANGUAGE MODE would match any one of
+        # them. Natural-language relevance is only used to order the matches.
+        terms = self.BOOLEAN_OPERATORS.sub(" ", query).split()
+        if not terms:
+            return [], 0
+        phrases = " ".join(f'"{term}"' for term in terms)
+        matches = (
+            "MATCH(resources.title) AGAINST(:terms IN BOOLEAN MODE)"
+            " OR MATCH(resources.description, resources.tags) AGAINST(:terms IN BOOLEAN MODE)"
+            " OR MATCH(resources.content) AGAINST(:terms IN BOOLEAN MODE)"
+        )
+
+        title = "MATCH(resources.title) AGAINST(:q IN NATURAL LANGUAGE MODE)"
+        meta = "MATCH(resources.description, resources.tags) AGAINST(:q IN NATURAL LANGUAGE MODE)"
+        body = "MATCH(resources.content) AGAINST(:q IN NATURAL LANGUAGE MODE)"
+        score = text(
+            f"{FIELD_WEIGHTS['title']} * {title}"
+            f" + {FIELD_WEIGHTS['description']} * {meta}"
+            f" + {FIELD_WEIGHTS['content']} * {body} DESC"
+        )
+
+        matched = base.filter(text(f"({matches})")).params(q=query, terms=phrases)
+        total = matched.with_entities(func.count(Resource.id)).scalar() or 0
+        rows = matched.order_by(score, Resource.views.desc()).offset(offset).limit(limit).all()
+        return [row[0] for row in rows], total
+
+
+class SuggestionIndex:
+    """Prefix lookup over published titles and tags.
+
+    Every title and tag is stored under several keys, one per word or CJK
+    character start (see ``suggestion_keys``), in a sorted list. A lookup is
+    a bisect to the first key with the typed prefix followed by a forward
+    scan over every key with that prefix, so "学习" finds "深度学习入门" as
+    well as titles starting with it, and the ranking (whole-text prefix
+    first, then views) covers all matches.
+
+    The ranked top ``TOP_K`` of each prefix is memoized (LRU of
+    ``MAX_CACHED_PREFIXES``), so a short, common prefix is scanned once
+    rather than on every keystroke; adding or removing a suggestion drops
+    the memoized lists of the prefixes of its keys.
+    """
+
+    # The most suggestions /search/suggest hands out
+    TOP_K = 20
+    MAX_CACHED_PREFIXES = 10000
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []
+        # suggestion id -> (text, type, resource_id, weight)
+        self._suggestions: Dict[str, Tuple[str, str, Optional[str], int]] = {}
+        self._normalized: Dict[str, str] = {}
+        self._tag_refs: Counter = Counter()
+        self._resource_entries: Dict[str, List[str]] = {}
+        self._ranked: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._bulk_loading = False
+        self._lock = threading.RLock()
+
+    def _forget_prefixes(self, keys: List[str]) -> None:
+        if not self._ranked:
+            return
+        for key in keys:
+            for end in range(1, len(key) + 1):
+                self._ranked.pop(key[:end], None)
+
+    def _add_suggestion(self, sid: str, text_value: str, kind: str, resource_id: Optional[str], weight: int) -> None:
+        self._suggestions[sid] = (text_value, kind, resource_id, weight)
+        self._normalized[sid] = normalize_text(text_value)
+        keys = suggestion_keys(text_value)
+        for key in keys:
+            if self._bulk_loading:
+                self._keys.append((key, sid))
+            else:
+                bisect.insort(self._keys, (key, sid))
+        self._forget_prefixes(keys)
+
+    def _drop_suggestion(self, sid: str) -> None:
+        entry = self._suggestions.pop(sid, None)
+        if entry is None:
+            return
+        self._normalized.pop(sid, None)
+        keys = suggestion_keys(entry[0])
+        for key in keys:
+            position = bisect.bisect_left(self._keys, (key, sid))
+            if position < len(self._keys) and self._keys[position] == (key, sid):
+                del self._keys[position]
+        self._forget_prefixes(keys)
+
+    def add(self, resource_id: str, title: Optional[str], tags: List[str], views: int = 0) -> None:
+        """Add or replace the suggestions contributed by one resource."""
+
+        with self._lock:
+            self._remove_locked(resource_id)
+            entries = []
+            if title:
+                sid = f"r:{resource_id}"
+                self._add_suggestion(sid, title, "title", resource_id, views or 0)
+                entries.append(sid)
+            for tag in dict.fromkeys(tags):
+                sid = f"t:{normalize_text(tag)}"
+                if self._tag_refs[sid] == 0:
+                    self._add_suggestion(sid, tag, "tag", None, 0)
+                self._tag_refs[sid] += 1
+                entries.append(sid)
+            self._resource_entries[resource_id] = entries
+
+    def remove(self, resource_id: str) -> None:
+        with self._lock:
+            self._remove_locked(resource_id)
+
+    def _remove_locked(self, resource_id: str) -> None:
+        for sid in self._resource_entries.pop(resource_id, []):
+            if sid.startswith("t:"):
+                self._tag_refs[sid] -= 1
+                if self._tag_refs[sid] > 0:
+                    continue
+                del self._tag_refs[sid]
+            self._drop_suggestion(sid)
+
+    def load(self, rows) -> None:
+        """Replace the index with ``(resource_id, title, tags, views)`` rows."""
+
+        with self._lock:
+            self._keys.clear()
+            self._suggestions.clear()
+            self._normalized.clear()
+            self._tag_refs.clear()
+            self._resource_entries.clear()
+            self._ranked.clear()
+
+            # Append everything, then sort once instead of inserting in order
+            self._bulk_loading = True
+            try:
+                for resource_id, title, tags, views in rows:
+                    self.add(resource_id, title, tags, views)
+            finally:
+                self._bulk_loading = False
+                self._keys.sort()
+
+    def rebuild(self, db: Session) -> None:
+        rows = (
+            db.query(Resource.id, Resource.title, Resource.tags, Resource.views)
+            .filter(Resource.status == ResourceStatus.PUBLISHED)
+            .yield_per(1000)
+        )
+        self.load(
+            (resource_id, title, [tag.strip() for tag in (tags or "").split(",") if tag.strip()], views)
+            for resource_id, title, tags, views in rows
+        )
+
+    def _rank(self, key: str) -> List[str]:
+        """Top ``TOP_K`` suggestion ids for ``key``; call with the lock held."""
+
+        position = bisect.bisect_left(self._keys, (key, ""))
+        matches: Dict[str, Tuple[int, int]] = {}
+        while position < len(self._keys):
+            entry_key, sid = self._keys[position]
+            if not entry_key.startswith(key):
+                break
+            # Whole-text prefix matches rank above matches inside the text
+            starts = 1 if self._normalized[sid].startswith(key) else 0
+            matches[sid] = max(matches.get(sid, (0, 0)), (starts, self._suggestions[sid][3]))
+            position += 1
+
+        return heapq.nlargest(self.TOP_K, matches, key=lambda sid: (matches[sid], sid[0] == "r"))
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Return up to ``limit`` (at most ``TOP_K``) titles and tags matching ``prefix``."""
+
+        key = normalize_text(prefix).strip()
+        if not key:
+            return []
+
+        with self._lock:
+            ranked = self._ranked.get(key)
+            if ranked is None:
+                ranked = self._rank(key)
+                self._ranked[key] = ranked
+                while len(self._ranked) > self.MAX_CACHED_PREFIXES:
+                    self._ranked.popitem(last=False)
+            else:
+                self._ranked.move_to_end(key)
+
+            return [
+                {
+                    "text": self._suggestions[sid][0],
+                    "type": self._suggestions[sid][1],
+                    "resource_id": self._suggestions[sid][2],
+                }
+                for sid in ranked[:limit]
+            ]
+
+
+class SearchIndex:
+    """Facade choosing a backend for the configured database."""
+
+    def __init__(self, refresh_interval: float):
+        self.backend = InMemorySearchBackend()
+        self.suggestions = SuggestionIndex()
+        self.refresh_interval = refresh_interval
+        # Local suggestion writes made while a refresh reads the database, replayed onto its result
+        self._pending: Optional[List[Tuple[str, Optional[SuggestionRow]]]] = None
+        self._refresh_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, db: Session) -> None:
+        """Select the backend and build or verify its index."""
+
+        configured = settings.SEARCH_BACKEND
+        dialect = db.get_bind().dialect.name
+        if configured == "mysql" or (configured == "auto" and dialect == "mysql"):
+            backend = MySQLFullTextBackend()
+            try:
+                missing = backend.missing_indexes(db)
+            except Exception as exc:
+                db.rollback()
+                print(f"[Search] FULLTEXT unavailable, using in-memory index: {exc}")
+            else:
+                if missing:
+                    print(
+                        f"[Search] FULLTEXT indexes missing ({', '.join(missing)}), using in-memory index; "
+                        "run python -m backend.scripts.migration_add_search_index"
+                    )
+                else:
+                    self.backend = backend
+
+        if isinstance(self.backend, InMemorySearchBackend):
+            self.backend.rebuild(db)
+            print(f"[Search] In-memory index built ({self.backend.document_count} resources)")
+
+        self.suggestions.rebuild(db)
+
+    @staticmethod
+    def _apply_suggestion(suggestions: SuggestionIndex, resource_id: str, entry: Optional[SuggestionRow]) -> None:
+        if entry is None:
+            suggestions.remove(resource_id)
+        else:
+            suggestions.add(resource_id, *entry)
+
+    def _update_suggestions(self, resource_id: str, entry: Optional[SuggestionRow]) -> None:
+        with self._refresh_lock:
+            self._apply_suggestion(self.suggestions, resource_id, entry)
+            if self._pending is not None:
+                self._pending.append((resource_id, entry))
+
+    def index_resource(self, resource: Resource) -> None:
+        self.backend.index_resource(resource)
+        if resource.status == ResourceStatus.PUBLISHED:
+            self._update_suggestions(resource.id, (resource.title, resource.tags_list, resource.views))
+        else:
+            self._update_suggestions(resource.id, None)
+
+    def remove_resource(self, resource_id: str) -> None:
+        self.backend.remove_resource(resource_id)
+        self._update_suggestions(resource_id, None)
+
+    def refresh_suggestions(self, db: Session) -> None:
+        """Rebuild the suggestion index from the database and swap it in.
+
+        The new index is built aside, so lookups keep using the old one
+        meanwhile; local writes that land during the rebuild are replayed
+        onto it before the swap (re-adding a resource is idempotent).
+        """
+
+        with self._refresh_lock:
+            self._pending = []
+        fresh = SuggestionIndex()
+        try:
+            fresh.rebuild(db)
+        except Exception:
+            with self._refresh_lock:
+                self._pending = None
+            raise
+        with self._refresh_lock:
+            for resource_id, entry in self._pending:
+                self._apply_suggestion(fresh, resource_id, entry)
+            self._pending = None
+            self.suggestions = fresh
+
+    def _refresh_job(self) -> None:
+        db = SessionLocal()
+        try:
+            self.refresh_suggestions(db)
+        except Exception as exc:
+            print(f"[Search] Suggestion refresh failed: {exc}")
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await asyncio.to_thread(self._refresh_job)
+
+    def start_refresh(self) -> None:
+        """Start the periodic suggestion rebuild on the running event loop."""
+        if self._task is None and self.refresh_interval > 0:
+            self._task = asyncio.create_task(self._run())
+            print("[Search] Suggestion refresh task started")
+
+    async def stop(self) -> None:
+        """Cancel the suggestion refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        return self.suggestions.suggest(prefix, limit)
+
+    def search_ids(
+        self,
+        db: Session,
+        query: str,
+        category_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[str], int]:
+        """Return one page of ranked resource ids and the total number of matches."""
+
+        if isinstance(self.backend, MySQLFullTextBackend):
+            return self.backend.search_ids(db, query, category_id, offset, limit)
+        return self.backend.search_ids(query, category_id, offset, limit)
+
+
+search_index = SearchIndex(refresh_interval=settings.SEARCH_SUGGEST_REFRESH_INTERVAL)
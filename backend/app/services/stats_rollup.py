@@ -0,0 +1,256 @@
+"""Daily rollups of dashboard statistics."""
+
+import asyncio
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.models import DailyStats, PointTransaction, TransactionType, User, VisitorAnalytics
+
+
+settings = get_settings()
+
+ONE_DAY = timedelta(days=1)
+COUNTERS = ("new_users", "recharge_amount", "visits", "unique_sessions")
+
+
+def _as_date(value) -> date:
+    # func.date() comes back as a string on SQLite and as a date on MySQL
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _day_bounds(day: date):
+    start = datetime.combine(day, time.min)
+    return start, start + ONE_DAY
+
+
+class StatsRollupService:
+    """Maintain one ``DailyStats`` row per UTC day.
+
+    Finished days are read from the rollup table; the current day is always
+    computed live from the source tables with an indexed range scan, so
+    dashboard totals are exact without rescanning history. A background task
+    re-aggregates today, yesterday (to catch late analytics flushes) and any
+    day marked dirty by a delete every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._dirty: Set[date] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def today() -> date:
+        return datetime.utcnow().date()
+
+    def compute_day(self, db: Session, day: date) -> Dict[str, int]:
+        """Aggregate the source tables for a single day."""
+
+        start, end = _day_bounds(day)
+        new_users = (
+            db.query(func.count(User.id))
+            .filter(User.created_at >= start, User.created_at < end)
+            .scalar()
+        )
+        recharge_amount = (
+            db.query(func.sum(PointTransaction.amount))
+            .filter(
+                PointTransaction.type == TransactionType.RECHARGE,
+                PointTransaction.created_at >= start,
+                PointTransaction.created_at < end,
+            )
+            .scalar()
+        )
+        visits, unique_sessions = (
+            db.query(func.count(VisitorAnalytics.id), func.count(func.distinct(VisitorAnalytics.session_id)))
+            .filter(VisitorAnalytics.created_at >= start, VisitorAnalytics.created_at < end)
+            .one()
+        )
+        return {
+            "new_users": new_users or 0,
+            "recharge_amount": recharge_amount or 0,
+            "visits": visits or 0,
+            "unique_sessions": unique_sessions or 0,
+        }
+
+    @staticmethod
+    def _store(db: Session, day: date, values: Dict[str, int]) -> None:
+        row = db.get(DailyStats, day)
+        if row is None:
+            row = DailyStats(day=day)
+            db.add(row)
+        for key in COUNTERS:
+            setattr(row, key, values.get(key, 0))
+
+    def refresh_days(self, db: Session, days: Iterable[date]) -> int:
+        """Recompute and store the rollup rows for ``days``."""
+
+        count = 0
+        for day in sorted(set(days)):
+            self._store(db, day, self.compute_day(db, day))
+            count += 1
+        db.commit()
+        return count
+
+    def mark_dirty(self, moment: Optional[datetime]) -> None:
+        """Schedule the day containing ``moment`` for re-aggregation (e.g. after a delete)."""
+        if moment is not None:
+            with self._lock:
+                self._dirty.add(moment.date())
+
+    def mark_user_deleted(self, db: Session, user: User) -> None:
+        """Schedule every day whose counters change when ``user`` is deleted.
+
+        Call before the delete: besides the signup day, the user's recharge
+        transactions go with them (``ON DELETE CASCADE``), so each day they
+        were made on is re-aggregated too.
+        """
+
+        recharge_days = (
+            db.query(func.date(PointTransaction.created_at))
+            .filter(
+                PointTransaction.user_id == user.id,
+                PointTransaction.type == TransactionType.RECHARGE,
+            )
+            .distinct()
+            .all()
+        )
+        self.mark_dirty(user.created_at)
+        with self._lock:
+            self._dirty.update(_as_date(day) for (day,) in recharge_days if day is not None)
+
+    def refresh_pending(self, db: Session) -> int:
+        """Refresh today, yesterday and every day marked dirty."""
+
+        with self._lock:
+            days = set(self._dirty)
+            self._dirty.clear()
+        today = self.today()
+        days.update((today, today - ONE_DAY))
+        try:
+            return self.refresh_days(db, days)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(days)
+            raise
+
+    def backfill(self, db: Session, since: Optional[date] = None) -> int:
+        """Rebuild rollup rows from the source tables with one GROUP BY per table.
+
+        Days from ``since`` (or all history) that no longer have any source
+        rows are reset to zero. Returns the number of rows written.
+        """
+
+        start = datetime.combine(since, time.min) if since else None
+        values: Dict[date, Dict[str, int]] = {}
+
+        def collect(created_at, *filters, **aggregates):
+            day = func.date(created_at)
+            query = db.query(day, *aggregates.values()).filter(*filters)
+            if start is not None:
+                query = query.filter(created_at >= start)
+            for row in query.group_by(day).all():
+                entry = values.setdefault(_as_date(row[0]), dict.fromkeys(COUNTERS, 0))
+                for key, value in zip(aggregates, row[1:]):
+                    entry[key] = value or 0
+
+        collect(User.created_at, new_users=func.count(User.id))
+        collect(
+            PointTransaction.created_at,
+            PointTransaction.type == TransactionType.RECHARGE,
+            recharge_amount=func.sum(PointTransaction.amount),
+        )
+        collect(
+            VisitorAnalytics.created_at,
+            visits=func.count(VisitorAnalytics.id),
+            unique_sessions=func.count(func.distinct(VisitorAnalytics.session_id)),
+        )
+
+        stale = db.query(DailyStats)
+        if since is not None:
+            stale = stale.filter(DailyStats.day >= since)
+        for row in stale.all():
+            values.setdefault(row.day, dict.fromkeys(COUNTERS, 0))
+
+        for day, entry in values.items():
+            self._store(db, day, entry)
+        db.commit()
+        return len(values)
+
+    def totals(
+        self,
+        db: Session,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        today_values: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, int]:
+        """Sum the counters for days in ``[start, end)``; open bounds mean all history / through today.
+
+        Pass ``today_values`` from ``compute_day`` to reuse one live aggregate
+        of the current day across several windows. ``unique_sessions`` is a sum
+        of per-day uniques, so a session active on several days is counted
+        once per day.
+        """
+
+        today = self.today()
+        end = min(end, today + ONE_DAY) if end else today + ONE_DAY
+
+        query = db.query(*(func.sum(getattr(DailyStats, key)) for key in COUNTERS)).filter(
+            DailyStats.day < min(end, today)
+        )
+        if start is not None:
+            query = query.filter(DailyStats.day >= start)
+        totals = {key: int(value or 0) for key, value in zip(COUNTERS, query.one())}
+
+        if (start is None or start <= today) and end > today:
+            if today_values is None:
+                today_values = self.compute_day(db, today)
+            for key, value in today_values.items():
+                totals[key] += value
+        return totals
+
+    def _refresh_job(self) -> None:
+        db = SessionLocal()
+        try:
+            if db.query(DailyStats.day).first() is None:
+                written = self.backfill(db)
+                print(f"[StatsRollup] Empty rollup table, backfilled {written} days")
+            else:
+                self.refresh_pending(db)
+        except Exception as exc:
+            print(f"[StatsRollup] Refresh failed: {exc}")
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self._refresh_job)
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start the periodic refresh task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            print("[StatsRollup] Started")
+
+    async def stop(self) -> None:
+        """Cancel the refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+stats_rollup = StatsRollupService(refresh_interval=settings.STATS_ROLLUP_INTERVAL)
@@ -1,20 +1,86 @@
 """MinIO storage helper."""
 
+import asyncio
+import functools
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import BinaryIO, Iterator, Optional, Tuple
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from minio import Minio
+from minio.datatypes import Object, Part
 from minio.error import S3Error
 
 from backend.app.core.config import get_settings
+from backend.app.services.media_cache import media_cache
 
 
 settings = get_settings()
 
 
+class PresignedURLCache:
+    """LRU of presigned URLs keyed by ``(object_name, expires)``.
+
+    An entry is served for at most ``ttl`` seconds and never past one minute
+    before the URL itself expires, so callers always get a link with at least
+    ``expires - ttl`` seconds of validity left.
+    """
+
+    EXPIRY_MARGIN = 60
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], str]:
+        now = time.monotonic()
+        found: Dict[Tuple[str, int], str] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None or entry[0] <= now:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+                self.hits += 1
+        return found
+
+    def set_many(self, urls: Dict[Tuple[str, int], str]) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, url in urls.items():
+                lifetime = min(self.ttl, key[1] - self.EXPIRY_MARGIN)
+                if lifetime <= 0:
+                    continue
+                self._entries[key] = (now + lifetime, url)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, object_name: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == object_name]:
+                del self._entries[key]
+
+
 class MinIOStorage:
-    """Wrapper around MinIO client with basic helpers."""
+    """Wrapper around MinIO client with basic helpers.
+
+    The MinIO client is blocking. Endpoints call the ``*_async`` variants,
+    which run the same calls on a dedicated pool of ``STORAGE_IO_THREADS``
+    threads so transfers never stall the event loop, and slow storage cannot
+    starve the shared threadpool that sync dependencies run on.
+    """
 
     def __init__(self):
         self.client = Minio(
@@ -22,7 +88,18 @@ class MinIOStorage:
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
             secure=settings.MINIO_SECURE,
+            region=settings.MINIO_REGION,
         )
+        self.url_cache = PresignedURLCache(
+            ttl=settings.PRESIGNED_URL_CACHE_TTL,
+            max_entries=settings.PRESIGNED_URL_CACHE_SIZE,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.STORAGE_IO_THREADS,
+            thread_name_prefix="storage-io",
+        )
+        self._busy = 0
+        self._busy_lock = threading.Lock()
         self._ensure_bucket()
 
     def _ensure_bucket(self) -> None:
@@ -86,27 +163,68 @@ class MinIOStorage:
         except (S3Error, ValueError) as exc:
             raise Exception(f"Error uploading file: {exc}") from exc
 
-    def get_file_url(self, object_name: str, expires: int = 3600) -> str:
-        """Return a presigned download URL."""
-
+    def _presign(self, safe_name: str, expires: int, response_headers: Optional[Dict[str, str]] = None) -> str:
         try:
-            safe_name = self._sanitize_object_name(object_name)
             # MinIO expects timedelta object, not integer seconds
-            expires_delta = timedelta(seconds=expires)
             return self.client.presigned_get_object(
                 settings.MINIO_BUCKET,
                 safe_name,
-                expires=expires_delta,
+                expires=timedelta(seconds=expires),
+                response_headers=response_headers,
             )
         except S3Error as exc:
             raise Exception(f"Error generating file URL: {exc}") from exc
 
+    def get_file_url(
+        self,
+        object_name: str,
+        expires: Optional[int] = None,
+        response_headers: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Return a presigned download URL, reusing a cached one when still fresh.
+
+        ``response_headers`` (e.g. ``response-content-disposition``) are signed
+        into the URL so MinIO sends them with the object; such URLs are not cached.
+        """
+
+        safe_name = self._sanitize_object_name(object_name)
+        if response_headers:
+            return self._presign(safe_name, expires or settings.PRESIGNED_URL_EXPIRES, response_headers)
+        return self.get_file_urls([safe_name], expires)[safe_name]
+
+    def get_file_urls(
+        self, object_names: Iterable[str], expires: Optional[int] = None
+    ) -> Dict[str, str]:
+        """Return presigned download URLs for several objects, keyed by object name.
+
+        Cached URLs are looked up under a single lock acquisition and only the
+        misses are signed. Names that fail sanitization are left out of the result.
+        """
+
+        expires = expires or settings.PRESIGNED_URL_EXPIRES
+        keys: Dict[str, Tuple[str, int]] = {}
+        for name in object_names:
+            try:
+                keys[name] = (self._sanitize_object_name(name), expires)
+            except ValueError:
+                continue
+
+        wanted = set(keys.values())
+        urls = self.url_cache.get_many(wanted)
+        signed = {key: self._presign(key[0], expires) for key in wanted - urls.keys()}
+        self.url_cache.set_many(signed)
+        urls.update(signed)
+
+        return {name: urls[key] for name, key in keys.items()}
+
     def delete_file(self, object_name: str) -> None:
         """Delete an object from MinIO."""
 
         try:
             safe_name = self._sanitize_object_name(object_name)
             self.client.remove_object(settings.MINIO_BUCKET, safe_name)
+            self.url_cache.discard(safe_name)
+            media_cache.discard(safe_name)
         except S3Error as exc:
             raise Exception(f"Error deleting file: {exc}") from exc
 
@@ -123,14 +241,27 @@ class MinIOStorage:
         except S3Error as exc:
             raise Exception(f"Error retrieving file: {exc}") from exc
 
+    def stat_file(self, object_name: str) -> Object:
+        """Return size, ETag, Last-Modified and content type of a stored object."""
+
+        try:
+            safe_name = self._sanitize_object_name(object_name)
+            return self.client.stat_object(settings.MINIO_BUCKET, safe_name)
+        except S3Error as exc:
+            raise Exception(f"Error retrieving file: {exc}") from exc
+
     def stream_file(
-        self, object_name: str, chunk_size: int = 1024 * 1024
+        self,
+        object_name: str,
+        chunk_size: int = 1024 * 1024,
+        offset: int = 0,
+        length: Optional[int] = None,
     ) -> Tuple[Optional[str], Iterator[bytes]]:
-        """Stream a stored object without loading it fully into memory."""
+        """Stream a stored object, or ``length`` bytes of it from ``offset``, without loading it into memory."""
 
         safe_name = self._sanitize_object_name(object_name)
         try:
-            response = self.client.get_object(settings.MINIO_BUCKET, safe_name)
+            response = self.client.get_object(settings.MINIO_BUCKET, safe_name, offset=offset, length=length or 0)
         except S3Error as exc:
             raise Exception(f"Error retrieving file: {exc}") from exc
 
@@ -146,5 +277,160 @@ class MinIOStorage:
 
         return content_type, iterator()
 
+    # Multipart uploads. The minio client only exposes these S3 calls as
+    # underscore methods (stable across 7.x); put_object uses them internally.
+
+    def create_multipart_upload(
+        self, filename: str, content_type: Optional[str] = None, prefix: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Start a multipart upload and return ``(object_name, upload_id)``."""
+
+        object_name = self._generate_object_name(filename, prefix)
+        try:
+            upload_id = self.client._create_multipart_upload(
+                settings.MINIO_BUCKET,
+                object_name,
+                {"Content-Type": content_type or "application/octet-stream"},
+            )
+        except S3Error as exc:
+            raise Exception(f"Error starting upload: {exc}") from exc
+        return object_name, upload_id
+
+    def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Store one part and return its ETag."""
+
+        try:
+            return self.client._upload_part(settings.MINIO_BUCKET, object_name, data, None, upload_id, part_number)
+        except S3Error as exc:
+            raise Exception(f"Error uploading part: {exc}") from exc
+
+    def list_parts(self, object_name: str, upload_id: str) -> List[Part]:
+        """Return the parts stored so far, in part number order."""
+
+        parts: List[Part] = []
+        marker = None
+        try:
+            while True:
+                result = self.client._list_parts(
+                    settings.MINIO_BUCKET, object_name, upload_id, part_number_marker=marker
+                )
+                parts.extend(result.parts)
+                if not result.is_truncated:
+                    return parts
+                marker = result.next_part_number_marker
+        except S3Error as exc:
+            raise Exception(f"Error listing parts: {exc}") from exc
+
+    def complete_multipart_upload(self, object_name: str, upload_id: str, parts: List[Part]) -> None:
+        try:
+            self.client._complete_multipart_upload(settings.MINIO_BUCKET, object_name, upload_id, parts)
+        except S3Error as exc:
+            raise Exception(f"Error completing upload: {exc}") from exc
+
+    def abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
+        try:
+            self.client._abort_multipart_upload(settings.MINIO_BUCKET, object_name, upload_id)
+        except S3Error as exc:
+            if exc.code != "NoSuchUpload":
+                raise Exception(f"Error aborting upload: {exc}") from exc
+
+    def list_multipart_uploads(self, prefix: Optional[str] = None) -> List[Tuple[str, str, Any]]:
+        """Return ``(object_name, upload_id, initiated_time)`` of unfinished uploads (first 1000)."""
+
+        try:
+            result = self.client._list_multipart_uploads(settings.MINIO_BUCKET, prefix=prefix)
+        except S3Error as exc:
+            raise Exception(f"Error listing uploads: {exc}") from exc
+        return [(upload.object_name, upload.upload_id, upload.initiated_time) for upload in result.uploads]
+
+    def _tracked(self, func: Callable[..., Any]) -> Any:
+        with self._busy_lock:
+            self._busy += 1
+        try:
+            return func()
+        finally:
+            with self._busy_lock:
+                self._busy -= 1
+
+    async def offload(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking storage call on the storage I/O pool."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, self._tracked, call)
+
+    async def upload_file_async(
+        self,
+        file: BinaryIO,
+        filename: str,
+        content_type: Optional[str] = None,
+        length: Optional[int] = None,
+        prefix: Optional[str] = None,
+    ) -> str:
+        """``upload_file`` on the storage I/O pool."""
+        return await self.offload(self.upload_file, file, filename, content_type, length, prefix)
+
+    async def delete_file_async(self, object_name: str) -> None:
+        """``delete_file`` on the storage I/O pool."""
+        await self.offload(self.delete_file, object_name)
+
+    async def get_file_url_async(
+        self,
+        object_name: str,
+        expires: Optional[int] = None,
+        response_headers: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """``get_file_url`` on the storage I/O pool (signing may look up the bucket region)."""
+        return await self.offload(self.get_file_url, object_name, expires, response_headers)
+
+    async def stat_file_async(self, object_name: str) -> Object:
+        """``stat_file`` on the storage I/O pool."""
+        return await self.offload(self.stat_file, object_name)
+
+    async def stream_file_async(
+        self,
+        object_name: str,
+        chunk_size: int = 1024 * 1024,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> Tuple[Optional[str], AsyncIterator[bytes]]:
+        """Open an object on the storage I/O pool and read it chunk by chunk there.
+
+        The returned iterator can be handed to ``StreamingResponse`` directly;
+        only one chunk per stream is in flight at a time, so a slow client
+        holds no pool thread while its socket drains.
+        """
+
+        content_type, chunks = await self.offload(self.stream_file, object_name, chunk_size, offset, length)
+
+        async def iterator() -> AsyncIterator[bytes]:
+            pending = None
+            try:
+                while True:
+                    pending = self._executor.submit(self._tracked, functools.partial(next, chunks, None))
+                    data = await asyncio.wrap_future(pending)
+                    if data is None:
+                        break
+                    yield data
+            finally:
+                # Closing the generator closes and releases the MinIO response. If the
+                # client went away mid-read, wait for that read to return first.
+                if pending is not None and not pending.done():
+                    pending.add_done_callback(lambda _: chunks.close())
+                else:
+                    chunks.close()
+
+        return content_type, iterator()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "io_threads": self._executor._max_workers,
+            "io_busy": self._busy,
+            "io_queued": self._executor._work_queue.qsize(),
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting storage work; in-flight transfers finish on their threads."""
+        self._executor.shutdown(wait=False)
+
 
 storage = MinIOStorage()
@@ -0,0 +1,85 @@
+"""Batched id -> (username, avatar) lookups for listing endpoints."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.models import User
+
+
+settings = get_settings()
+
+# (username, avatar_url); both None for ids that no longer exist
+UserProfile = Tuple[Optional[str], Optional[str]]
+UNKNOWN_USER: UserProfile = (None, None)
+
+
+class UserProfileLoader:
+    """Resolve the author/actor columns of a page of rows with at most one query.
+
+    ``load`` returns the profiles of every id it is given: ids seen within
+    the last ``ttl`` seconds come from an LRU of ``max_size`` entries, the
+    rest are fetched together with a single ``IN`` query over two columns.
+    Profile edits call ``invalidate``; the TTL bounds staleness from other
+    worker processes.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, UserProfile]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, db: Session, user_ids: Iterable[Optional[str]]) -> Dict[str, UserProfile]:
+        wanted = {user_id for user_id in user_ids if user_id}
+        profiles: Dict[str, UserProfile] = {}
+        now = time.monotonic()
+
+        with self._lock:
+            for user_id in wanted:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[0] >= now:
+                    self._entries.move_to_end(user_id)
+                    profiles[user_id] = entry[1]
+            self.hits += len(profiles)
+
+        missing = wanted - profiles.keys()
+        if not missing:
+            return profiles
+
+        fetched = {
+            user_id: (username, avatar_url)
+            for user_id, username, avatar_url in db.query(User.id, User.username, User.avatar_url)
+            .filter(User.id.in_(missing))
+        }
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self.misses += len(missing)
+            for user_id in missing:
+                # Deleted users are cached too, so their old rows stay cheap
+                profile = fetched.get(user_id, UNKNOWN_USER)
+                profiles[user_id] = profile
+                self._entries[user_id] = (expires_at, profile)
+                self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return profiles
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+user_profiles = UserProfileLoader(
+    ttl=settings.USER_PROFILE_CACHE_TTL,
+    max_size=settings.USER_PROFILE_CACHE_SIZE,
+)
@@ -0,0 +1,130 @@
+"""Write-behind buffer for resource view counts."""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, func, update
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import engine
+from backend.app.models import Resource
+
+
+settings = get_settings()
+
+
+class ViewCounterBuffer:
+    """Collect view increments in memory and flush them in batches.
+
+    Article reads call ``record`` instead of updating ``Resource.views``
+    directly. A background task flushes the pending increments every
+    ``flush_interval`` seconds, or sooner once ``flush_threshold`` hits have
+    accumulated, using one executemany ``UPDATE ... SET views = views + n``.
+    """
+
+    def __init__(self, flush_interval: float, flush_threshold: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_total = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of increments recorded but not yet written to the database."""
+        return self._pending_total
+
+    def record(self, resource_id: str, count: int = 1) -> None:
+        """Buffer ``count`` views for a resource."""
+        with self._lock:
+            self._pending[resource_id] += count
+            self._pending_total += count
+            should_flush = self._pending_total >= self.flush_threshold
+
+        if should_flush and self._wakeup is not None:
+            self._wakeup.set()
+
+    def pending_for(self, resource_id: str) -> int:
+        """Return the buffered increments for a single resource."""
+        with self._lock:
+            return self._pending.get(resource_id, 0)
+
+    def _drain(self) -> Dict[str, int]:
+        with self._lock:
+            batch = dict(self._pending)
+            self._pending.clear()
+            self._pending_total = 0
+        return batch
+
+    def _restore(self, batch: Dict[str, int]) -> None:
+        with self._lock:
+            for resource_id, count in batch.items():
+                self._pending[resource_id] += count
+                self._pending_total += count
+
+    def flush(self) -> int:
+        """Write all pending increments to the database and return how many were applied."""
+        batch = self._drain()
+        if not batch:
+            return 0
+
+        table = Resource.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(views=func.coalesce(table.c.views, 0) + bindparam("b_count"))
+        )
+        params = [{"b_id": resource_id, "b_count": count} for resource_id, count in batch.items()]
+
+        try:
+            with engine.begin() as connection:
+                connection.execute(stmt, params)
+        except Exception as exc:
+            # Keep the increments so the next flush can retry them
+            self._restore(batch)
+            print(f"[ViewCounter] Flush failed, {sum(batch.values())} views kept pending: {exc}")
+            return 0
+
+        applied = sum(batch.values())
+        self.flushed_total += applied
+        return applied
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.flush)
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            print("[ViewCounter] Started")
+
+    async def stop(self) -> None:
+        """Cancel the flush task and write out anything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        applied = await asyncio.to_thread(self.flush)
+        print(f"[ViewCounter] Shutdown, flushed {applied} pending views")
+
+
+view_counter = ViewCounterBuffer(
+    flush_interval=settings.VIEW_COUNTER_FLUSH_INTERVAL,
+    flush_threshold=settings.VIEW_COUNTER_FLUSH_THRESHOLD,
+)
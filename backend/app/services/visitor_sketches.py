@@ -0,0 +1,230 @@
+"""Unique-visitor counting with per-day HyperLogLog sketches."""
+
+import threading
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.db.session import engine
+from backend.app.models import VisitorAnalytics, VisitorSketch
+from backend.app.services.resource_cache import ResultCache
+from backend.app.utils.hyperloglog import HyperLogLog
+
+
+settings = get_settings()
+
+SITE = ""
+ONE_DAY = timedelta(days=1)
+MAX_PAGE_PATH = VisitorSketch.__table__.c.page_path.type.length
+
+
+def normalize_page_path(page_path: Optional[str]) -> str:
+    """Key a page by its path alone: no query string or fragment, no trailing slash."""
+
+    if not page_path:
+        return SITE
+    path = page_path.split("?", 1)[0].split("#", 1)[0].strip()
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    return path[:MAX_PAGE_PATH]
+
+
+class VisitorSketchService:
+    """Keep one HyperLogLog of session ids per (UTC day, page), plus a site-wide one per day.
+
+    The analytics ingest queue passes every flushed page view to ``observe``
+    and then calls ``persist``, which merges the new registers into the
+    stored blobs. Because merging is idempotent, a failed persist simply
+    keeps the sketches pending and retries on the next flush.
+
+    ``unique_visitors`` merges the stored sketches of a date range. The merged
+    sketch of the finished days is cached, so repeated queries only read
+    today's row.
+
+    Page paths come from clients, so they are normalized (see
+    ``normalize_page_path``) and at most ``max_paths`` of them get their own
+    sketch per day; views of further paths only count towards the site-wide
+    sketch (``overflow`` counts them).
+    """
+
+    def __init__(self, cache_ttl: float, max_paths: int):
+        self.max_paths = max_paths
+        self._pending: Dict[Tuple[date, str], HyperLogLog] = defaultdict(HyperLogLog)
+        # Paths given a sketch so far, for the current and previous day
+        self._paths: Dict[date, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._ranges = ResultCache("visitor_sketch_ranges", ttl=cache_ttl)
+        self.overflow = 0
+
+    def _admit_path(self, day: date, page_path: str) -> bool:
+        paths = self._paths.get(day)
+        if paths is None:
+            paths = self._paths[day] = set()
+            for known in [known for known in self._paths if known < day - ONE_DAY]:
+                del self._paths[known]
+        if page_path in paths:
+            return True
+        if len(paths) >= self.max_paths:
+            self.overflow += 1
+            return False
+        paths.add(page_path)
+        return True
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def observe(self, page_views: Iterable[Dict[str, Any]]) -> None:
+        """Add the session ids of queued ``VisitorAnalytics`` rows to the pending sketches."""
+
+        with self._lock:
+            for row in page_views:
+                session_id = row.get("session_id")
+                created_at = row.get("created_at")
+                if not session_id or created_at is None:
+                    continue
+                day = created_at.date()
+                self._pending[(day, SITE)].add(session_id)
+                page_path = normalize_page_path(row.get("page_path"))
+                if page_path and self._admit_path(day, page_path):
+                    self._pending[(day, page_path)].add(session_id)
+
+    def _restore(self, batch: Dict[Tuple[date, str], HyperLogLog]) -> None:
+        with self._lock:
+            for key, sketch in batch.items():
+                self._pending[key].merge(sketch)
+
+    def persist(self) -> int:
+        """Merge pending sketches into ``visitor_sketches``; returns how many rows were written."""
+
+        with self._lock:
+            batch = dict(self._pending)
+            self._pending.clear()
+        if not batch:
+            return 0
+
+        table = VisitorSketch.__table__
+        try:
+            with engine.begin() as connection:
+                for (day, page_path), sketch in batch.items():
+                    row = connection.execute(
+                        select(table.c.id, table.c.registers)
+                        .where(table.c.day == day, table.c.page_path == page_path)
+                        .with_for_update()
+                    ).first()
+                    if row is None:
+                        connection.execute(
+                            insert(table).values(day=day, page_path=page_path, registers=sketch.to_bytes())
+                        )
+                    else:
+                        merged = HyperLogLog.from_bytes(row.registers).merge(sketch)
+                        connection.execute(
+                            update(table).where(table.c.id == row.id).values(registers=merged.to_bytes())
+                        )
+        except Exception as exc:
+            self._restore(batch)
+            print(f"[VisitorSketch] Persist failed, {len(batch)} sketches kept pending: {exc}")
+            return 0
+        return len(batch)
+
+    @staticmethod
+    def _merge_rows(db: Session, page_path: str, start: Optional[date], end: date) -> HyperLogLog:
+        query = db.query(VisitorSketch.registers).filter(
+            VisitorSketch.page_path == page_path,
+            VisitorSketch.day < end,
+        )
+        if start is not None:
+            query = query.filter(VisitorSketch.day >= start)
+
+        merged = HyperLogLog()
+        for (registers,) in query.yield_per(100):
+            merged.merge(HyperLogLog.from_bytes(registers))
+        return merged
+
+    def unique_visitors(
+        self,
+        db: Session,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        page_path: Optional[str] = None,
+    ) -> int:
+        """Estimate distinct sessions for days in ``[start, end)``, site-wide or for one page.
+
+        See ``hyperloglog.standard_error`` for the error bound.
+        """
+
+        page_path = normalize_page_path(page_path)
+        today = datetime.utcnow().date()
+        end = min(end, today + ONE_DAY) if end else today + ONE_DAY
+        finished_end = min(end, today)
+
+        merged = HyperLogLog()
+        if start is None or start < finished_end:
+            key = (page_path, start, finished_end)
+            finished = self._ranges.get(key)
+            if finished is None:
+                finished = self._merge_rows(db, page_path, start, finished_end)
+                self._ranges.set(key, finished)
+            merged.merge(finished)
+
+        if (start is None or start <= today) and end > today:
+            merged.merge(self._merge_rows(db, page_path, today, today + ONE_DAY))
+        return merged.count()
+
+    def rebuild(self, db: Session, since: Optional[date] = None) -> int:
+        """Recreate sketches from ``visitor_analytics`` one day at a time; returns rows written."""
+
+        table = VisitorSketch.__table__
+        query = db.query(
+            VisitorAnalytics.session_id,
+            VisitorAnalytics.page_path,
+            VisitorAnalytics.created_at,
+        ).order_by(VisitorAnalytics.created_at)
+        delete = table.delete()
+        if since is not None:
+            query = query.filter(VisitorAnalytics.created_at >= datetime.combine(since, time.min))
+            delete = delete.where(table.c.day >= since)
+
+        written = 0
+        current_day = None
+        sketches: Dict[str, HyperLogLog] = defaultdict(HyperLogLog)
+
+        # Writes go through their own connection so the read below can stream
+        with engine.begin() as connection:
+            connection.execute(delete)
+
+            def write_day() -> int:
+                rows = [
+                    {"day": current_day, "page_path": page_path, "registers": sketch.to_bytes()}
+                    for page_path, sketch in sketches.items()
+                ]
+                if rows:
+                    connection.execute(insert(table), rows)
+                sketches.clear()
+                return len(rows)
+
+            for session_id, page_path, created_at in query.yield_per(10000):
+                if created_at is None or not session_id:
+                    continue
+                day = created_at.date()
+                if day != current_day:
+                    written += write_day()
+                    current_day = day
+                sketches[SITE].add(session_id)
+                page_path = normalize_page_path(page_path)
+                if page_path and (page_path in sketches or len(sketches) <= self.max_paths):
+                    sketches[page_path].add(session_id)
+            written += write_day()
+
+        self._ranges.invalidate()
+        return written
+
+
+visitor_sketches = VisitorSketchService(
+    cache_ttl=settings.VISITOR_SKETCH_CACHE_TTL,
+    max_paths=settings.VISITOR_SKETCH_MAX_PATHS,
+)
@@ -0,0 +1,113 @@
+"""HyperLogLog cardinality sketch."""
+
+import hashlib
+import math
+import zlib
+from collections import Counter
+from typing import Iterable, Optional
+
+
+FORMAT_VERSION = 1
+DEFAULT_PRECISION = 14
+
+_HIGH_BITS = {}
+
+
+def _register_max(left: bytes, right: bytes) -> bytes:
+    """Byte-wise maximum of two equal-length register arrays.
+
+    Registers never exceed 64, so every byte has its top bit free. Setting
+    that bit on ``left`` and subtracting ``right`` as one big integer leaves
+    the bit set exactly where ``left >= right``, with no borrow crossing
+    byte boundaries; the resulting mask selects the larger byte. This keeps
+    merges in C-level integer operations instead of a per-register loop.
+    """
+
+    size = len(left)
+    high = _HIGH_BITS.get(size)
+    if high is None:
+        high = _HIGH_BITS[size] = int.from_bytes(b"\x80" * size, "big")
+    a = int.from_bytes(left, "big")
+    b = int.from_bytes(right, "big")
+    take_left = ((((a | high) - b) & high) >> 7) * 0xFF
+    merged = (a & take_left) | (b & ~take_left)
+    return merged.to_bytes(size, "big")
+
+
+def standard_error(precision: int = DEFAULT_PRECISION) -> float:
+    """Relative standard error of an estimate: 1.04 / sqrt(2 ** precision).
+
+    At the default precision of 14 that is about 0.81%; roughly 99.7% of
+    estimates fall within three standard errors (about 2.4%) of the true count.
+    """
+
+    return 1.04 / math.sqrt(1 << precision)
+
+
+class HyperLogLog:
+    """Estimate the number of distinct strings added, in ``2 ** precision`` bytes.
+
+    Sketches of the same precision merge by taking the register-wise maximum,
+    so per-day sketches can be combined into the count for any range of days.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.m)
+        elif len(registers) != self.m:
+            raise ValueError("register count does not match precision")
+        else:
+            self.registers = bytearray(registers)
+
+    def add(self, value: str) -> None:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+        x = int.from_bytes(digest, "big")
+        rest_bits = 64 - self.precision
+        index = x >> rest_bits
+        rest = x & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold ``other`` into this sketch in place and return self."""
+
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(_register_max(self.registers, other.registers))
+        return self
+
+    def is_empty(self) -> bool:
+        return not any(self.registers)
+
+    def count(self) -> int:
+        m = self.m
+        histogram = Counter(self.registers)
+        harmonic = sum(occurrences * 2.0 ** -rank for rank, occurrences in histogram.items())
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / harmonic
+
+        zeros = histogram.get(0, 0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compressed blob; sparse sketches shrink to a few hundred bytes."""
+
+        return bytes((FORMAT_VERSION, self.precision)) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "HyperLogLog":
+        if len(blob) < 2 or blob[0] != FORMAT_VERSION:
+            raise ValueError("unsupported sketch format")
+        return cls(precision=blob[1], registers=zlib.decompress(blob[2:]))
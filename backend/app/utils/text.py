@@ -1,6 +1,8 @@
 """Text utility helpers."""
 
 import re
+import unicodedata
+from typing import Optional
 
 
 def create_slug(text: str) -> str:
@@ -10,3 +12,69 @@ def create_slug(text: str) -> str:
     text = re.sub(r"[^\w\s-]", "", text)
     text = re.sub(r"[-\s]+", "-", text)
     return text.strip("-")
+
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_LATIN_WORD_RE = re.compile(r"[a-z0-9]+(?:['_][a-z0-9]+)*")
+_CJK_RUN_RE = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+
+
+def strip_html(text: str) -> str:
+    """Drop HTML tags, keeping the text between them."""
+
+    return _HTML_TAG_RE.sub(" ", text)
+
+
+def normalize_text(text: str) -> str:
+    """Fold full-width characters and case so user input matches stored text."""
+
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def tokenize(text: str, cjk_unigrams: bool = False) -> list:
+    """Split text into search tokens.
+
+    Latin text is lower-cased and split into words; runs of CJK characters
+    are split into overlapping bigrams (a lone character is kept as is), so
+    Chinese titles can be matched without a dictionary segmenter. Indexing
+    passes ``cjk_unigrams`` to also emit every CJK character, so that a
+    one-character query finds it inside longer runs.
+    """
+
+    if not text:
+        return []
+
+    text = normalize_text(text)
+    tokens = _LATIN_WORD_RE.findall(_CJK_RUN_RE.sub(" ", text))
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1 or cjk_unigrams:
+            tokens.extend(run)
+        if len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def last_latin_word(text: str) -> Optional[str]:
+    """Return the last Latin word of the text as ``tokenize`` spells it, if any."""
+
+    words = _LATIN_WORD_RE.findall(_CJK_RUN_RE.sub(" ", normalize_text(text)))
+    return words[-1] if words else None
+
+
+def suggestion_keys(text: str, max_length: int = 32) -> list:
+    """Return lookup keys for autocomplete: the text from each word or CJK character start.
+
+    Keys are normalized and truncated to ``max_length`` characters, which is
+    longer than anything typed into a search box.
+    """
+
+    normalized = normalize_text(text).strip()
+    keys = []
+    for index, char in enumerate(normalized):
+        if char.isspace():
+            continue
+        previous = normalized[index - 1] if index else " "
+        is_cjk = bool(_CJK_RUN_RE.match(char))
+        if is_cjk or not previous.isalnum() or _CJK_RUN_RE.match(previous):
+            keys.append(normalized[index:index + max_length])
+    return list(dict.fromkeys(keys))
@@ -0,0 +1,30 @@
+"""Rebuild the daily_stats rollup table from users, point_transactions and visitor_analytics.
+
+Run once after the migration, or again after bulk imports/deletes:
+    python -m backend.scripts.backfill_daily_stats            # all history
+    python -m backend.scripts.backfill_daily_stats 2025-01-01 # from a date on
+"""
+
+import sys
+import time
+from datetime import date
+
+from backend.app.db.session import SessionLocal
+from backend.app.services.stats_rollup import stats_rollup
+
+
+def main():
+    since = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        written = stats_rollup.backfill(db, since)
+        elapsed = time.perf_counter() - started
+        print(f"✓ Backfilled {written} days since {since or 'the beginning'} in {elapsed:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
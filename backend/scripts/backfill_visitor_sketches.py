@@ -0,0 +1,30 @@
+"""Rebuild the visitor_sketches HyperLogLog table from visitor_analytics.
+
+Streams page views in created_at order and writes one day of sketches at a time:
+    python -m backend.scripts.backfill_visitor_sketches            # all history
+    python -m backend.scripts.backfill_visitor_sketches 2025-01-01 # from a date on
+"""
+
+import sys
+import time
+from datetime import date
+
+from backend.app.db.session import SessionLocal
+from backend.app.services.visitor_sketches import visitor_sketches
+
+
+def main():
+    since = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        written = visitor_sketches.rebuild(db, since)
+        elapsed = time.perf_counter() - started
+        print(f"✓ Wrote {written} sketches since {since or 'the beginning'} in {elapsed:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
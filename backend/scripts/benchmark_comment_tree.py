@@ -0,0 +1,92 @@
+"""Compare SQL statement counts for loading a comment thread, legacy vs load_comment_tree.
+
+Builds synthetic threads of growing size on an existing resource inside a
+transaction that is rolled back afterwards, so nothing is left behind:
+    python -m backend.scripts.benchmark_comment_tree [resource_id]
+"""
+
+import random
+import sys
+import time
+
+from backend.app.db.session import SessionLocal
+from backend.app.models import Comment, Resource, User
+from backend.app.services.comment_tree import load_comment_tree
+from backend.scripts.benchmark_resource_detail import StatementCounter
+
+
+SIZES = (10, 100, 500)
+
+
+def legacy_tree(db, resource_id):
+    """The recursive per-node lookups get_resource_comments used to perform."""
+
+    def build(comment):
+        user = db.query(User).filter(User.id == comment.user_id).first()
+        replies = db.query(Comment).filter(Comment.parent_id == comment.id).order_by(Comment.created_at.asc()).all()
+        return {
+            "id": comment.id,
+            "username": user.username if user else None,
+            "replies": [build(reply) for reply in replies],
+        }
+
+    top = (
+        db.query(Comment)
+        .filter(Comment.resource_id == resource_id, Comment.parent_id == None)
+        .order_by(Comment.created_at.desc())
+        .all()
+    )
+    return [build(comment) for comment in top]
+
+
+def add_thread(db, resource_id, user_ids, size, rng):
+    """Add ``size`` comments: a third top-level, the rest replies to earlier ones."""
+
+    ids = []
+    for i in range(size):
+        parent_id = rng.choice(ids) if ids and i % 3 else None
+        comment = Comment(
+            user_id=rng.choice(user_ids),
+            resource_id=resource_id,
+            content=f"benchmark comment {i}",
+            parent_id=parent_id,
+        )
+        db.add(comment)
+        db.flush()
+        ids.append(comment.id)
+
+
+def measure(db, load):
+    with StatementCounter() as counter:
+        started = time.perf_counter()
+        load()
+        elapsed = (time.perf_counter() - started) * 1000
+    return counter.count, elapsed
+
+
+def main():
+    db = SessionLocal()
+    try:
+        resource_id = sys.argv[1] if len(sys.argv) > 1 else db.query(Resource.id).limit(1).scalar()
+        if resource_id is None:
+            raise SystemExit("No resource to attach comments to")
+        user_ids = [user_id for (user_id,) in db.query(User.id).limit(20)]
+        existing = db.query(Comment).filter(Comment.resource_id == resource_id).count()
+        rng = random.Random(7)
+
+        print(f"resource {resource_id} ({existing} existing comments)")
+        print(f"{'thread size':>12} {'legacy stmts':>13} {'legacy ms':>10} {'tree stmts':>11} {'tree ms':>8}")
+        added = 0
+        for size in SIZES:
+            add_thread(db, resource_id, user_ids, size - added, rng)
+            added = size
+            legacy = measure(db, lambda: legacy_tree(db, resource_id))
+            tree = measure(db, lambda: load_comment_tree(db, resource_id))
+            print(f"{existing + size:>12} {legacy[0]:>13} {legacy[1]:>10.1f} {tree[0]:>11} {tree[1]:>8.1f}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
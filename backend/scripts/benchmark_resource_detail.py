@@ -0,0 +1,106 @@
+"""Compare SQL statement counts for building one ResourceResponse.
+
+Run against the configured database:
+    python -m backend.scripts.benchmark_resource_detail [resource_id] [username]
+"""
+
+import sys
+import time
+
+from sqlalchemy import event
+
+from backend.app.db.session import SessionLocal, engine
+from backend.app.models import (
+    Comment,
+    PointTransaction,
+    Resource,
+    ResourceLike,
+    TransactionType,
+    User,
+)
+from backend.app.schemas import ResourceResponse
+from backend.app.services.resource_loader import load_resource_detail
+
+
+class StatementCounter:
+    """Count statements sent through the engine while active."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self)
+
+
+def legacy_detail(db, resource_id, user):
+    """The per-field lookups get_resource used to perform."""
+
+    resource = db.query(Resource).filter(Resource.id == resource_id).first()
+    if user and not resource.is_free and resource.points_required > 0:
+        resource.is_purchased_by_user = bool(
+            db.query(PointTransaction)
+            .filter(
+                PointTransaction.user_id == user.id,
+                PointTransaction.type == TransactionType.PURCHASE,
+                PointTransaction.reference_id == f"resource_{resource.id}",
+            )
+            .first()
+        )
+    resource.like_count = db.query(ResourceLike).filter(ResourceLike.resource_id == resource.id).count()
+    resource.comment_count = db.query(Comment).filter(Comment.resource_id == resource.id).count()
+    if user:
+        resource.is_liked_by_user = bool(
+            db.query(ResourceLike)
+            .filter(ResourceLike.user_id == user.id, ResourceLike.resource_id == resource.id)
+            .first()
+        )
+    return resource
+
+
+def measure(label, loader, resource_id, username, rounds=50):
+    statements = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.username == username).first() if username else None
+            with StatementCounter() as counter:
+                resource = loader(db, resource_id, user)
+                ResourceResponse.model_validate(resource)
+            statements = counter.count
+        finally:
+            db.close()
+    elapsed = (time.perf_counter() - started) / rounds * 1000
+    print(f"{label:<8} {statements:>3} statements/request  {elapsed:.2f} ms/request")
+
+
+def main():
+    db = SessionLocal()
+    try:
+        if len(sys.argv) > 1:
+            resource_id = sys.argv[1]
+        else:
+            first = db.query(Resource.id).first()
+            if not first:
+                print("No resources found")
+                return
+            resource_id = first[0]
+    finally:
+        db.close()
+
+    username = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Resource {resource_id}, user {username or '(anonymous)'}")
+    measure("before", legacy_detail, resource_id, username)
+    measure("after", load_resource_detail, resource_id, username)
+
+
+if __name__ == "__main__":
+    main()
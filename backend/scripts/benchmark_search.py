@@ -0,0 +1,97 @@
+"""Benchmark the in-memory search index against a linear substring scan.
+
+Builds synthetic articles in memory (no database needed) and times the same
+queries both ways. The linear scan stands in for the old four-way ILIKE
+query, which had to read every row.
+
+    python -m backend.scripts.benchmark_search [article_count]
+"""
+
+import random
+import sys
+import time
+
+from backend.app.services.search_index import InMemorySearchBackend, SuggestionIndex
+
+
+LATIN_WORDS = (
+    "python rust react vue docker kubernetes redis mysql postgres linux design "
+    "startup finance growth agent model prompt vector cache queue stream api "
+    "testing deploy cloud security network compiler runtime database index"
+).split()
+CJK_WORDS = (
+    "深度学习 人工智能 数据库 前端开发 后端架构 产品设计 创业 增长 运营 投资 "
+    "效率 笔记 知识管理 大模型 向量检索 缓存 消息队列 云计算 安全 网络 编译器"
+).split()
+QUERIES = ["python", "kubernetes deploy", "深度学习", "知识管理", "向量检索 cache", "大模型 agent"]
+PREFIXES = ["py", "kube", "深度", "学习", "向量检", "term12"]
+
+
+def build_vocabulary(rng, size=20_000):
+    """Known words interleaved with filler terms, weighted by a Zipf curve."""
+    filler = [f"term{i}" for i in range(size)]
+    vocabulary = filler[:]
+    for word in LATIN_WORDS + CJK_WORDS:
+        vocabulary.insert(rng.randint(50, 2000), word)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return vocabulary, weights
+
+
+def synthetic_article(rng, vocabulary, weights, i):
+    def words(n):
+        return rng.choices(vocabulary, weights=weights, k=n)
+
+    title = " ".join(words(6))
+    description = " ".join(words(30))
+    tags = ",".join(words(3))
+    content = "<p>" + " ".join(words(300)) + "</p>"
+    return f"res{i:08d}", rng.randint(1, 5), title, description, tags, content
+
+
+def linear_scan(articles, query, limit=20):
+    needle = query.lower()
+    hits = [
+        article[0]
+        for article in articles
+        if any(needle in (field or "").lower() for field in article[2:])
+    ]
+    return hits[:limit], len(hits)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    vocabulary, weights = build_vocabulary(rng)
+    articles = [synthetic_article(rng, vocabulary, weights, i) for i in range(count)]
+
+    backend = InMemorySearchBackend()
+    started = time.perf_counter()
+    for article in articles:
+        backend.index_document(*article)
+    print(f"Indexed {count} articles in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'query':<20} {'index ms':>9} {'scan ms':>9} {'matches':>8}")
+    for query in QUERIES:
+        started = time.perf_counter()
+        _, total = backend.search_ids(query, limit=20)
+        index_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        linear_scan(articles, query)
+        scan_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{query:<20} {index_ms:>9.2f} {scan_ms:>9.2f} {total:>8}")
+
+    suggestions = SuggestionIndex()
+    suggestions.load((article[0], article[2], article[4].split(","), 0) for article in articles)
+
+    print(f"\n{'prefix':<20} {'suggest ms':>10} {'results':>8}")
+    for prefix in PREFIXES:
+        started = time.perf_counter()
+        results = suggestions.suggest(prefix)
+        suggest_ms = (time.perf_counter() - started) * 1000
+        print(f"{prefix:<20} {suggest_ms:>10.3f} {len(results):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Check that large MinIO transfers do not slow down unrelated requests.
+
+Run against one API worker (e.g. ``uvicorn backend.app.main:app --workers 1``)
+that shares this machine's MinIO settings:
+    python -m backend.scripts.benchmark_storage_concurrency --downloads 20 --size-mb 200
+    python -m backend.scripts.benchmark_storage_concurrency --url http://127.0.0.1:8000 --object videos/x/y.mp4
+
+Unless --object is given, a random object of --size-mb is uploaded first and
+removed afterwards. The script probes /health for --duration seconds while
+idle, then again while --downloads clients pull the object through
+/api/uploads, and prints probe latency for both phases. With the storage I/O
+pool the two latency rows should match; with blocking MinIO calls on the
+event loop the loaded row grows with every concurrent transfer.
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import time
+
+import httpx
+
+from backend.app.services.storage import storage
+
+
+async def probe(client, url, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get(url)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.05)
+    return latencies
+
+
+async def download(client, url, stats, stop):
+    while not stop.is_set():
+        async with client.stream("GET", url) as response:
+            if response.status_code != 200:
+                stats["failed"] += 1
+                return
+            async for chunk in response.aiter_bytes():
+                stats["bytes"] += len(chunk)
+                if stop.is_set():
+                    break
+        stats["completed"] += 1
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(
+        f"{label:<8} {len(latencies):>6} probes  p50 {statistics.median(latencies):>7.1f} ms"
+        f"  p95 {p95:>7.1f} ms  max {latencies[-1]:>7.1f} ms"
+    )
+
+
+async def main(args):
+    base = args.url.rstrip("/")
+    object_name = args.object
+    if object_name is None:
+        size = args.size_mb * 1024 * 1024
+        object_name = storage.upload_file(
+            io.BytesIO(os.urandom(size)), "benchmark.bin", "application/octet-stream", size, prefix="benchmark"
+        )
+        print(f"uploaded {object_name} ({args.size_mb} MB)")
+
+    timeout = httpx.Timeout(connect=30.0, read=None, write=30.0, pool=None)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            report("idle", await probe(client, f"{base}/health", args.duration))
+
+            stats = {"bytes": 0, "completed": 0, "failed": 0}
+            stop = asyncio.Event()
+            file_url = f"{base}/api/uploads/{object_name}"
+            tasks = [asyncio.create_task(download(client, file_url, stats, stop)) for _ in range(args.downloads)]
+            started = time.perf_counter()
+            report("loaded", await probe(client, f"{base}/health", args.duration))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            print(
+                f"{args.downloads} concurrent downloads moved {stats['bytes'] / 1024 / 1024:.0f} MB"
+                f" ({stats['bytes'] / 1024 / 1024 / elapsed:.0f} MB/s), {stats['completed']} completed,"
+                f" {stats['failed']} failed"
+            )
+            health = (await client.get(f"{base}/health")).json()
+            print(f"server storage pool: {health.get('storage')}")
+    finally:
+        if args.object is None:
+            storage.delete_file(object_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--object", help="existing object to download instead of uploading a test file")
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--downloads", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    asyncio.run(main(parser.parse_args()))
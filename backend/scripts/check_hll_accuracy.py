@@ -0,0 +1,88 @@
+"""Check HyperLogLog unique-visitor estimates against exact counts.
+
+Synthetic mode feeds known id sets (single sketches and a 30-day merge with
+overlapping visitors); --db compares the stored sketches with
+COUNT(DISTINCT session_id) on the configured database:
+    python -m backend.scripts.check_hll_accuracy
+    python -m backend.scripts.check_hll_accuracy --db
+
+Exits with status 1 when an estimate is further than three standard errors
+from the exact count.
+"""
+
+import random
+import sys
+from datetime import timedelta
+
+from sqlalchemy import func
+
+from backend.app.utils.hyperloglog import HyperLogLog, standard_error
+
+
+TOLERANCE = 3 * standard_error()
+
+
+def report(label, exact, estimate):
+    error = (estimate - exact) / exact if exact else 0.0
+    ok = abs(error) <= TOLERANCE
+    print(f"{'OK ' if ok else 'FAIL'} {label:<36} exact {exact:>9}  estimate {estimate:>9}  error {error:+.2%}")
+    return ok
+
+
+def check_synthetic():
+    results = []
+    for cardinality in (100, 1_000, 10_000, 50_000, 200_000, 1_000_000):
+        sketch = HyperLogLog()
+        sketch.update(f"session-{cardinality}-{i}" for i in range(cardinality))
+        results.append(report(f"single sketch, n={cardinality}", cardinality, sketch.count()))
+
+    # 30 days of traffic where returning visitors reappear on several days
+    rng = random.Random(42)
+    population = [f"visitor-{i}" for i in range(120_000)]
+    merged = HyperLogLog()
+    seen = set()
+    for _ in range(30):
+        visitors = rng.sample(population, 8_000)
+        day = HyperLogLog()
+        day.update(visitors)
+        merged.merge(HyperLogLog.from_bytes(day.to_bytes()))
+        seen.update(visitors)
+    results.append(report("30 merged daily sketches", len(seen), merged.count()))
+    return all(results)
+
+
+def check_database():
+    from backend.app.db.session import SessionLocal
+    from backend.app.models import VisitorAnalytics
+    from backend.app.services.visitor_sketches import visitor_sketches
+
+    db = SessionLocal()
+    try:
+        results = []
+        exact = db.query(func.count(func.distinct(VisitorAnalytics.session_id))).scalar() or 0
+        results.append(report("all time", exact, visitor_sketches.unique_visitors(db)))
+
+        latest = db.query(func.max(VisitorAnalytics.created_at)).scalar()
+        if latest is not None:
+            end = latest.date() + timedelta(days=1)
+            start = end - timedelta(days=7)
+            exact = (
+                db.query(func.count(func.distinct(VisitorAnalytics.session_id)))
+                .filter(VisitorAnalytics.created_at >= start, VisitorAnalytics.created_at < end)
+                .scalar()
+                or 0
+            )
+            results.append(report(f"{start} .. {end - timedelta(days=1)}", exact, visitor_sketches.unique_visitors(db, start, end)))
+        return all(results)
+    finally:
+        db.close()
+
+
+def main():
+    print(f"precision 14, standard error {standard_error():.2%}, tolerance ±{TOLERANCE:.2%}")
+    ok = check_database() if "--db" in sys.argv else check_synthetic()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Check that resource list endpoints stay within a fixed SQL statement budget.
+
+Serializing ResourceListResponse touches category and author on every row,
+so a missing eager-load shows up here as statements growing with page size.
+
+    python -m backend.scripts.check_list_query_budget
+"""
+
+import asyncio
+import sys
+
+from backend.app.api.routers import admin, resources
+from backend.app.db.session import SessionLocal
+from backend.app.schemas import CategorizedResourcesResponse, ResourceListResponse
+from backend.app.services.resource_cache import categorized_cache
+from backend.scripts.benchmark_resource_detail import StatementCounter
+
+
+# Statements allowed per call, independent of how many rows are returned
+BUDGETS = {
+    "list_resources": 1,
+    "get_hot_resources": 1,
+    "get_categorized_resources": 1,
+    "admin_list_resources": 1,
+}
+
+
+def run_endpoint(name, call, schema):
+    categorized_cache.invalidate()
+    db = SessionLocal()
+    try:
+        with StatementCounter() as counter:
+            items = asyncio.run(call(db))
+            [schema.model_validate(item) for item in items]
+        return counter.count, len(items)
+    finally:
+        db.close()
+
+
+def main():
+    calls = {
+        "list_resources": (
+            lambda db: resources.list_resources(
+                skip=0, limit=50, category_id=None, is_free=None, status=None,
+                search=None, is_featured=None, is_pinned=None, db=db,
+            ),
+            ResourceListResponse,
+        ),
+        "get_hot_resources": (
+            lambda db: resources.get_hot_resources(limit=50, db=db),
+            ResourceListResponse,
+        ),
+        "get_categorized_resources": (
+            lambda db: resources.get_categorized_resources(limit=10, db=db),
+            CategorizedResourcesResponse,
+        ),
+        "admin_list_resources": (
+            lambda db: admin.admin_list_resources(
+                skip=0, limit=50, status=None, category_id=None, author_id=None,
+                search=None, is_pinned=None, current_admin=None, db=db,
+            ),
+            ResourceListResponse,
+        ),
+    }
+
+    failed = False
+    for name, (call, schema) in calls.items():
+        statements, rows = run_endpoint(name, call, schema)
+        budget = BUDGETS[name]
+        ok = statements <= budget
+        failed = failed or not ok
+        print(f"{'OK ' if ok else 'FAIL'} {name:<28} {statements:>3} statements ({rows} rows, budget {budget})")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
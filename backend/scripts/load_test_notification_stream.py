@@ -0,0 +1,127 @@
+"""Hold thousands of idle SSE connections open against /api/notifications/stream.
+
+Run against one API worker (e.g. ``uvicorn backend.app.main:app --workers 1``)
+with a raised file limit on both sides (``ulimit -n 65536``):
+    python -m backend.scripts.load_test_notification_stream --connections 5000
+    python -m backend.scripts.load_test_notification_stream --url http://127.0.0.1:8000 --hold 60 --pid <uvicorn pid>
+
+Tokens are minted for existing active users (up to --users distinct ones,
+cycled across connections) with the configured SECRET_KEY. Every connection
+waits for its ``hello`` event, then stays idle and counts heartbeats. The
+report shows how long it took to open them all, how many survived the hold
+period, the hub counters from /health and, given --pid, the worker's RSS.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from backend.app.core.security import create_access_token
+from backend.app.db.session import SessionLocal
+from backend.app.models import User
+
+
+def mint_tokens(limit):
+    db = SessionLocal()
+    try:
+        ids = [user_id for (user_id,) in db.query(User.id).filter(User.is_active == True).limit(limit)]
+    finally:
+        db.close()
+    if not ids:
+        raise SystemExit("No active users to mint tokens for")
+    return [create_access_token({"sub": user_id}) for user_id in ids]
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+async def hold_connection(client, url, token, ready, stats, stop):
+    greeted = False
+    try:
+        async with client.stream("GET", url, params={"token": token}) as response:
+            if response.status_code != 200:
+                stats["failed"] += 1
+                return
+            async for line in response.aiter_lines():
+                if not greeted and line.startswith("event: hello"):
+                    greeted = True
+                    stats["connected"] += 1
+                    ready.release()
+                elif line.startswith(": ping"):
+                    stats["heartbeats"] += 1
+                elif line.startswith("event: "):
+                    stats["events"] += 1
+                if stop.is_set():
+                    break
+        stats["closed"] += 1
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        stats["failed"] += 1
+    finally:
+        if not greeted:
+            ready.release()
+
+
+async def main(args):
+    tokens = mint_tokens(args.users)
+    url = f"{args.url.rstrip('/')}/api/notifications/stream"
+    stats = {"connected": 0, "failed": 0, "heartbeats": 0, "events": 0, "closed": 0}
+    ready = asyncio.Semaphore(0)
+    stop = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=0)
+    timeout = httpx.Timeout(connect=30.0, read=None, write=30.0, pool=None)
+    base_rss = rss_mb(args.pid) if args.pid else None
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        tasks = []
+        for i in range(args.connections):
+            tasks.append(asyncio.create_task(
+                hold_connection(client, url, tokens[i % len(tokens)], ready, stats, stop)
+            ))
+            if args.ramp and i % args.ramp == args.ramp - 1:
+                await asyncio.sleep(0.05)
+        for _ in range(args.connections):
+            await ready.acquire()
+        opened = time.perf_counter() - started
+        print(f"opened {stats['connected']} streams ({stats['failed']} failed) in {opened:.1f}s")
+
+        health = (await client.get(f"{args.url.rstrip('/')}/health")).json()
+        print(f"server hub: {health.get('event_stream')}")
+        if base_rss is not None:
+            rss = rss_mb(args.pid)
+            per_conn = (rss - base_rss) * 1024 / max(stats["connected"], 1)
+            print(f"worker RSS {base_rss:.1f} MB -> {rss:.1f} MB (~{per_conn:.1f} KB per stream)")
+
+        print(f"holding {args.hold}s ...")
+        await asyncio.sleep(args.hold)
+        alive = stats["connected"] - stats["closed"] - stats["failed"]
+        print(f"after hold: {alive} streams alive, {stats['heartbeats']} heartbeats, {stats['events']} events")
+
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--hold", type=float, default=30.0, help="seconds to keep the streams idle")
+    parser.add_argument("--ramp", type=int, default=200, help="pause briefly after every N new connections")
+    parser.add_argument("--pid", type=int, help="API worker pid, to report its memory")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,50 @@
+"""Database migration script for the durable background job table.
+
+Only needed with JOB_QUEUE_BACKEND=database; the default in-process queue
+keeps jobs in memory.
+    python -m backend.scripts.migration_add_background_jobs
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS background_jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    failed BOOLEAN NOT NULL DEFAULT FALSE,
+    last_error TEXT NULL,
+    available_at DATETIME NOT NULL,
+    created_at DATETIME NOT NULL,
+    INDEX ix_background_jobs_id (id),
+    INDEX ix_background_jobs_available_at (available_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def run_migration():
+    """Run the background job table migration."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    print("\n✓ Background job migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,65 @@
+"""Database migration script for the conversations summary table.
+
+Creates one row per pair of users who have exchanged private messages,
+holding the last message and each side's unread count, then fills it from
+the existing messages:
+    python -m backend.scripts.migration_add_conversations
+Re-running rebuilds the table from messages.
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.services.message_service import message_service
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_low_id CHAR(32) NOT NULL,
+    user_high_id CHAR(32) NOT NULL,
+    last_message_id INT NULL,
+    last_message_at DATETIME NULL,
+    low_unread INT NOT NULL DEFAULT 0,
+    high_unread INT NOT NULL DEFAULT 0,
+    UNIQUE KEY uq_conversations_pair (user_low_id, user_high_id),
+    INDEX ix_conversations_id (id),
+    INDEX ix_conversations_low_last (user_low_id, last_message_at),
+    INDEX ix_conversations_high_last (user_high_id, last_message_at),
+    FOREIGN KEY (user_low_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_high_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (last_message_id) REFERENCES messages(id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def run_migration():
+    """Run the conversations migration and backfill."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        written = message_service.rebuild_conversations(db)
+        print(f"✓ Backfilled {written} conversations from messages")
+    finally:
+        db.close()
+
+    print("\n✓ Conversations migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
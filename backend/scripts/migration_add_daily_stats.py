@@ -0,0 +1,50 @@
+"""Database migration script for dashboard daily rollups.
+
+Creates the daily_stats table and the created_at indexes the per-day
+aggregation relies on. Fill it afterwards with:
+    python -m backend.scripts.migration_add_daily_stats
+    python -m backend.scripts.backfill_daily_stats
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day DATE NOT NULL PRIMARY KEY,
+    new_users INT NOT NULL DEFAULT 0,
+    recharge_amount INT NOT NULL DEFAULT 0,
+    visits INT NOT NULL DEFAULT 0,
+    unique_sessions INT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+CREATE INDEX ix_users_created_at ON users (created_at);
+CREATE INDEX ix_point_transactions_created_at ON point_transactions (created_at)
+"""
+
+
+def run_migration():
+    """Run the daily stats migration."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    # Duplicate key name means the index already exists
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    print("\n✓ Daily stats migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,42 @@
+"""Database migration script for keyset pagination indexes.
+
+Admin log listings page with (created_at, id) cursors, which need an index
+on created_at (InnoDB secondary indexes already carry the primary key).
+visitor_analytics and email_logs have one; point_transactions gets its
+index from migration_add_daily_stats.
+    python -m backend.scripts.migration_add_log_indexes
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE INDEX ix_operation_logs_created_at ON operation_logs (created_at)
+"""
+
+
+def run_migration():
+    """Run the log index migration."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    # Duplicate key name means the index already exists
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    print("\n✓ Log index migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,58 @@
+"""Database migration script for the per-user notification counters table.
+
+Creates one row per user and notification type holding the total and unread
+counts that /api/notifications/unread-count and /stats read, then fills it
+from the existing notifications:
+    python -m backend.scripts.migration_add_notification_counters
+Re-running rebuilds the counters from notifications.
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.services.notification_counters import recount
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS user_notification_counters (
+    user_id CHAR(32) NOT NULL,
+    notification_type ENUM('LIKE', 'COMMENT', 'REPLY', 'DOWNLOAD', 'VIEW', 'MESSAGE') NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    unread INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, notification_type),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def run_migration():
+    """Run the notification counters migration and backfill."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        recount(db)
+        db.commit()
+        print("✓ Backfilled notification counters from notifications")
+    finally:
+        db.close()
+
+    print("\n✓ Notification counters migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,50 @@
+"""Database migration script for the denormalized resource like/comment counters.
+
+Adds ``like_count`` and ``comment_count`` to resources and fills them from
+resource_likes and comments:
+    python -m backend.scripts.migration_add_resource_counters
+Re-running only repairs counters that drifted.
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.services.resource_counters import resource_counters
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+ALTER TABLE resources ADD COLUMN like_count INT NOT NULL DEFAULT 0;
+ALTER TABLE resources ADD COLUMN comment_count INT NOT NULL DEFAULT 0
+"""
+
+
+def run_migration():
+    """Run the resource counters migration and backfill."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        repaired = resource_counters.reconcile(db)
+        print(f"✓ Backfilled counters: {repaired}")
+    finally:
+        db.close()
+
+    print("\n✓ Resource counters migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
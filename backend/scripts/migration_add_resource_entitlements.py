@@ -0,0 +1,65 @@
+"""Database migration script for the resource entitlements table.
+
+Creates one row per (user, purchased resource) so access checks become a
+unique-index lookup instead of a scan of point_transactions by reference_id,
+then fills it from the existing purchase transactions:
+    python -m backend.scripts.migration_add_resource_entitlements
+Re-running only adds entitlements that are missing. On a table created by an
+earlier version the ALTER adds ``first_downloaded_at``; once it exists that
+statement just reports a duplicate column.
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+from backend.app.db.session import SessionLocal
+from backend.app.services.entitlements import entitlements
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS resource_entitlements (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id CHAR(32) NOT NULL,
+    resource_id CHAR(32) NOT NULL,
+    transaction_id INT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    first_downloaded_at DATETIME NULL,
+    UNIQUE KEY uq_resource_entitlements_user_resource (user_id, resource_id),
+    INDEX ix_resource_entitlements_id (id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE,
+    FOREIGN KEY (transaction_id) REFERENCES point_transactions(id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+ALTER TABLE resource_entitlements ADD COLUMN first_downloaded_at DATETIME NULL
+"""
+
+
+def run_migration():
+    """Run the resource entitlements migration and backfill."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        written = entitlements.backfill(db)
+        print(f"✓ Backfilled {written} entitlements from purchase transactions")
+    finally:
+        db.close()
+
+    print("\n✓ Resource entitlements migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,43 @@
+"""Database migration script for full-text search indexes.
+
+Creates InnoDB FULLTEXT indexes (ngram parser, for Chinese text) on the
+resources table. The API never creates them itself; until this has run it
+logs the missing indexes at startup and searches with the in-memory index:
+    python -m backend.scripts.migration_add_search_index
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+ALTER TABLE resources ADD FULLTEXT INDEX ft_resources_title (title) WITH PARSER ngram;
+ALTER TABLE resources ADD FULLTEXT INDEX ft_resources_meta (description, tags) WITH PARSER ngram;
+ALTER TABLE resources ADD FULLTEXT INDEX ft_resources_content (content) WITH PARSER ngram
+"""
+
+
+def run_migration():
+    """Run the search index migration."""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    # Duplicate key name means the index already exists
+                    print(f"✗ Error: {e}")
+        
+        conn.commit()
+    
+    print("\n✓ Search index migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,56 @@
+"""Database migration script for the resumable upload sessions table.
+
+Creates upload_sessions, which maps each chunked upload to its MinIO
+multipart upload, its owner and the resource it will be attached to:
+    python -m backend.scripts.migration_add_upload_sessions
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    id CHAR(32) PRIMARY KEY,
+    user_id CHAR(32) NOT NULL,
+    purpose VARCHAR(20) NOT NULL,
+    resource_id CHAR(32) NULL,
+    object_name VARCHAR(500) NOT NULL,
+    upload_id VARCHAR(255) NOT NULL,
+    filename VARCHAR(255) NOT NULL,
+    content_type VARCHAR(255) NULL,
+    total_size BIGINT NOT NULL,
+    part_size INT NOT NULL,
+    created_at DATETIME NOT NULL,
+    last_activity_at DATETIME NOT NULL,
+    INDEX ix_upload_sessions_id (id),
+    INDEX ix_upload_sessions_last_activity_at (last_activity_at),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def run_migration():
+    """Run the upload sessions migration."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    print("\n✓ Upload sessions migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()
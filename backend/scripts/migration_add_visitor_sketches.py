@@ -0,0 +1,48 @@
+"""Database migration script for HyperLogLog unique-visitor sketches.
+
+Creates the visitor_sketches table. Fill it from existing page views with:
+    python -m backend.scripts.migration_add_visitor_sketches
+    python -m backend.scripts.backfill_visitor_sketches
+"""
+
+from sqlalchemy import create_engine, text
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+
+# Migration SQL
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS visitor_sketches (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    day DATE NOT NULL,
+    page_path VARCHAR(500) NOT NULL DEFAULT '',
+    registers BLOB NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    UNIQUE KEY uq_visitor_sketches_day_page (day, page_path),
+    INDEX ix_visitor_sketches_day (day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def run_migration():
+    """Run the visitor sketch migration."""
+    engine = create_engine(settings.DATABASE_URL)
+
+    with engine.connect() as conn:
+        for statement in MIGRATION_SQL.strip().split(';'):
+            statement = statement.strip()
+            if statement:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✓ Executed: {statement[:60]}...")
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+
+        conn.commit()
+
+    print("\n✓ Visitor sketch migration completed!")
+
+
+if __name__ == "__main__":
+    run_migration()